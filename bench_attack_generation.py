@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: throughput de generación de ataques de plantilla
+
+Compara el esquema anterior (dict de plantillas reconstruido en cada llamada
+y pesos expandidos en listas con entradas repetidas) con el corpus cargado
+una vez y el muestreo alias de src/corpus.py. No necesita LLM.
+
+Uso:
+    python bench_attack_generation.py [--n 200000]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from src.attacker import AdvancedAttacker, AttackPrompt, AttackStrategy
+from src.corpus import DEFAULT_CORPUS_PATH, load_corpus
+
+THREATS = ["CAE", "FSA", "MME"]
+TEMPLATE_STRATEGIES = [s for s in AttackStrategy if load_corpus().get(s.value)]
+
+
+def legacy_attack(corpus_data, strategy: AttackStrategy, threat: str) -> AttackPrompt:
+    """Equivalente al código anterior: cada llamada construía su dict de plantillas"""
+    spec = corpus_data[strategy.value]
+    templates = {k: list(v) for k, v in spec["templates"].items()}
+    return AttackPrompt(
+        content=random.choice(templates.get(threat, templates["CAE"])),
+        strategy=strategy,
+        expected_threat=threat,
+        subtlety=spec["subtlety"],
+        description=spec["description"]
+    )
+
+
+def rate(n: int, fn) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput de ataques de plantilla")
+    parser.add_argument("--n", type=int, default=200000)
+    args = parser.parse_args()
+
+    with open(DEFAULT_CORPUS_PATH, encoding='utf-8') as f:
+        raw = json.load(f)
+
+    attacker = AdvancedAttacker(seed=0)
+
+    print(f"{'estrategia':>14} | {'legacy (ataques/s)':>18} | {'corpus (ataques/s)':>18}")
+    print("-" * 58)
+    for strategy in TEMPLATE_STRATEGIES:
+        old = rate(args.n, lambda i: legacy_attack(raw["strategies"], strategy, THREATS[i % 3]))
+        new = rate(args.n, lambda i: attacker.generate_attack(strategy, THREATS[i % 3]))
+        print(f"{strategy.value:>14} | {old:>18,.0f} | {new:>18,.0f}")
+
+    # Variantes mutadas en streaming (estrategia MUTATION)
+    variants = attacker.mutation_variants("CAE")
+    new = rate(args.n, lambda i: next(variants))
+    print(f"{'mutation':>14} | {'-':>18} | {new:>18,.0f}")
+
+    # Selección ponderada de estrategia + amenaza (bucle de auto-ataque)
+    weights = raw["auto_attack_weights"]
+    expanded = [k for k, w in weights["strategies"].items() for _ in range(w)]
+    threat_pool = [k for k, w in weights["threats"].items() for _ in range(w)]
+    strategy_sampler = attacker.corpus.weighted_sampler("strategies")
+    threat_sampler = attacker.corpus.weighted_sampler("threats")
+
+    old = rate(args.n, lambda i: (random.choice(expanded), random.choice(threat_pool)))
+    new = rate(args.n, lambda i: (strategy_sampler.sample(attacker.rng), threat_sampler.sample(attacker.rng)))
+    print(f"\nSelección ponderada: listas expandidas {old:,.0f}/s | alias {new:,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: batallas completas atacante→defensor contra un backend simulado
+
+Levanta src/sim_backend.py (API OpenAI local con latencia y tokens/s
+configurables) y ejecuta el bucle completo con el juez LLM activo para
+cada combinación de:
+
+- mezcla de estrategias: template, dataset, llm (creativa) o mixed
+- concurrencia: slots del planificador del backend; se lanzan tantas
+  batallas en paralelo (un defensor por batalla) como slots
+- ventana: 1 = INTERLEAVED, >1 = MODEL_AFFINITY con ese tamaño de lote
+- caché: prefix cache del servidor y single-flight del juez activados o no
+
+Por configuración informa rondas/s, llamadas al juez por ronda, espera en
+la cola del planificador (media y máxima por prioridad) y latencia por
+ronda p50/p99. Con --output guarda los resultados en JSON.
+
+Uso:
+    python bench_battle.py [--rounds 60] [--mixes template dataset llm mixed]
+                           [--concurrency 1 4] [--windows 1 8] [--cache on off]
+                           [--tokens-per-sec 60] [--ttft-ms 30] [--parallel 4]
+                           [--swap-ms 0] [--output bench_results/battle.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from src.attacker import AdvancedAttacker, AttackStrategy
+from src.battle import BattleMode, RoundSpec, run_battle
+from src.corpus import load_corpus
+from src.dataset_integration import initialize_datasets
+from src.defender import AxioDefender
+from src.llm_client import LLMClient, single_flight
+from src.scheduler import Priority, configure_schedulers, get_scheduler
+from src.sim_backend import SimulatedBackend
+from src.utils import load_config
+
+THREATS = ["CAE", "FSA", "MME"]
+TEMPLATE_STRATEGIES = [s for s in AttackStrategy if load_corpus().get(s.value)]
+MIXES = {
+    "template": {"template": 1.0},
+    "dataset": {"dataset": 1.0},
+    "llm": {"llm": 1.0},
+    "mixed": {"template": 0.6, "dataset": 0.2, "llm": 0.2}
+}
+
+
+def build_specs(mix: str, rounds: int, seed: int) -> List[RoundSpec]:
+    """Rondas de la mezcla pedida, reproducibles por semilla"""
+    rng = random.Random(seed)
+    kinds, weights = zip(*MIXES[mix].items())
+    specs = []
+    for _ in range(rounds):
+        kind = rng.choices(kinds, weights)[0]
+        threat = rng.choice(THREATS)
+        if kind == "llm":
+            specs.append(RoundSpec(threat=threat, creative=True))
+        elif kind == "dataset":
+            specs.append(RoundSpec(threat=threat, strategy=AttackStrategy.DATASET))
+        else:
+            specs.append(RoundSpec(threat=threat, strategy=rng.choice(TEMPLATE_STRATEGIES)))
+    return specs
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def run_config(args, config: Dict, mix: str, concurrency: int, window: int, cache: bool) -> Dict:
+    """Una configuración contra un backend simulado nuevo (planificador nuevo)"""
+    sim = SimulatedBackend(ttft_ms=args.ttft_ms, prefill_tokens_per_sec=args.prefill_tps,
+                           tokens_per_sec=args.tokens_per_sec, completion_tokens=args.completion_tokens,
+                           parallel=args.parallel, prefix_cache=cache, model_swap_ms=args.swap_ms,
+                           seed=args.seed)
+    with sim:
+        configure_schedulers({"max_concurrency": concurrency,
+                              "reserved_judge_slots": 1 if concurrency > 1 else 0})
+        attacker_llm = LLMClient(sim.url, "sim-attacker", temperature=0.9, priority=Priority.ATTACKER)
+        judge_llm = LLMClient(sim.url, "sim-judge", temperature=0.3, priority=Priority.JUDGE)
+        if not cache:
+            judge_llm.SINGLE_FLIGHT_MAX_TEMPERATURE = -1.0
+
+        # Muestreo de dataset y plantillas usan `random`: misma semilla en cada configuración
+        random.seed(args.seed)
+        specs = build_specs(mix, args.rounds, args.seed)
+        workers = max(1, concurrency)
+        shares = [specs[w::workers] for w in range(workers)]
+        reports = [None] * workers
+        coalesced_before = single_flight.stats()["coalesced"]
+
+        def battle(w: int):
+            attacker = AdvancedAttacker(llm_client=attacker_llm, seed=args.seed + w)
+            defender = AxioDefender(llm_client=judge_llm, config=config)
+            mode = BattleMode.INTERLEAVED if window <= 1 else BattleMode.MODEL_AFFINITY
+            reports[w] = run_battle(attacker, defender, shares[w], mode=mode, window=window)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=battle, args=(w,)) for w in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - start
+
+        rounds = [r for report in reports for r in report.rounds]
+        latencies = [r.latency for r in rounds]
+        scheduler = get_scheduler(sim.url).stats()
+        server = sim.stats()
+
+    total = len(rounds)
+    return {
+        "mix": mix,
+        "concurrency": concurrency,
+        "window": window,
+        "cache": cache,
+        "rounds": total,
+        "wall_time": wall,
+        "rounds_per_sec": total / wall if wall else 0.0,
+        "judge_calls_per_round": judge_llm.usage_stats()["requests"] / total if total else 0.0,
+        "attacker_calls_per_round": attacker_llm.usage_stats()["requests"] / total if total else 0.0,
+        "judge_coalesced": single_flight.stats()["coalesced"] - coalesced_before,
+        "queue_wait_avg_ms": {p: v * 1000 for p, v in scheduler["avg_wait"].items()},
+        "queue_wait_max_ms": {p: v * 1000 for p, v in scheduler["max_wait"].items()},
+        "latency_p50_ms": percentile(latencies, 0.5) * 1000,
+        "latency_p99_ms": percentile(latencies, 0.99) * 1000,
+        "bypass_rate": sum(r.decision.action == "PERMITIR" for r in rounds) / total if total else 0.0,
+        "server": server
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batallas completas contra un backend simulado")
+    parser.add_argument("--rounds", type=int, default=60, help="Rondas por configuración")
+    parser.add_argument("--mixes", nargs="+", default=["template", "dataset", "llm", "mixed"], choices=list(MIXES))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--windows", type=int, nargs="+", default=[1, 8], help="1 = INTERLEAVED")
+    parser.add_argument("--cache", nargs="+", default=["on", "off"], choices=["on", "off"])
+    parser.add_argument("--ttft-ms", type=float, default=30.0)
+    parser.add_argument("--prefill-tps", type=float, default=2000.0, help="Tokens/s de prefill")
+    parser.add_argument("--tokens-per-sec", type=float, default=60.0, help="Tokens/s de generación")
+    parser.add_argument("--completion-tokens", type=int, default=40, help="Tokens de una frase de ataque")
+    parser.add_argument("--parallel", type=int, default=4, help="Slots del servidor simulado")
+    parser.add_argument("--swap-ms", type=float, default=0.0, help="Coste simulado de cambiar de modelo")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Guardar resultados en JSON")
+    args = parser.parse_args()
+
+    config = load_config()
+    config.setdefault("security", {})["use_llm_judge"] = True
+    initialize_datasets()
+
+    results = []
+    print(f"{'mezcla':>8} | {'conc':>4} | {'vent':>4} | {'caché':>5} | {'rondas/s':>8} | {'juez/ronda':>10} | "
+          f"{'espera juez':>11} | {'espera atac':>11} | {'p50 ms':>7} | {'p99 ms':>7}")
+    print("-" * 104)
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        for mix in args.mixes:
+            for concurrency in args.concurrency:
+                for window in args.windows:
+                    for cache in args.cache:
+                        with redirect_stdout(devnull):
+                            r = run_config(args, config, mix, concurrency, window, cache == "on")
+                        results.append(r)
+                        wait = r["queue_wait_avg_ms"]
+                        print(f"{mix:>8} | {concurrency:>4} | {window:>4} | {cache:>5} | {r['rounds_per_sec']:>8.1f} | "
+                              f"{r['judge_calls_per_round']:>10.2f} | {wait['JUDGE']:>9.1f}ms | "
+                              f"{wait['ATTACKER']:>9.1f}ms | {r['latency_p50_ms']:>7.0f} | {r['latency_p99_ms']:>7.0f}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "benchmark": "battle",
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+                "results": results
+            }, f, indent=2)
+        print(f"\n💾 Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: coste por ataque creativo generando de uno en uno frente a
+lotes de N ataques por petición (AdvancedAttacker.llm_creative_attacks)
+
+Requiere el LLM atacante configurado en config/config.json. Reporta
+peticiones, tokens de prompt y de salida (según `usage` del servidor) y
+tiempo por ataque generado.
+
+Uso:
+    python bench_creative_batch.py [--attacks 12] [--batch 6] [--use-n]
+"""
+
+import argparse
+import time
+from typing import Dict
+
+from src.attacker import AdvancedAttacker
+from src.llm_client import create_client_from_config
+from src.utils import load_config
+
+THREATS = ["CAE", "FSA", "MME"]
+
+
+def measure(attacker: AdvancedAttacker, attacks: int, batch: int, use_n: bool) -> Dict[str, float]:
+    """Genera `attacks` ataques en lotes de `batch` y retorna el coste por ataque"""
+    client = attacker.llm_client
+    before = client.usage_stats()
+    generated = 0
+
+    start = time.perf_counter()
+    while generated < attacks:
+        threat = THREATS[(generated // batch) % len(THREATS)]
+        count = min(batch, attacks - generated)
+        if batch == 1:
+            attacker.llm_creative_attack(threat)
+        else:
+            attacker.llm_creative_attacks(threat, count, use_n=use_n)
+        generated += count
+    elapsed = time.perf_counter() - start
+
+    after = client.usage_stats()
+    used = {k: after[k] - before[k] for k in before}
+    return {
+        "requests": used["requests"],
+        "prompt_tokens": used["prompt_tokens"] / attacks,
+        "completion_tokens": used["completion_tokens"] / attacks,
+        "seconds": elapsed / attacks
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de generación creativa por lotes")
+    parser.add_argument("--attacks", type=int, default=12)
+    parser.add_argument("--batch", type=int, default=6)
+    parser.add_argument("--use-n", action="store_true", help="Probar antes el parámetro n de la API")
+    args = parser.parse_args()
+
+    config = load_config()
+    client = create_client_from_config(config["attacker"])
+    if not client.is_available():
+        print(f"❌ Servidor no disponible en {client.base_url}")
+        return
+
+    attacker = AdvancedAttacker(llm_client=client)
+    client.warmup()
+
+    print(f"Modelo: {client.model_name} | {args.attacks} ataques por modo\n")
+    results = {
+        "uno a uno": measure(attacker, args.attacks, 1, False),
+        f"lotes de {args.batch}": measure(attacker, args.attacks, args.batch, args.use_n),
+    }
+
+    for name, r in results.items():
+        print(f"{name:>14}: {r['requests']:>3} peticiones | por ataque: "
+              f"{r['prompt_tokens']:.0f} tokens prompt, {r['completion_tokens']:.0f} tokens salida, "
+              f"{r['seconds']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
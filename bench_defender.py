@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: micro-benchmarks de AxioDefender con umbrales de regresión
+
+Mide cada capa del defensor por separado y de punta a punta, para varias
+longitudes de mensaje (palabras) y tamaños de corpus (mensajes distintos):
+
+- normalizacion: lower() + split() + texto_a_hash de cada palabra
+- escaneo_lineal: `patrón in mensaje` para cada patrón (el "método viejo"
+  de demo_educativo.py, referencia para el filtro por hash)
+- filtro_rapido: AxioDefender._fast_filter
+- decision: apply_classification (vector, umbrales y riesgo) con las
+  clasificaciones ya calculadas
+- evaluate: evaluate() completo con el juez LLM sustituido por un stub
+  que responde al instante (--judge-latency-ms para simular el modelo)
+
+Para cada caso: mensajes/s, latencia p50/p99 por mensaje y pico de memoria
+(tracemalloc, en una pasada aparte para no distorsionar los tiempos). Los
+resultados se guardan en JSON; con --compare se comparan con una ejecución
+anterior y el script falla si algún caso pierde más de --max-regression
+de rendimiento.
+
+Uso:
+    python bench_defender.py [--lengths 8 64 512] [--corpus 1000 10000]
+                             [--output bench_results/defender.json]
+                             [--repeat 3] [--compare anterior.json] [--max-regression 0.25]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from src.defender import AxioDefender
+from src.utils import load_config, texto_a_hash
+
+BENIGN_WORDS = (
+    "hola quería saber el horario de la tienda y si hacéis envíos a canarias "
+    "necesito ayuda con mi pedido número la factura llegó con un error en dirección "
+    "podrías recomendarme un libro sobre historia o cocina mediterránea para regalar"
+).split()
+MALICIOUS_SHARE = 0.5  # mensajes con un patrón de amenaza en posición aleatoria
+DEFAULT_OUTPUT = Path("bench_results") / "defender.json"
+
+
+class StubJudge:
+    """Sustituto del LLMClient para el juez: respuesta fija, latencia opcional"""
+
+    def __init__(self, latency_ms: float = 0.0, answer: str = "SEGURO"):
+        self.latency = latency_ms / 1000
+        self.answer = answer
+        self.calls = 0
+
+    def system_prompt(self, system: str, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.answer
+
+
+def build_corpus(size: int, length: int, patterns: List[str], seed: int) -> List[str]:
+    """Mensajes de `length` palabras; la mitad lleva un patrón de amenaza"""
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(size):
+        words = [rng.choice(BENIGN_WORDS) for _ in range(length)]
+        if rng.random() < MALICIOUS_SHARE:
+            words[rng.randrange(length)] = rng.choice(patterns)
+        messages.append(" ".join(words))
+    return messages
+
+
+def measure(fn: Callable[[str], object], messages: List[str], min_seconds: float, repeat: int) -> Dict:
+    """
+    Latencias por mensaje y pico de memoria
+
+    Cada repetición recorre el corpus hasta min_seconds; como en timeit, se
+    informa la repetición más rápida (el ruido de la máquina solo suma).
+    """
+    # Una pasada de calentamiento: cachés, tablas y frecuencia de CPU
+    for message in messages:
+        fn(message)
+
+    best = None
+    clock = time.perf_counter_ns
+    for _ in range(max(1, repeat)):
+        latencies = []
+        start = time.perf_counter()
+        while True:
+            for message in messages:
+                t0 = clock()
+                fn(message)
+                latencies.append(clock() - t0)
+            if time.perf_counter() - start >= min_seconds:
+                break
+        elapsed = time.perf_counter() - start
+        if best is None or len(latencies) / elapsed > len(best[0]) / best[1]:
+            best = (latencies, elapsed)
+    latencies, elapsed = best
+
+    tracemalloc.start()
+    for message in messages:
+        fn(message)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "messages": len(latencies),
+        "msgs_per_sec": len(latencies) / elapsed,
+        "p50_us": latencies[len(latencies) // 2] / 1000,
+        "p99_us": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] / 1000,
+        "mean_us": statistics.fmean(latencies) / 1000,
+        "peak_kib": peak / 1024
+    }
+
+
+def cases(defender: AxioDefender, messages: List[str]) -> Dict[str, Callable[[str], object]]:
+    """Funciones a medir (una llamada por mensaje)"""
+    patterns = defender.PATRONES_CAE + defender.PATRONES_FSA + defender.PATRONES_MME
+    classified = {m: defender.classify(m) for m in messages}
+
+    def normalizacion(message):
+        return [texto_a_hash(p) for p in message.lower().split()]
+
+    def escaneo_lineal(message):
+        lower = message.lower()
+        return next((p for p in patterns if p in lower), None)
+
+    def decision(message):
+        if defender.vector['c_cae'] >= defender.max_strikes_cae:
+            defender.vector = {k: 0 for k in defender.vector}
+        threat, from_filter = classified[message]
+        return defender.apply_classification(message, threat, from_filter)
+
+    def evaluate(message):
+        decision = defender.evaluate(message)
+        if decision.action == "BLOQUEAR":
+            defender.vector = {k: 0 for k in defender.vector}
+        return decision
+
+    return {
+        "normalizacion": normalizacion,
+        "escaneo_lineal": escaneo_lineal,
+        "filtro_rapido": defender._fast_filter,
+        "decision": decision,
+        "evaluate": evaluate
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(current: Dict, previous: Dict, max_regression: float) -> List[str]:
+    """Casos cuyo msgs/s cae más de max_regression frente a la ejecución anterior"""
+    old = {(r["case"], r["length"], r["corpus"]): r for r in previous.get("results", [])}
+    regressions = []
+    print(f"\n{'caso':>15} | {'palabras':>8} | {'corpus':>6} | {'antes msg/s':>12} | {'ahora msg/s':>12} | {'cambio':>7}")
+    print("-" * 75)
+    for r in current["results"]:
+        before = old.get((r["case"], r["length"], r["corpus"]))
+        if not before:
+            continue
+        change = r["msgs_per_sec"] / before["msgs_per_sec"] - 1
+        flag = "  ❌" if change < -max_regression else ""
+        print(f"{r['case']:>15} | {r['length']:>8} | {r['corpus']:>6} | {before['msgs_per_sec']:>12,.0f} | "
+              f"{r['msgs_per_sec']:>12,.0f} | {change:>+7.1%}{flag}")
+        if flag:
+            regressions.append(f"{r['case']}/{r['length']}/{r['corpus']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de AxioDefender")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[8, 64, 512], help="Palabras por mensaje")
+    parser.add_argument("--corpus", type=int, nargs="+", default=[1000, 10000], help="Mensajes distintos")
+    parser.add_argument("--cases", nargs="+", help="Solo estos casos")
+    parser.add_argument("--min-seconds", type=float, default=0.3, help="Duración mínima por repetición")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por caso (se toma la más rápida)")
+    parser.add_argument("--judge-latency-ms", type=float, default=0.0, help="Latencia simulada del juez")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--compare", type=Path, help="JSON de una ejecución anterior")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Pérdida de msgs/s tolerada frente a --compare (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    # La referencia se lee antes de escribir: con --compare apuntando a
+    # --output (el valor por defecto) se compararía la ejecución consigo misma
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    config = load_config()
+    config.setdefault("security", {})["use_llm_judge"] = True
+    judge = StubJudge(args.judge_latency_ms)
+
+    results = []
+    print(f"{'caso':>15} | {'palabras':>8} | {'corpus':>6} | {'msgs/s':>12} | {'p50 µs':>8} | "
+          f"{'p99 µs':>8} | {'pico KiB':>8}")
+    print("-" * 82)
+    # log_evento imprime en cada evaluación: se mide, pero sin llenar la consola
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        for corpus_size in args.corpus:
+            for length in args.lengths:
+                with redirect_stdout(devnull):
+                    defender = AxioDefender(llm_client=judge, config=config)
+                patterns = defender.PATRONES_CAE + defender.PATRONES_FSA + defender.PATRONES_MME
+                messages = build_corpus(corpus_size, length, patterns, args.seed)
+                with redirect_stdout(devnull):
+                    functions = cases(defender, messages)
+                for name, fn in functions.items():
+                    if args.cases and name not in args.cases:
+                        continue
+                    with redirect_stdout(devnull):
+                        stats = measure(fn, messages, args.min_seconds, args.repeat)
+                    results.append({"case": name, "length": length, "corpus": corpus_size, **stats})
+                    print(f"{name:>15} | {length:>8} | {corpus_size:>6} | {stats['msgs_per_sec']:>12,.0f} | "
+                          f"{stats['p50_us']:>8.1f} | {stats['p99_us']:>8.1f} | {stats['peak_kib']:>8.1f}")
+
+    report = {
+        "benchmark": "defender",
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+        "results": results
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Resultados guardados en {args.output}")
+
+    if previous is not None:
+        regressions = compare(report, previous, args.max_regression)
+        if regressions:
+            print(f"\n❌ Regresiones de más del {args.max_regression:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ Sin regresiones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: batalla intercalada vs agrupada por modelo (model affinity)
+
+Ejecuta las mismas rondas creativas (DeepSeek genera, Mistral juzga) en los
+dos modos de src/battle.py y compara tiempo total y cambios de modelo en el
+backend. Requiere LM Studio con ambos modelos de config/config.json.
+
+Uso:
+    python bench_model_affinity.py [--rounds 12] [--window 6]
+"""
+
+import argparse
+
+from src.attacker import AdvancedAttacker
+from src.battle import RoundSpec, compare_modes
+from src.defender import AxioDefender
+from src.llm_client import create_client_from_config
+from src.scheduler import configure_schedulers
+from src.utils import load_config
+
+DIFICULTADES = ["directo y obvio", "sutil pero detectable", "extremadamente sutil y creativo"]
+AMENAZAS = ["CAE", "FSA", "CAE", "FSA", "CAE", "MME"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Intercalado vs model affinity")
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--window", type=int, default=6)
+    args = parser.parse_args()
+
+    config = load_config()
+    configure_schedulers(config.get('scheduler'))
+
+    defender_llm = create_client_from_config(config['defender'])
+    attacker_llm = create_client_from_config(config['attacker'])
+    if not defender_llm.is_available():
+        print("❌ LM Studio no disponible")
+        return
+
+    attacker = AdvancedAttacker(llm_client=attacker_llm)
+
+    # Sin filtro rápido: cada ronda pasa por el juez, que es lo que se mide
+    judge_config = dict(config, security=dict(config.get('security', {}), use_fast_filter=False))
+
+    specs = [
+        RoundSpec(threat=AMENAZAS[i % len(AMENAZAS)], creative=True,
+                  instruction=f"Dificultad: {DIFICULTADES[i % len(DIFICULTADES)]}.")
+        for i in range(args.rounds)
+    ]
+
+    results = compare_modes(
+        attacker,
+        lambda: AxioDefender(llm_client=defender_llm, config=judge_config),
+        specs,
+        window=args.window
+    )
+
+    print(f"\n{'modo':>16} | {'tiempo (s)':>10} | {'cambios modelo':>14} | {'bypass':>6}")
+    print("-" * 58)
+    for mode, r in results.items():
+        print(f"{mode:>16} | {r['wall_time']:>10.2f} | {r['model_swaps']:>14} | {r['bypass_rate']:>6.0%}")
+
+    base = results["interleaved"]
+    grouped = results["model_affinity"]
+    if grouped["wall_time"] > 0:
+        print(f"\nSpeedup model affinity: {base['wall_time'] / grouped['wall_time']:.2f}x "
+              f"({base['model_swaps']} → {grouped['model_swaps']} cambios de modelo)")
+
+
+if __name__ == "__main__":
+    main()
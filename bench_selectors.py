@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: bypasses encontrados por llamada al LLM con pesos fijos frente al
+selector adaptativo (bandido) del ataque automático
+
+Ejecuta el mismo número de rondas con cada selector de src/bandit.py contra
+un defensor nuevo. Sin --llm el defensor solo usa el filtro rápido y cada
+ronda cuenta como una evaluación.
+
+Uso:
+    python bench_selectors.py [--rounds 300] [--methods fixed thompson ucb] [--llm]
+                              [--dedupe skip|reroll]
+"""
+
+import argparse
+
+from src.attacker import AdvancedAttacker
+from src.battle import compare_selectors
+from src.defender import AxioDefender
+from src.llm_client import create_client_from_config
+from src.scheduler import configure_schedulers
+from src.dataset_integration import configure_datasets
+from src.utils import load_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pesos fijos vs bandido en el ataque automático")
+    parser.add_argument("--rounds", type=int, default=300)
+    parser.add_argument("--methods", nargs="+", default=["fixed", "thompson", "ucb"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm", action="store_true", help="Usar el LLM juez del defensor")
+    parser.add_argument("--dedupe", choices=["skip", "reroll", "allow"],
+                        help="Deduplicar ataques con esta política (casi-duplicados incluidos)")
+    args = parser.parse_args()
+
+    config = load_config()
+    configure_schedulers(config.get('scheduler'))
+    configure_datasets(config.get('datasets'))
+
+    defender_llm = None
+    if args.llm:
+        defender_llm = create_client_from_config(config['defender'])
+        if not defender_llm.is_available():
+            print("❌ LM Studio no disponible")
+            return
+
+    attacker = AdvancedAttacker(seed=args.seed)
+    results = compare_selectors(
+        attacker,
+        lambda: AxioDefender(llm_client=defender_llm, config=config),
+        args.rounds,
+        methods=args.methods,
+        seed=args.seed,
+        dedupe_config={"enabled": True, "policy": args.dedupe, "near_duplicates": True} if args.dedupe else None
+    )
+
+    print(f"\n{'selector':>10} | {'rondas':>6} | {'repetidas':>9} | {'bypasses':>8} | "
+          f"{'llamadas LLM':>12} | {'bypass/llamada':>14}")
+    print("-" * 76)
+    for method, r in results.items():
+        print(f"{method:>10} | {r['total']:>6} | {r['deduped']:>9} | {r['permitted']:>8} | {r['llm_calls']:>12} | "
+              f"{r['bypasses_per_llm_call']:>14.3f}")
+
+    if "fixed" in results and results["fixed"]["bypasses_per_llm_call"] > 0:
+        base = results["fixed"]["bypasses_per_llm_call"]
+        for method, r in results.items():
+            if method != "fixed":
+                print(f"\n{method}: {r['bypasses_per_llm_call'] / base:.2f}x bypasses por llamada frente a pesos fijos")
+
+
+if __name__ == "__main__":
+    main()
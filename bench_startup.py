@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: tiempo de arranque de los puntos de entrada (presupuesto de regresión)
+
+Para cada punto de entrada importa el módulo en un intérprete nuevo con
+`python -X importtime`, suma el tiempo acumulado de sus imports y muestra
+los más pesados. Falla (código de salida 1) si alguno supera su presupuesto
+o carga una dependencia pesada que no necesita para arrancar (`datasets`,
+pandas, pyarrow solo se importan al descargar el dataset; rich solo con el
+dashboard).
+
+El último caso mide de punta a punta una ejecución solo con filtro rápido:
+arrancar, crear atacante y defensor sin LLM y evaluar un ataque.
+
+Uso:
+    python bench_startup.py [--runs 3] [--top 8] [--scale 1.0]
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+HEAVY_MODULES = ("datasets", "pyarrow", "pandas", "fsspec", "rich", "numpy")
+
+# (módulo, presupuesto ms de imports, módulos pesados permitidos)
+ENTRY_POINTS = [
+    ("main", 400, ()),
+    ("advanced_battle", 400, ()),
+    ("quick_demo", 400, ()),
+    ("bench_selectors", 400, ()),
+    ("src.realtime_dashboard", 500, ("rich",)),
+    ("evaluate_defender", 500, ("numpy",)),
+]
+
+FAST_FILTER_SCRIPT = """
+from src.attacker import AdvancedAttacker, AttackStrategy
+from src.defender import AxioDefender
+from src.utils import load_config
+attack = AdvancedAttacker(seed=0).generate_attack(AttackStrategy.DIRECT, "CAE")
+AxioDefender(llm_client=None, config=load_config()).evaluate(attack.content)
+"""
+FAST_FILTER_BUDGET_MS = 700
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module: str) -> Tuple[float, Dict[str, int], List[Tuple[int, str]]]:
+    """
+    Importa `module` con -X importtime en un proceso nuevo
+
+    Returns:
+        (ms acumulados del módulo, µs acumulados por paquete de primer nivel,
+         [(µs acumulados, módulo)] de los imports directos del módulo)
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} falló:\n{result.stderr[-2000:]}")
+
+    total = 0
+    packages: Dict[str, int] = {}
+    children: List[Tuple[int, str]] = []
+    # importtime escribe los hijos antes que el padre: los imports directos
+    # del módulo son las líneas de nivel 2 desde la anterior de nivel 1
+    pending: List[Tuple[int, str]] = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        top = name.split(".")[0]
+        packages[top] = max(packages.get(top, 0), cumulative)
+        if indent == 1:
+            if name == module:
+                total, children = cumulative, pending
+            pending = []
+        elif indent == 3:
+            pending.append((cumulative, name))
+    return total / 1000, packages, sorted(children, reverse=True)
+
+
+def wall_time(script: str) -> float:
+    """Tiempo de pared (ms) de `python -c script` en un proceso nuevo"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", script], check=True, capture_output=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Presupuesto de tiempo de arranque por punto de entrada")
+    parser.add_argument("--runs", type=int, default=3, help="Repeticiones (se toma la mediana)")
+    parser.add_argument("--top", type=int, default=8, help="Imports directos más pesados a mostrar")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiplica los presupuestos (máquinas lentas o CI)")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'punto de entrada':>24} | {'imports (ms)':>12} | {'presupuesto':>11} | pesados")
+    print("-" * 72)
+    for module, budget, allowed in ENTRY_POINTS:
+        profiles = [import_profile(module) for _ in range(max(1, args.runs))]
+        total = statistics.median(p[0] for p in profiles)
+        packages, children = profiles[-1][1], profiles[-1][2]
+        heavy = [m for m in HEAVY_MODULES if m in packages and m not in allowed]
+        budget *= args.scale
+
+        status = "OK" if total <= budget and not heavy else "FALLA"
+        print(f"{module:>24} | {total:>12.0f} | {budget:>11.0f} | {', '.join(heavy) or '-'}  {status}")
+        for cumulative, name in children[:args.top]:
+            print(f"{'':>26}{cumulative / 1000:>8.1f} ms  {name}")
+        if status != "OK":
+            failures.append(module)
+
+    runs = [wall_time(FAST_FILTER_SCRIPT) for _ in range(max(1, args.runs))]
+    fast = statistics.median(runs)
+    budget = FAST_FILTER_BUDGET_MS * args.scale
+    status = "OK" if fast <= budget else "FALLA"
+    print(f"\nEjecución solo filtro rápido (proceso completo): {fast:.0f} ms "
+          f"(presupuesto {budget:.0f} ms) {status}")
+    if status != "OK":
+        failures.append("filtro rápido")
+
+    if failures:
+        print(f"\n❌ Fuera de presupuesto: {', '.join(failures)}")
+        sys.exit(1)
+    print("\n✅ Todos los puntos de entrada dentro de presupuesto")
+
+
+if __name__ == "__main__":
+    main()
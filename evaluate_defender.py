@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Evaluación del defensor sobre corpus etiquetados (src/evaluation.py)
+
+Corpus: el dataset de ejemplo (amenaza según su categoría), ataques
+generados por cada estrategia y amenaza, y controles benignos. Cada mensaje
+se evalúa con el vector vacío. Informa matriz de confusión, precisión y
+recall por amenaza, detección ataque/benigno, bypass y desgloses por
+estrategia y sutileza. Con --from-db evalúa las decisiones guardadas en
+SQLite (query_results.py) en vez de ejecutar el defensor.
+
+Uso:
+    python evaluate_defender.py [--per-combination 20] [--benign 200] [--llm] [--seed 0]
+                                [--from-db data/results.db [--run ID]]
+                                [--output bench_results/evaluation.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from src.attacker import AdvancedAttacker, AttackStrategy
+from src.corpus import load_corpus
+from src.dataset_integration import configure_datasets, dataset_manager, initialize_datasets
+from src.defender import AxioDefender
+from src.evaluation import (LABELS, PREDICTIONS, DecisionLog, attack_messages, benign_messages,
+                            dataset_messages, evaluate_messages)
+from src.llm_client import create_client_from_config
+from src.scheduler import configure_schedulers
+from src.utils import load_config
+
+
+def print_report(log: DecisionLog, metrics_ms: float):
+    summary = log.summary()
+    d = summary["detection"]
+    print(f"\n📊 {d['messages']} mensajes: {d['attacks']} ataques, {d['benign']} benignos "
+          f"(métricas en {metrics_ms:.1f} ms)")
+    print(f"   Detección: precisión {d['precision']:.1%}, recall {d['recall']:.1%}, F1 {d['f1']:.2f}")
+    print(f"   Bypass {d['bypass_rate']:.1%} | falsos positivos {d['false_positive_rate']:.1%} | "
+          f"benignos no permitidos {d['blocked_benign']}")
+
+    print(f"\n{'esperada / detectada':>20} | " + " | ".join(f"{p:>6}" for p in PREDICTIONS))
+    print("-" * (23 + 9 * len(PREDICTIONS)))
+    for label, row in zip(LABELS, summary["confusion_matrix"]["matrix"]):
+        print(f"{label:>20} | " + " | ".join(f"{v:>6}" for v in row))
+
+    print(f"\n{'amenaza':>10} | {'precisión':>9} | {'recall':>7} | {'F1':>5} | {'casos':>6}")
+    print("-" * 50)
+    for label, m in summary["classes"].items():
+        print(f"{label:>10} | {m['precision']:>9.1%} | {m['recall']:>7.1%} | {m['f1']:>5.2f} | {m['support']:>6}")
+
+    for column, title in (("by_strategy", "estrategia"), ("by_subtlety", "sutileza")):
+        print(f"\n{title:>28} | {'mensajes':>8} | {'bypass':>7} | {'detección':>9} | {'prec. amen.':>11} | "
+              f"{'rec. amen.':>10}")
+        print("-" * 92)
+        for name, g in sorted(summary[column].items(), key=lambda item: -item[1]["bypass_rate"]):
+            print(f"{name:>28} | {g['messages']:>8} | {g['bypass_rate']:>7.1%} | {g['detection_recall']:>9.1%} | "
+                  f"{g['threat_precision']:>11.1%} | {g['threat_recall']:>10.1%}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluación del defensor con matrices de confusión")
+    parser.add_argument("--per-combination", type=int, default=20, help="Ataques por (estrategia, amenaza)")
+    parser.add_argument("--benign", type=int, default=200, help="Controles benignos")
+    parser.add_argument("--llm", action="store_true", help="Usar el LLM juez de config")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--from-db", type=Path, help="Evaluar decisiones guardadas en SQLite")
+    parser.add_argument("--run", help="Con --from-db, solo esta ejecución")
+    parser.add_argument("--output", type=Path, help="Guardar las métricas en JSON")
+    args = parser.parse_args()
+
+    if args.from_db:
+        conn = sqlite3.connect(f"file:{args.from_db}?mode=ro", uri=True)
+        log = DecisionLog.from_results(conn, args.run)
+        conn.close()
+    else:
+        config = load_config()
+        configure_schedulers(config.get('scheduler'))
+        configure_datasets(config.get('datasets'))
+        judge = None
+        if args.llm:
+            judge = create_client_from_config(config['defender'])
+            if not judge.is_available():
+                print("❌ LM Studio no disponible")
+                return
+
+        rng = random.Random(args.seed)
+        with open(os.devnull, "w", encoding="utf-8") as devnull, redirect_stdout(devnull):
+            initialize_datasets()
+            strategies = [s for s in AttackStrategy if load_corpus().get(s.value)] + [AttackStrategy.MUTATION]
+            messages = attack_messages(AdvancedAttacker(seed=args.seed), args.per_combination, strategies)
+            for name, items in dataset_manager.local_data.items():
+                messages += dataset_messages(items, source=name)
+            messages += benign_messages(args.benign, rng)
+            rng.shuffle(messages)
+
+            defender = AxioDefender(llm_client=judge, config=config)
+            start = time.perf_counter()
+            log = evaluate_messages(defender, messages)
+            elapsed = time.perf_counter() - start
+        print(f"⚔️  {len(log)} mensajes evaluados en {elapsed:.2f}s")
+
+    if not len(log):
+        print("Sin decisiones que evaluar")
+        return
+
+    start = time.perf_counter()
+    log.summary()
+    metrics_ms = (time.perf_counter() - start) * 1000
+    summary = print_report(log, metrics_ms)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,12 @@ Sistema de prueba: Atacante vs Defensor AXIO
 
 import sys
 import io
-from src.llm_client import LLMClient, create_client_from_config
-from src.defender import AxioDefender
+from src.llm_client import LLMClient, Warmup, create_client_from_config
+from src.defender import AxioDefender, JUDGE_SYSTEM_PROMPT
 from src.attacker import AdvancedAttacker, AttackStrategy
 from src.utils import load_config, log_evento
+from src.scheduler import configure_schedulers
+from src.dataset_integration import configure_datasets
 from colorama import init, Fore, Style
 
 # Configurar encoding para Windows
@@ -21,6 +23,36 @@ if sys.platform == 'win32':
 init(autoreset=True)
 
 
+# Warmup de modelos lanzado al arrancar el menú (ver start_warmup)
+_warmup = None
+
+
+def start_warmup():
+    """Lanza en segundo plano el warmup de los modelos de atacante y defensor"""
+    global _warmup
+    config = load_config()
+    if not config.get('warmup', {}).get('enabled', False):
+        return
+
+    configure_schedulers(config.get('scheduler'))
+    targets = []
+    try:
+        targets.append((create_client_from_config(config['defender']), JUDGE_SYSTEM_PROMPT))
+        targets.append((create_client_from_config(config['attacker']), None))
+    except KeyError:
+        pass
+    _warmup = Warmup(targets)
+
+
+def report_warmup():
+    """Espera al warmup (si lo hay) y muestra su tiempo, separado de la ejecución"""
+    global _warmup
+    if _warmup is None:
+        return
+    print(f"{Fore.YELLOW}{_warmup.report()}{Style.RESET_ALL}\n")
+    _warmup = None
+
+
 def print_banner():
     """Imprime el banner del proyecto"""
     banner = f"""
@@ -180,6 +212,8 @@ def test_with_llm():
     if not config:
         print(f"{Fore.RED}❌ Error: No se pudo cargar la configuración{Style.RESET_ALL}")
         return
+    configure_schedulers(config.get('scheduler'))
+    configure_datasets(config.get('datasets'))
 
     # Crear cliente LLM
     print(f"{Fore.CYAN}Conectando con LM Studio...{Style.RESET_ALL}")
@@ -203,6 +237,8 @@ def test_with_llm():
     # Crear atacante
     attacker = AdvancedAttacker()
 
+    report_warmup()
+
     # Probar ataques parafraseados (difíciles de detectar con filtros)
     print(f"{Fore.MAGENTA}Probando ataques parafraseados...{Style.RESET_ALL}\n")
 
@@ -246,6 +282,8 @@ def test_realtime_dashboard():
     if not config:
         print(f"{Fore.RED}❌ Error: No se pudo cargar la configuración{Style.RESET_ALL}")
         return
+    configure_schedulers(config.get('scheduler'))
+    configure_datasets(config.get('datasets'))
 
     # Verificar LLM para defensor
     print(f"{Fore.CYAN}Verificando LLM para defensor...{Style.RESET_ALL}")
@@ -275,6 +313,8 @@ def test_realtime_dashboard():
         print(f"{Fore.YELLOW}⚠️  Error LLM Atacante: {e} - Modo sin LLM{Style.RESET_ALL}")
         attacker_llm = None
 
+    report_warmup()
+
     print(f"\n{Fore.MAGENTA}Iniciando Dashboard...{Style.RESET_ALL}")
     print(f"{Fore.CYAN}Presiona las teclas mostradas para controlar{Style.RESET_ALL}")
     print(f"{Fore.CYAN}S=Iniciar/Detener ataques, M=Manual, R=Reset, Q=Salir{Style.RESET_ALL}\n")
@@ -304,6 +344,7 @@ def test_realtime_dashboard():
 def main_menu():
     """Menú principal"""
     print_banner()
+    start_warmup()
 
     while True:
         print(f"\n{Fore.CYAN}{'─'*70}")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Consultas sobre los resultados guardados en SQLite (src/results_store.py)
+
+Uso:
+    python query_results.py runs [--limit 20]
+    python query_results.py bypass [--by strategy|threat|action|detected|run_id] [--run ID]
+    python query_results.py latency [--by strategy] [--run ID]
+
+--db elige el fichero (por defecto el de "logging.db_path" en config.json).
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from src.results_store import DEFAULT_DB_PATH, GROUP_COLUMNS, bypass_rate, latency_percentiles, list_runs
+from src.utils import load_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas sobre los resultados de batallas y sesiones")
+    parser.add_argument("--db", help="Fichero SQLite")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runs = commands.add_parser("runs", help="Últimas ejecuciones")
+    runs.add_argument("--limit", type=int, default=20)
+
+    bypass = commands.add_parser("bypass", help="Tasa de bypass por grupo")
+    bypass.add_argument("--by", choices=GROUP_COLUMNS, default="strategy")
+    bypass.add_argument("--run", help="Solo esta ejecución")
+
+    latency = commands.add_parser("latency", help="Percentiles de latencia")
+    latency.add_argument("--by", choices=GROUP_COLUMNS)
+    latency.add_argument("--run", help="Solo esta ejecución")
+    args = parser.parse_args()
+
+    path = args.db or load_config().get("logging", {}).get("db_path", DEFAULT_DB_PATH)
+    if not Path(path).exists():
+        print(f"❌ No existe {path}: activa logging.save_conversations y ejecuta una batalla")
+        sys.exit(1)
+
+    # Solo lectura: no crea tablas ni compite con un escritor activo
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+    if args.command == "runs":
+        rows = list_runs(conn, args.limit)
+    elif args.command == "bypass":
+        rows = bypass_rate(conn, args.by, args.run)
+    else:
+        rows = latency_percentiles(conn, args.by, args.run)
+    conn.close()
+
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+    if not rows:
+        print("Sin resultados")
+        return
+
+    if args.command == "runs":
+        print(f"{'ejecución':<26} | {'origen':<16} | {'inicio':<19} | {'ataques':>7} | {'bypass':>7}")
+        print("-" * 86)
+        for r in rows:
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r["started"]))
+            print(f"{r['run_id']:<26} | {r['source']:<16} | {started:<19} | {r['attacks']:>7} | {r['bypass_rate']:>7.1%}")
+    elif args.command == "bypass":
+        print(f"{args.by:>20} | {'ataques':>7} | {'bloq.':>6} | {'vigil.':>6} | {'perm.':>6} | {'bypass':>7}")
+        print("-" * 69)
+        for r in rows:
+            print(f"{str(r[args.by]):>20} | {r['attacks']:>7} | {r['blocked']:>6} | {r['watched']:>6} | "
+                  f"{r['permitted']:>6} | {r['bypass_rate']:>7.1%}")
+    else:
+        key = args.by or "group"
+        print(f"{key:>20} | {'ataques':>7} | {'p50 ms':>8} | {'p90 ms':>8} | {'p99 ms':>8}")
+        print("-" * 62)
+        for r in rows:
+            print(f"{str(r[key]):>20} | {r['attacks']:>7} | {r['p50'] * 1000:>8.1f} | {r['p90'] * 1000:>8.1f} | "
+                  f"{r['p99'] * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,11 @@ Demo rápida del sistema ART con análisis en tiempo real
 
 import sys
 import io
-from src.llm_client import create_client_from_config
-from src.defender import AxioDefender
+from src.llm_client import create_client_from_config, Warmup
+from src.defender import AxioDefender, JUDGE_SYSTEM_PROMPT
 from src.attacker import AdvancedAttacker, AttackStrategy
 from src.utils import load_config
+from src.scheduler import configure_schedulers
 from colorama import init, Fore, Style
 
 if sys.platform == 'win32':
@@ -23,11 +24,17 @@ def demo_rapida():
     print(f"{'='*70}{Style.RESET_ALL}\n")
 
     config = load_config()
+    configure_schedulers(config.get('scheduler'))
 
     # Solo usar Mistral para defensa (más rápido)
     print(f"{Fore.YELLOW}Cargando Mistral 7B...{Style.RESET_ALL}")
     llm = create_client_from_config(config['defender'])
 
+    # Warmup en segundo plano mientras sigue la inicialización
+    warmup = None
+    if config.get('warmup', {}).get('enabled', False):
+        warmup = Warmup([(llm, JUDGE_SYSTEM_PROMPT)])
+
     if llm.is_available():
         print(f"{Fore.GREEN}OK - Modelo cargado: {config['defender']['name']}{Style.RESET_ALL}\n")
     else:
@@ -37,6 +44,9 @@ def demo_rapida():
     # Crear defensor con LLM
     defender = AxioDefender(llm_client=llm, config=config)
 
+    if warmup:
+        print(f"{Fore.YELLOW}{warmup.report()}{Style.RESET_ALL}\n")
+
     # Ataques predefinidos (sin generar con LLM para ser más rápido)
     ataques_test = [
         {
@@ -74,6 +84,8 @@ def demo_rapida():
     print(f"{Fore.MAGENTA}Ejecutando {len(ataques_test)} pruebas...{Style.RESET_ALL}\n")
 
     stats = {'total': 0, 'bloqueados': 0, 'vigilados': 0, 'permitidos': 0}
+    from src.evaluation import BENIGN, DecisionLog  # import diferido: NumPy fuera del arranque
+    log = DecisionLog()
 
     for i, ataque in enumerate(ataques_test, 1):
         print(f"{Fore.YELLOW}{'─'*70}")
@@ -108,6 +120,7 @@ def demo_rapida():
                 print(f"  {Fore.RED}✗ Falso positivo{Style.RESET_ALL}")
 
         # Stats
+        log.add(BENIGN if ataque['tipo'] == "LEGÍTIMO" else ataque['tipo'], decision.threat_type, decision.action)
         stats['total'] += 1
         if decision.action == "BLOQUEAR":
             stats['bloqueados'] += 1
@@ -133,8 +146,10 @@ def demo_rapida():
     print(f"  Vector final: {state['vector']}")
     print(f"  Riesgo acumulado: {state['risk_score']:.1%}")
 
-    effectiveness = (stats['bloqueados'] + stats['vigilados']) / stats['total'] * 100
-    print(f"\n{Fore.MAGENTA}Efectividad de detección: {effectiveness:.1f}%{Style.RESET_ALL}")
+    detection = log.detection()
+    print(f"\n{Fore.MAGENTA}Detección de ataques: {detection['recall']:.1%} "
+          f"(precisión {detection['precision']:.1%}){Style.RESET_ALL}")
+    print(f"{Fore.MAGENTA}Falsos positivos en controles: {detection['false_positive_rate']:.1%}{Style.RESET_ALL}")
 
     print(f"\n{Fore.GREEN}{'='*70}")
     print(f"   Demo completada!")
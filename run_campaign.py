@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Campaña: muchas batallas independientes en paralelo con un informe agregado
+
+Cada batalla tiene su atacante y su defensor (vector de estado propio) y una
+semilla derivada de --seed y de su número, así que sin LLM el resumen es
+idéntico entre ejecuciones sea cual sea --workers. Con --llm todas las
+batallas comparten los clientes LLM (single-flight, cachés y el límite de
+concurrencia del planificador de cada backend).
+
+Uso:
+    python run_campaign.py [--battles 32] [--rounds 50] [--workers 4] [--seed 0]
+                           [--llm] [--creative 0.2] [--window 1]
+                           [--output bench_results/campaign.json]
+"""
+
+import argparse
+import json
+import os
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from src.attacker import AdvancedAttacker, AttackStrategy
+from src.battle import BattleMode, run_campaign
+from src.corpus import load_corpus
+from src.dataset_integration import configure_datasets, dataset_manager, initialize_datasets
+from src.defender import AxioDefender
+from src.llm_client import create_client_from_config
+from src.results_store import ResultsStore
+from src.scheduler import configure_schedulers
+from src.utils import load_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batallas independientes en paralelo")
+    parser.add_argument("--battles", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=50, help="Rondas por batalla")
+    parser.add_argument("--workers", type=int, default=4, help="Batallas simultáneas")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm", action="store_true", help="Usar los LLM de config (atacante y juez)")
+    parser.add_argument("--creative", type=float, default=0.2,
+                        help="Fracción de rondas creativas por LLM (solo con --llm)")
+    parser.add_argument("--window", type=int, default=1, help="1 = INTERLEAVED, >1 = MODEL_AFFINITY")
+    parser.add_argument("--output", type=Path, help="Guardar resumen y tiempos en JSON")
+    args = parser.parse_args()
+
+    config = load_config()
+    configure_schedulers(config.get('scheduler'))
+    configure_datasets(config.get('datasets'))
+
+    attacker_llm = defender_llm = None
+    if args.llm:
+        attacker_llm = create_client_from_config(config['attacker'])
+        defender_llm = create_client_from_config(config['defender'])
+        if not (attacker_llm.is_available() and defender_llm.is_available()):
+            print("❌ LM Studio no disponible")
+            return
+
+    # Antes de lanzar hilos: la primera ronda DATASET no paga la carga ni los índices dentro de una batalla
+    initialize_datasets()
+    dataset_manager.build_indexes()
+    strategies = [s for s in AttackStrategy if load_corpus().get(s.value)]
+    strategies += [s for s in (AttackStrategy.MUTATION, AttackStrategy.DATASET) if s not in strategies]
+
+    # Con logging.save_conversations cada batalla se guarda en SQLite (query_results.py)
+    store = ResultsStore.from_config(config.get('logging'))
+
+    print(f"⚔️  {args.battles} batallas x {args.rounds} rondas con {args.workers} hilos...")
+    # Cada evaluación imprime su log: en paralelo solo sería ruido entremezclado
+    with open(os.devnull, "w", encoding="utf-8") as devnull, redirect_stdout(devnull):
+        report = run_campaign(
+            lambda seed: AdvancedAttacker(llm_client=attacker_llm, seed=seed),
+            lambda: AxioDefender(llm_client=defender_llm, config=config),
+            args.battles,
+            args.rounds,
+            strategies,
+            workers=args.workers,
+            seed=args.seed,
+            creative_share=args.creative if args.llm else 0.0,
+            mode=BattleMode.INTERLEAVED if args.window <= 1 else BattleMode.MODEL_AFFINITY,
+            window=args.window,
+            store=store
+        )
+    if store is not None:
+        store.close()
+
+    summary = report.summary()
+    timing = report.timing()
+    print(f"\n📊 {summary['rounds']} rondas: {summary['blocked']} bloqueadas, {summary['watched']} vigiladas, "
+          f"{summary['permitted']} permitidas (bypass {summary['bypass_rate']:.1%})")
+    print(f"\n{'amenaza':>18} | {'rondas':>6} | {'bypass':>7}")
+    print("-" * 37)
+    for name, r in list(summary["by_threat"].items()) + list(summary["by_strategy"].items()):
+        print(f"{name:>18} | {r['rounds']:>6} | {r['bypass_rate']:>7.1%}")
+    print(f"\n⏱️  {timing['wall_time']:.2f}s, {timing['rounds_per_sec']:.1f} rondas/s, "
+          f"{timing['llm_calls']} llamadas LLM, latencia p50 {timing['latency_p50'] * 1000:.0f}ms "
+          f"p99 {timing['latency_p99'] * 1000:.0f}ms")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "args": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+                "summary": summary,
+                "timing": timing
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
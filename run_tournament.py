@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Torneo sin dashboard: atacantes contra defensores con clasificación en vivo
+
+Usa la matriz por defecto de src/tournament.py (familias de estrategia contra
+juegos de umbrales, con y sin juez LLM) y la sección "tournament" de
+config.json. Imprime una línea por partido terminado y las clasificaciones
+finales.
+
+Uso:
+    python run_tournament.py [--rounds 30] [--legs 2] [--workers 4] [--seed 0]
+                             [--llm] [--output bench_results/tournament.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from src.dataset_integration import configure_datasets, dataset_manager, initialize_datasets
+from src.llm_client import create_client_from_config
+from src.scheduler import configure_schedulers
+from src.tournament import create_tournament
+from src.utils import load_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Torneo atacantes contra defensores")
+    parser.add_argument("--rounds", type=int, help="Rondas por partido")
+    parser.add_argument("--legs", type=int, help="Partidos por emparejamiento")
+    parser.add_argument("--workers", type=int, help="Partidos simultáneos")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--llm", action="store_true", help="Añadir el atacante creativo y el juez de config")
+    parser.add_argument("--output", type=Path, help="Guardar clasificaciones y matriz en JSON")
+    args = parser.parse_args()
+
+    config = load_config()
+    configure_schedulers(config.get('scheduler'))
+    configure_datasets(config.get('datasets'))
+
+    attacker_llm, judges = None, []
+    if args.llm:
+        attacker_llm = create_client_from_config(config['attacker'])
+        judge = create_client_from_config(config['defender'])
+        if not (attacker_llm.is_available() and judge.is_available()):
+            print("❌ LM Studio no disponible")
+            return
+        judges.append(judge)
+
+    overrides = {k: getattr(args, k) for k in ("rounds", "legs", "workers", "seed") if getattr(args, k) is not None}
+    tournament = create_tournament(config, attacker_llm=attacker_llm, judge_llms=judges, **overrides)
+    initialize_datasets()
+    dataset_manager.build_indexes()
+
+    fixtures = len(tournament.fixtures())
+    print(f"🏆 {len(tournament.attackers)} atacantes x {len(tournament.defenders)} defensores, "
+          f"{fixtures} partidos con {tournament.workers} hilos\n")
+
+    def on_update(result, leaderboard):
+        leader = leaderboard.standings("attacker")[0]
+        wall = leaderboard.standings("defender")[0]
+        print(f"[{leaderboard.version:>3}/{fixtures}] {result.attacker} vs {result.defender} "
+              f"({result.elapsed:.2f}s) | líderes: {leader.name} {leader.bypass_rate:.0%} / "
+              f"{wall.name} {wall.bypass_rate:.0%}", file=sys.__stdout__)
+
+    # Los logs de cada evaluación se descartan; el progreso va a la consola real
+    with open(os.devnull, "w", encoding="utf-8") as devnull, redirect_stdout(devnull):
+        leaderboard = tournament.run(on_update)
+
+    for side, title in (("attacker", "ATACANTES (más bypass)"), ("defender", "DEFENSORES (menos bypass)")):
+        print(f"\n{title}")
+        for position, s in enumerate(leaderboard.standings(side), 1):
+            print(f"  {position:>2}. {s.name:<40} {s.rounds:>5} rondas  bypass {s.bypass_rate:>6.1%}")
+
+    stats = tournament.stats()
+    print(f"\n⏱️  {stats['wall_time']:.2f}s, {stats['rounds_per_sec']:.1f} rondas/s, "
+          f"caché del juez {stats['judge_cache_hit_rate']:.0%}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"leaderboard": leaderboard.to_dict(), "stats": stats}, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
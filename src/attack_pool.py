@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pool de ataques pre-generados por el LLM atacante
+
+La generación creativa (temperatura alta, cientos de tokens) es mucho más
+lenta que la evaluación del defensor. El pool mantiene una cola acotada de
+ataques listos por (amenaza, dificultad) que un hilo en segundo plano rellena
+cuando una cola baja de su marca mínima; las rondas solo hacen pop() y la
+batalla queda marcada por el ritmo del defensor. El relleno pide con
+Priority.BACKGROUND para no quitar slots del backend a las rondas en curso;
+solo cuando una ronda ya espera esa clave se genera con Priority.ATTACKER.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from src.attacker import CREATIVE_DESCRIPTION, AdvancedAttacker, AttackPrompt, AttackStrategy
+from src.scheduler import Priority
+from src.utils import log_evento
+
+PoolKey = Tuple[str, str]  # (amenaza, dificultad)
+
+
+class AttackPool:
+    """
+    Colas acotadas de ataques listos, rellenadas en segundo plano
+    """
+
+    def __init__(self, generate: Callable[[str, str, Priority], Union[AttackPrompt, List[AttackPrompt]]],
+                 keys: Iterable[PoolKey] = (),
+                 capacity: int = 4, low_watermark: int = 1, persist_path: Optional[str] = None,
+                 accept: Optional[Callable[[AttackPrompt], bool]] = None):
+        """
+        Args:
+            generate: Función (amenaza, dificultad, prioridad) -> AttackPrompt o
+                lista de AttackPrompt (generación por lotes)
+            keys: Claves a mantener llenas desde el arranque
+            capacity: Ataques máximos por cola
+            low_watermark: Al bajar hasta aquí la cola se rellena hasta `capacity`
+            persist_path: JSON donde guardar/recuperar las colas entre ejecuciones
+            accept: Filtro de lo que se encola al rellenar (p. ej. descartar
+                plantillas de respaldo); pop() sin ataques listos no lo aplica
+        """
+        self.generate = generate
+        self.capacity = max(1, capacity)
+        self.low_watermark = max(0, min(low_watermark, self.capacity - 1))
+        self.persist_path = persist_path
+        self.accept = accept
+
+        self._queues: Dict[PoolKey, deque] = {}
+        self._refill = set()  # claves por debajo de la marca, hasta llenarse
+        self._urgent = deque()  # claves con consumidores esperando
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.generated = 0
+        self.failures = 0
+        self.hits = 0
+        self.misses = 0
+
+        for key in keys:
+            self._ensure(key)
+
+    @classmethod
+    def for_attacker(cls, attacker: AdvancedAttacker, batch_size: int = 1, **kwargs) -> "AttackPool":
+        """
+        Pool que genera con el LLM del atacante
+
+        Args:
+            attacker: Atacante con cliente LLM
+            batch_size: Ataques por petición (>1 usa llm_creative_attacks)
+        """
+        # Si el LLM falla, llm_creative_attack(s) devuelve una plantilla: no se encola
+        kwargs.setdefault("accept", lambda attack: attack.description == CREATIVE_DESCRIPTION)
+        if batch_size > 1:
+            return cls(lambda threat, difficulty, priority: attacker.llm_creative_attacks(
+                threat, batch_size, difficulty=difficulty, priority=priority), **kwargs)
+        return cls(lambda threat, difficulty, priority: attacker.llm_creative_attack(
+            threat, difficulty=difficulty, priority=priority), **kwargs)
+
+    def _ensure(self, key: PoolKey) -> deque:
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            self._refill.add(key)
+        return queue
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self) -> "AttackPool":
+        """Carga las colas persistidas (si hay) y arranca el hilo de relleno"""
+        if self.persist_path:
+            self._load()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._refill_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """Detiene el relleno y persiste las colas"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.persist_path:
+            self._save()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Consumo
+    # ------------------------------------------------------------------
+
+    def pop(self, threat: str, difficulty: str = "medium", timeout: Optional[float] = None) -> AttackPrompt:
+        """
+        Retorna un ataque listo para (amenaza, dificultad)
+
+        Si la cola está vacía y el pool está en marcha se espera a que el
+        hilo de relleno genere uno (con prioridad sobre las demás claves);
+        si no está en marcha o vence `timeout`, se genera en el acto.
+        """
+        key = (threat, difficulty)
+        with self._cond:
+            queue = self._ensure(key)
+            if not queue and self._thread is not None and not self._stopping:
+                failures = self.failures
+                self._urgent.append(key)
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: queue or self._stopping or self.failures != failures, timeout)
+
+            if queue:
+                attack = queue.popleft()
+                self.hits += 1
+                if len(queue) <= self.low_watermark:
+                    self._refill.add(key)
+                    self._cond.notify_all()
+                return attack
+
+            self.misses += 1
+
+        attacks = _as_list(self.generate(threat, difficulty, Priority.ATTACKER))
+        if not attacks:
+            raise ValueError(f"El generador no produjo ningún ataque para {key}")
+        with self._cond:
+            queue.extend(attacks[1:])
+        return attacks[0]
+
+    def stats(self) -> Dict:
+        """Ataques listos por clave y contadores de aciertos/fallos"""
+        with self._cond:
+            return {
+                "ready": {f"{t}/{d}": len(q) for (t, d), q in self._queues.items()},
+                "generated": self.generated,
+                "failures": self.failures,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    # ------------------------------------------------------------------
+    # Relleno en segundo plano
+    # ------------------------------------------------------------------
+
+    def _next_key(self) -> Tuple[Optional[PoolKey], Priority]:
+        while self._urgent:
+            key = self._urgent.popleft()
+            if not self._queues[key]:
+                # Una ronda espera esta clave: compite como cualquier ataque
+                return key, Priority.ATTACKER
+
+        # La cola más vacía entre las que están por debajo de su marca
+        pending = [k for k in self._refill if len(self._queues[k]) < self.capacity]
+        self._refill.intersection_update(pending)
+        if not pending:
+            return None, Priority.BACKGROUND
+        return min(pending, key=lambda k: len(self._queues[k])), Priority.BACKGROUND
+
+    def _refill_loop(self):
+        while True:
+            with self._cond:
+                key, priority = self._next_key()
+                while key is None and not self._stopping:
+                    self._cond.wait()
+                    key, priority = self._next_key()
+                if self._stopping:
+                    return
+
+            try:
+                attacks = _as_list(self.generate(*key, priority))
+                if self.accept is not None:
+                    attacks = [a for a in attacks if self.accept(a)]
+            except Exception as e:
+                log_evento(f"❌ Error pre-generando ataque {key}: {e}", "ERROR")
+                attacks = []
+
+            with self._cond:
+                if attacks:
+                    self._queues[key].extend(attacks)
+                    self.generated += len(attacks)
+                else:
+                    # Sin reintentar en bucle contra un backend caído: la clave
+                    # vuelve a rellenarse en el próximo pop() y quien espera
+                    # genera en el acto
+                    self.failures += 1
+                    self._refill.discard(key)
+                if len(self._queues[key]) >= self.capacity:
+                    self._refill.discard(key)
+                self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    def _save(self):
+        with self._cond:
+            data = {
+                f"{threat}|{difficulty}": [_attack_to_dict(a) for a in queue]
+                for (threat, difficulty), queue in self._queues.items() if queue
+            }
+        # Fichero temporal y os.replace: un corte a mitad no deja un JSON truncado
+        path = Path(self.persist_path)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            log_evento(f"❌ No se pudo guardar el pool de ataques: {e}", "ERROR")
+            tmp.unlink(missing_ok=True)
+
+    def _load(self):
+        if not Path(self.persist_path).exists():
+            return
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            log_evento(f"⚠️  Pool de ataques persistido ilegible: {e}", "WARNING")
+            return
+
+        loaded = 0
+        with self._cond:
+            for raw_key, attacks in data.items():
+                threat, _, difficulty = raw_key.partition("|")
+                queue = self._ensure((threat, difficulty))
+                for item in attacks[:self.capacity - len(queue)]:
+                    queue.append(_attack_from_dict(item))
+                    loaded += 1
+                if len(queue) > self.low_watermark:
+                    self._refill.discard((threat, difficulty))
+        log_evento(f"📦 Pool de ataques: {loaded} ataques recuperados de {self.persist_path}", "INFO")
+
+
+def _as_list(result) -> List[AttackPrompt]:
+    """Normaliza la salida del generador a una lista de ataques con contenido"""
+    attacks = result if isinstance(result, list) else [result]
+    return [a for a in attacks if a is not None and a.content]
+
+
+def _attack_to_dict(attack: AttackPrompt) -> Dict:
+    return {
+        "content": attack.content,
+        "strategy": attack.strategy.value,
+        "expected_threat": attack.expected_threat,
+        "subtlety": attack.subtlety,
+        "description": attack.description
+    }
+
+
+def _attack_from_dict(data: Dict) -> AttackPrompt:
+    return AttackPrompt(
+        content=data["content"],
+        strategy=AttackStrategy(data["strategy"]),
+        expected_threat=data["expected_threat"],
+        subtlety=data["subtlety"],
+        description=data["description"]
+    )
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Selección adaptativa de (estrategia, amenaza) para el ataque automático
+
+Los pesos fijos de auto_attack_weights reparten las rondas igual aunque una
+estrategia nunca consiga un bypass. StrategyBandit trata cada par
+(estrategia, amenaza) como un brazo y aprende su tasa de bypass por unidad
+de coste (llamadas al LLM consumidas por la ronda):
+
+- thompson: muestrea la tasa de cada brazo de su Beta(1 + bypasses,
+  1 + bloqueos) y elige el mayor cociente tasa / coste medio
+- ucb: tasa observada + bonus de exploración sqrt(c·ln N / n), también
+  dividida entre el coste medio
+
+FixedWeightSelector expone la misma interfaz (select / update) sobre los
+pesos del corpus, para comparar ambos en src/battle.py.
+"""
+
+import math
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.corpus import AttackCorpus
+
+Arm = Tuple[str, str]  # (estrategia, amenaza)
+
+DEFAULT_EXPLORATION = 2.0
+MIN_COST = 1.0  # toda ronda cuesta al menos una evaluación del defensor
+
+
+def llm_calls(*clients) -> int:
+    """Peticiones hechas hasta ahora por los clientes LLM dados (sin repetir ni None)"""
+    seen = []
+    for client in clients:
+        if client is not None and all(client is not c for c in seen):
+            seen.append(client)
+    return sum(client.usage_stats()["requests"] for client in seen)
+
+
+def create_selector(corpus: AttackCorpus, method: str = "thompson",
+                    valid: Optional[Iterable[str]] = None, rng=None):
+    """
+    Crea el selector de la sección "auto_attack.selector" de config.json
+
+    Args:
+        corpus: Corpus cargado
+        method: "fixed", "thompson" o "ucb"
+        valid: Estrategias admitidas
+        rng: Generador aleatorio
+    """
+    if method == "fixed":
+        return FixedWeightSelector(corpus, valid=valid, rng=rng)
+    return StrategyBandit.from_corpus(corpus, valid=valid, method=method, rng=rng)
+
+
+class _ArmStats:
+    __slots__ = ("pulls", "bypasses", "cost", "skips")
+
+    def __init__(self):
+        self.pulls = 0
+        self.bypasses = 0
+        self.cost = 0.0
+        self.skips = 0
+
+    def mean_cost(self) -> float:
+        return self.cost / self.pulls if self.pulls else MIN_COST
+
+
+class _SelectorStats:
+    """Contadores comunes de selectores: rondas, bypasses y coste por brazo"""
+
+    def __init__(self, arms: Iterable[Arm]):
+        self.arms: List[Arm] = list(arms)
+        if not self.arms:
+            raise ValueError("El selector necesita al menos un brazo")
+        self._stats: Dict[Arm, _ArmStats] = {arm: _ArmStats() for arm in self.arms}
+
+    def update(self, arm: Arm, bypassed: bool, cost: float = MIN_COST):
+        """
+        Registra el resultado de una ronda
+
+        Args:
+            arm: Brazo jugado
+            bypassed: El defensor permitió el ataque
+            cost: Llamadas al LLM consumidas por la ronda
+        """
+        stats = self._stats[arm]
+        stats.pulls += 1
+        stats.bypasses += int(bypassed)
+        stats.cost += max(MIN_COST, cost)
+
+    def skipped(self, arm: Arm, cost: float = MIN_COST):
+        """
+        Registra una ronda descartada antes del defensor (ataque repetido)
+
+        Cuenta como jugada sin bypass: un brazo que solo produce duplicados
+        pierde puntuación en lugar de volver a elegirse indefinidamente.
+
+        Args:
+            arm: Brazo jugado
+            cost: Llamadas al LLM consumidas al generar el ataque descartado
+        """
+        self.update(arm, False, cost)
+        self._stats[arm].skips += 1
+
+    def summary(self) -> Dict:
+        """Totales y detalle por brazo (ordenado por bypasses)"""
+        pulls = sum(s.pulls for s in self._stats.values())
+        bypasses = sum(s.bypasses for s in self._stats.values())
+        cost = sum(s.cost for s in self._stats.values())
+        arms = sorted(
+            ({"strategy": strategy, "threat": threat, "pulls": s.pulls, "bypasses": s.bypasses,
+              "skips": s.skips, "bypass_rate": s.bypasses / s.pulls if s.pulls else 0.0}
+             for (strategy, threat), s in self._stats.items() if s.pulls),
+            key=lambda a: (a["bypasses"], a["bypass_rate"]), reverse=True
+        )
+        return {
+            "rounds": pulls,
+            "skipped": sum(s.skips for s in self._stats.values()),
+            "bypasses": bypasses,
+            "cost": cost,
+            "bypasses_per_call": bypasses / cost if cost else 0.0,
+            "arms": arms
+        }
+
+
+class StrategyBandit(_SelectorStats):
+    """
+    Bandido multibrazo sobre pares (estrategia, amenaza)
+    """
+
+    def __init__(self, arms: Iterable[Arm], method: str = "thompson",
+                 exploration: float = DEFAULT_EXPLORATION, rng=None):
+        """
+        Args:
+            arms: Pares (estrategia, amenaza) disponibles
+            method: "thompson" o "ucb"
+            exploration: Constante c del bonus UCB
+            rng: Generador aleatorio (por defecto uno propio)
+        """
+        super().__init__(arms)
+        if method not in ("thompson", "ucb"):
+            raise ValueError(f"Método de bandido desconocido: {method}")
+        self.method = method
+        self.exploration = exploration
+        self.rng = rng if rng is not None else random.Random()
+
+    @classmethod
+    def from_corpus(cls, corpus: AttackCorpus, valid: Optional[Iterable[str]] = None,
+                    **kwargs) -> "StrategyBandit":
+        """
+        Brazos = estrategias x amenazas con peso > 0 en auto_attack_weights
+
+        Args:
+            corpus: Corpus cargado
+            valid: Estrategias admitidas (p. ej. los valores de AttackStrategy)
+        """
+        valid = set(valid) if valid is not None else None
+        weights = corpus.auto_attack_weights
+        strategies = [s for s, w in weights.get("strategies", {}).items()
+                      if w > 0 and (valid is None or s in valid)]
+        threats = [t for t, w in weights.get("threats", {}).items() if w > 0]
+        return cls([(s, t) for s in strategies for t in threats], **kwargs)
+
+    def select(self) -> Arm:
+        """Elige el brazo a jugar en la siguiente ronda"""
+        # Cada brazo se prueba una vez antes de puntuar
+        untried = [arm for arm in self.arms if self._stats[arm].pulls == 0]
+        if untried:
+            return self.rng.choice(untried)
+
+        if self.method == "thompson":
+            def score(arm: Arm) -> float:
+                s = self._stats[arm]
+                sample = self.rng.betavariate(1 + s.bypasses, 1 + s.pulls - s.bypasses)
+                return sample / s.mean_cost()
+        else:
+            log_total = math.log(sum(s.pulls for s in self._stats.values()))
+
+            def score(arm: Arm) -> float:
+                s = self._stats[arm]
+                bonus = math.sqrt(self.exploration * log_total / s.pulls)
+                return (s.bypasses / s.pulls + bonus) / s.mean_cost()
+
+        return max(self.arms, key=score)
+
+
+class FixedWeightSelector(_SelectorStats):
+    """
+    Selección con los pesos fijos de auto_attack_weights (comportamiento clásico)
+    """
+
+    def __init__(self, corpus: AttackCorpus, valid: Optional[Iterable[str]] = None, rng=None):
+        """
+        Args:
+            corpus: Corpus cargado
+            valid: Estrategias admitidas (p. ej. los valores de AttackStrategy)
+            rng: Generador aleatorio (por defecto el `random` global)
+        """
+        valid = list(valid) if valid is not None else None
+        self.strategy_sampler = corpus.weighted_sampler("strategies", valid=valid)
+        self.threat_sampler = corpus.weighted_sampler("threats")
+        super().__init__((s, t) for s in self.strategy_sampler.items for t in self.threat_sampler.items)
+        self.rng = rng if rng is not None else random
+
+    def select(self) -> Arm:
+        return self.strategy_sampler.sample(self.rng), self.threat_sampler.sample(self.rng)
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ejecución headless de batallas atacante vs defensor
+
+Dos modos de ejecución con la misma semántica:
+- INTERLEAVED: generar ataque → evaluar → siguiente ronda (como los scripts)
+- MODEL_AFFINITY: por ventanas; primero se generan todos los ataques de la
+  ventana con el modelo atacante, luego se clasifican todos con el modelo
+  defensor y al final se reaplican las decisiones en orden sobre el vector.
+
+Con un solo LM Studio alternar DeepSeek y Mistral en cada petición obliga a
+cambiar de modelo continuamente; agrupar por modelo reduce esos cambios.
+
+run_campaign ejecuta muchas batallas independientes en paralelo: cada una
+con su atacante y su defensor (vector propio), todas compartiendo los
+clientes LLM, sus cachés y el planificador del backend, que impone el
+límite global de peticiones simultáneas.
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src.attacker import AdvancedAttacker, AttackPrompt, AttackStrategy
+from src.bandit import create_selector, llm_calls
+from src.dedupe import AttackDeduplicator
+from src.defender import AxioDefender, DefenseDecision
+from src.results_store import ResultsStore
+from src.utils import log_evento
+
+
+class BattleMode(Enum):
+    INTERLEAVED = "interleaved"
+    MODEL_AFFINITY = "model_affinity"
+
+
+@dataclass
+class RoundSpec:
+    """Descripción de una ronda antes de generar el ataque"""
+    threat: str  # CAE, FSA, MME
+    strategy: AttackStrategy = AttackStrategy.PARAPHRASE
+    creative: bool = False  # Generar con AdvancedAttacker.llm_creative_attack
+    instruction: str = ""  # Instrucción extra para la generación creativa
+
+
+@dataclass
+class BattleRound:
+    """Resultado de una ronda"""
+    index: int
+    spec: RoundSpec
+    attack: AttackPrompt
+    decision: DefenseDecision
+    latency: float = 0.0  # segundos desde el inicio de la ronda (o de su ventana) hasta la decisión
+
+
+@dataclass
+class BattleReport:
+    """Resultado de una batalla completa"""
+    mode: BattleMode
+    rounds: List[BattleRound] = field(default_factory=list)
+    wall_time: float = 0.0
+    model_swaps: int = 0
+    llm_calls: int = 0
+    deduped: int = 0  # rondas saltadas por ataque repetido
+
+    def summary(self) -> Dict:
+        """Resumen con conteos por acción, tasa de bypass, tiempo, cambios de modelo y llamadas LLM"""
+        total = len(self.rounds)
+        actions = [r.decision.action for r in self.rounds]
+        permitted = actions.count("PERMITIR")
+        return {
+            "mode": self.mode.value,
+            "total": total,
+            "blocked": actions.count("BLOQUEAR"),
+            "watched": actions.count("VIGILAR"),
+            "permitted": permitted,
+            "bypass_rate": permitted / total if total else 0.0,
+            "wall_time": self.wall_time,
+            "model_swaps": self.model_swaps,
+            "llm_calls": self.llm_calls,
+            "deduped": self.deduped,
+            # Sin LLM cada ronda cuenta como una evaluación
+            "bypasses_per_llm_call": permitted / max(self.llm_calls, total) if total else 0.0
+        }
+
+
+def _make_attack(attacker: AdvancedAttacker, spec: RoundSpec) -> AttackPrompt:
+    if spec.creative:
+        return attacker.llm_creative_attack(spec.threat, spec.instruction)
+    return attacker.generate_attack(spec.strategy, spec.threat)
+
+
+def _schedulers_of(attacker: AdvancedAttacker, defender: AxioDefender) -> list:
+    schedulers = []
+    for client in (attacker.llm_client, defender.llm_client):
+        if client is not None and client.scheduler not in schedulers:
+            schedulers.append(client.scheduler)
+    return schedulers
+
+
+def _record(store: Optional[ResultsStore], run_id: Optional[str], battle_round: BattleRound):
+    if store is None:
+        return
+    decision = battle_round.decision
+    store.record(run_id, "creative" if battle_round.spec.creative else battle_round.attack.strategy.value,
+                 battle_round.spec.threat, battle_round.attack.content, decision.action,
+                 detected=decision.threat_type, risk_score=decision.risk_score, latency=battle_round.latency,
+                 vector=decision.vector_state, round=battle_round.index)
+
+
+def run_battle(attacker: AdvancedAttacker, defender: AxioDefender, specs: List[RoundSpec],
+               mode: BattleMode = BattleMode.INTERLEAVED, window: int = 8,
+               store: Optional[ResultsStore] = None, run_id: Optional[str] = None) -> BattleReport:
+    """
+    Ejecuta una batalla sin salida interactiva
+
+    Args:
+        attacker: Atacante (con o sin LLM)
+        defender: Defensor; su vector evoluciona igual en ambos modos
+        specs: Rondas a ejecutar, en orden
+        mode: Modo de ejecución
+        window: Rondas por ventana en MODEL_AFFINITY
+        store: Almacén donde guardar cada ronda (opcional)
+        run_id: Ejecución de `store` a la que pertenecen las rondas
+
+    Returns:
+        BattleReport con rondas, tiempo total y cambios de modelo observados
+    """
+    schedulers = _schedulers_of(attacker, defender)
+    swaps_before = sum(s.model_swaps for s in schedulers)
+    calls_before = llm_calls(attacker.llm_client, defender.llm_client)
+    report = BattleReport(mode=mode)
+    start = time.perf_counter()
+
+    if mode == BattleMode.INTERLEAVED:
+        for i, spec in enumerate(specs):
+            round_start = time.perf_counter()
+            attack = _make_attack(attacker, spec)
+            decision = defender.evaluate(attack.content)
+            report.rounds.append(BattleRound(i, spec, attack, decision, time.perf_counter() - round_start))
+            _record(store, run_id, report.rounds[-1])
+    else:
+        window = max(1, window)
+        for offset in range(0, len(specs), window):
+            batch = specs[offset:offset + window]
+            window_start = time.perf_counter()
+
+            # Fase 1: solo modelo atacante
+            attacks = [_make_attack(attacker, spec) for spec in batch]
+
+            # Fase 2: solo modelo defensor (clasificación sin estado)
+            classifications = [defender.classify(attack.content) for attack in attacks]
+
+            # Fase 3: reaplicar en orden; el vector queda igual que en INTERLEAVED
+            for j, (spec, attack, (threat_type, from_filter)) in enumerate(zip(batch, attacks, classifications)):
+                decision = defender.apply_classification(attack.content, threat_type, from_filter)
+                report.rounds.append(BattleRound(offset + j, spec, attack, decision,
+                                                 time.perf_counter() - window_start))
+                _record(store, run_id, report.rounds[-1])
+
+    report.wall_time = time.perf_counter() - start
+    report.model_swaps = sum(s.model_swaps for s in schedulers) - swaps_before
+    report.llm_calls = llm_calls(attacker.llm_client, defender.llm_client) - calls_before
+
+    log_evento(f"🏁 Batalla {mode.value}: {len(report.rounds)} rondas en {report.wall_time:.2f}s, "
+               f"{report.model_swaps} cambios de modelo", "INFO")
+    return report
+
+
+def compare_modes(attacker: AdvancedAttacker, make_defender, specs: List[RoundSpec],
+                  window: int = 8, seed: Optional[int] = 0) -> Dict[str, Dict]:
+    """
+    Ejecuta las mismas rondas en ambos modos con un defensor nuevo cada vez
+
+    Args:
+        attacker: Atacante compartido
+        make_defender: Callable sin argumentos que crea un AxioDefender limpio
+        specs: Rondas a ejecutar
+        window: Tamaño de ventana para MODEL_AFFINITY
+        seed: Semilla para que las estrategias de plantilla elijan lo mismo
+
+    Returns:
+        {modo: summary()}
+    """
+    results = {}
+    for mode in (BattleMode.INTERLEAVED, BattleMode.MODEL_AFFINITY):
+        if seed is not None:
+            random.seed(seed)
+        report = run_battle(attacker, make_defender(), specs, mode=mode, window=window)
+        results[mode.value] = report.summary()
+    return results
+
+
+def run_selector_battle(attacker: AdvancedAttacker, defender: AxioDefender, selector,
+                        rounds: int, dedupe: Optional[AttackDeduplicator] = None) -> BattleReport:
+    """
+    Batalla en la que un selector elige (estrategia, amenaza) ronda a ronda
+
+    Tras cada ronda el selector recibe si hubo bypass (PERMITIR) y las
+    llamadas al LLM que costó, como en el ataque automático del dashboard.
+
+    Args:
+        attacker: Atacante (con o sin LLM)
+        defender: Defensor
+        selector: StrategyBandit o FixedWeightSelector (src/bandit.py)
+        rounds: Rondas a ejecutar
+        dedupe: Deduplicador opcional; los ataques repetidos que descarta
+            no se evalúan, cuentan en `deduped` y el selector los recibe
+            como jugada sin bypass (selector.skipped)
+
+    Returns:
+        BattleReport en modo INTERLEAVED
+    """
+    clients = (attacker.llm_client, defender.llm_client)
+    calls_before = llm_calls(*clients)
+    report = BattleReport(mode=BattleMode.INTERLEAVED)
+    start = time.perf_counter()
+
+    for i in range(rounds):
+        strategy, threat = selector.select()
+        spec = RoundSpec(threat=threat, strategy=AttackStrategy(strategy))
+
+        calls = llm_calls(*clients)
+        round_start = time.perf_counter()
+        if dedupe is None:
+            attack = _make_attack(attacker, spec)
+        else:
+            attack = dedupe.filter(lambda: _make_attack(attacker, spec))
+            if attack is None:
+                report.deduped += 1
+                selector.skipped((strategy, threat), llm_calls(*clients) - calls)
+                continue
+        decision = defender.evaluate(attack.content)
+        selector.update((strategy, threat), decision.action == "PERMITIR", llm_calls(*clients) - calls)
+
+        report.rounds.append(BattleRound(i, spec, attack, decision, time.perf_counter() - round_start))
+
+    report.wall_time = time.perf_counter() - start
+    report.llm_calls = llm_calls(*clients) - calls_before
+    return report
+
+
+def compare_selectors(attacker: AdvancedAttacker, make_defender, rounds: int,
+                      methods=("fixed", "thompson"), seed: Optional[int] = 0,
+                      dedupe_config: Optional[Dict] = None) -> Dict[str, Dict]:
+    """
+    Ejecuta el mismo número de rondas con cada selector y un defensor nuevo
+
+    Args:
+        attacker: Atacante compartido
+        make_defender: Callable sin argumentos que crea un AxioDefender limpio
+        rounds: Rondas por selector
+        methods: Selectores a comparar ("fixed", "thompson", "ucb")
+        seed: Semilla de los selectores y de las plantillas
+        dedupe_config: Sección "dedupe" de config.json (deduplicador nuevo por selector)
+
+    Returns:
+        {método: summary()} con bypasses_per_llm_call para comparar
+    """
+    valid = [s.value for s in AttackStrategy]
+    results = {}
+    for method in methods:
+        if seed is not None:
+            random.seed(seed)
+        rng = random.Random(seed)
+        selector = create_selector(attacker.corpus, method, valid=valid, rng=rng)
+        report = run_selector_battle(attacker, make_defender(), selector, rounds,
+                                     dedupe=AttackDeduplicator.from_config(dedupe_config))
+        results[method] = report.summary()
+    return results
+
+
+@dataclass
+class CampaignReport:
+    """Resultado de una campaña de batallas paralelas"""
+    battles: List[BattleReport] = field(default_factory=list)  # en orden de id, no de finalización
+    seeds: List[int] = field(default_factory=list)
+    wall_time: float = 0.0
+    llm_calls: int = 0
+    workers: int = 1
+
+    def summary(self) -> Dict:
+        """
+        Agregado determinista: misma semilla, mismas rondas y mismas decisiones
+        (con un LLM real, el contenido generado depende del modelo)
+        """
+        rounds = [r for battle in self.battles for r in battle.rounds]
+        actions = [r.decision.action for r in rounds]
+        permitted = actions.count("PERMITIR")
+
+        def breakdown(key) -> Dict[str, Dict]:
+            groups: Dict[str, List[str]] = {}
+            for r in rounds:
+                groups.setdefault(key(r), []).append(r.decision.action)
+            return {name: {"rounds": len(acts), "permitted": acts.count("PERMITIR"),
+                           "bypass_rate": acts.count("PERMITIR") / len(acts)}
+                    for name, acts in sorted(groups.items())}
+
+        return {
+            "battles": len(self.battles),
+            "rounds": len(rounds),
+            "blocked": actions.count("BLOQUEAR"),
+            "watched": actions.count("VIGILAR"),
+            "permitted": permitted,
+            "bypass_rate": permitted / len(rounds) if rounds else 0.0,
+            "deduped": sum(b.deduped for b in self.battles),
+            "by_threat": breakdown(lambda r: r.spec.threat),
+            "by_strategy": breakdown(lambda r: "creative" if r.spec.creative else r.spec.strategy.value),
+            "per_battle": [
+                {"id": i, "seed": seed, "rounds": len(b.rounds),
+                 "permitted": sum(r.decision.action == "PERMITIR" for r in b.rounds),
+                 "final_vector": b.rounds[-1].decision.vector_state if b.rounds else {}}
+                for i, (seed, b) in enumerate(zip(self.seeds, self.battles))
+            ]
+        }
+
+    def timing(self) -> Dict:
+        """Tiempos (varían entre ejecuciones): rondas/s, llamadas LLM y latencia por ronda"""
+        latencies = sorted(r.latency for battle in self.battles for r in battle.rounds)
+
+        def percentile(q: float) -> float:
+            return latencies[min(len(latencies) - 1, int(len(latencies) * q))] if latencies else 0.0
+
+        return {
+            "workers": self.workers,
+            "wall_time": self.wall_time,
+            "rounds_per_sec": len(latencies) / self.wall_time if self.wall_time else 0.0,
+            "llm_calls": self.llm_calls,
+            "latency_p50": percentile(0.5),
+            "latency_p99": percentile(0.99)
+        }
+
+
+def battle_seed(seed: int, battle_id: int) -> int:
+    """Semilla de una batalla: depende solo de la semilla de campaña y del id"""
+    return random.Random(f"{seed}:{battle_id}").getrandbits(32)
+
+
+def campaign_specs(rng: random.Random, rounds: int, strategies: Sequence[AttackStrategy],
+                   threats: Sequence[str] = ("CAE", "FSA", "MME"), creative_share: float = 0.0) -> List[RoundSpec]:
+    """Rondas aleatorias (reproducibles con `rng`) para una batalla de campaña"""
+    specs = []
+    for _ in range(rounds):
+        threat = rng.choice(threats)
+        if creative_share and rng.random() < creative_share:
+            specs.append(RoundSpec(threat=threat, creative=True))
+        else:
+            specs.append(RoundSpec(threat=threat, strategy=rng.choice(strategies)))
+    return specs
+
+
+def run_campaign(make_attacker: Callable[[int], AdvancedAttacker], make_defender: Callable[[], AxioDefender],
+                 battles: int, rounds: int, strategies: Sequence[AttackStrategy], workers: int = 4,
+                 seed: int = 0, creative_share: float = 0.0, mode: BattleMode = BattleMode.INTERLEAVED,
+                 window: int = 8, store: Optional[ResultsStore] = None) -> CampaignReport:
+    """
+    Ejecuta `battles` batallas independientes con `workers` hilos
+
+    Cada batalla recibe una semilla derivada de (seed, id) para sus rondas y
+    su atacante, y un defensor nuevo. Los clientes LLM que compartan los
+    atacantes y defensores comparten también single-flight y el planificador
+    de su backend, así que la concurrencia real contra el LLM la limita
+    `scheduler.max_concurrency`, no `workers`. El informe se ordena por id:
+    el resultado no depende del orden en que terminen los hilos.
+
+    Args:
+        make_attacker: Callable(semilla) que crea un AdvancedAttacker
+        make_defender: Callable sin argumentos que crea un AxioDefender limpio
+        battles: Número de batallas
+        rounds: Rondas por batalla
+        strategies: Estrategias de plantilla/dataset entre las que elegir
+        workers: Batallas simultáneas
+        seed: Semilla de la campaña
+        creative_share: Fracción de rondas con generación creativa por LLM
+        mode: Modo de cada batalla
+        window: Ventana en MODEL_AFFINITY
+        store: Almacén de resultados; cada batalla es una ejecución propia
+
+    Returns:
+        CampaignReport
+    """
+    seeds = [battle_seed(seed, b) for b in range(battles)]
+    specs = [campaign_specs(random.Random(s), rounds, strategies, creative_share=creative_share) for s in seeds]
+    baselines: list = []  # (cliente, peticiones antes de su primer uso en la campaña)
+    lock = threading.Lock()
+
+    def run(battle_id: int) -> BattleReport:
+        attacker = make_attacker(seeds[battle_id])
+        defender = make_defender()
+        with lock:
+            for client in (attacker.llm_client, defender.llm_client):
+                if client is not None and all(client is not c for c, _ in baselines):
+                    baselines.append((client, client.usage_stats()["requests"]))
+        run_id = None
+        if store is not None:
+            run_id = store.start_run("campaign", {"seed": seed, "battle": battle_id, "battle_seed": seeds[battle_id]})
+        return run_battle(attacker, defender, specs[battle_id], mode=mode, window=window, store=store, run_id=run_id)
+
+    report = CampaignReport(seeds=seeds, workers=max(1, workers))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=report.workers) as pool:
+        futures = [pool.submit(run, b) for b in range(battles)]
+        report.battles = [future.result() for future in futures]
+    report.wall_time = time.perf_counter() - start
+    # Con clientes compartidos las llamadas no se pueden atribuir a una batalla: solo el total
+    report.llm_calls = sum(client.usage_stats()["requests"] - before for client, before in baselines)
+
+    log_evento(f"🏁 Campaña: {battles} batallas x {rounds} rondas en {report.wall_time:.2f}s "
+               f"con {report.workers} hilos", "INFO")
+    return report
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Corpus declarativo de ataques de plantilla y muestreo ponderado O(1)
+
+Las plantillas de las estrategias DIRECT, PARAPHRASE, GRADUAL, ROLE_PLAY,
+OBFUSCATION, MULTILINGUAL y CONTEXT_BUILDING viven en data/attack_corpus.json.
+Se cargan una sola vez por proceso en tuplas por (estrategia, amenaza) y la
+selección ponderada usa el método alias (Vose): preparación O(n), cada
+muestra O(1) con dos números aleatorios.
+
+Formato de cada plantilla: un string, o {"text": "...", "weight": 3}.
+
+La sección "mutations" configura la estrategia MUTATION (src/mutations.py):
+estrategias cuyas plantillas sirven de semilla y tabla de sinónimos.
+"""
+
+import json
+import random
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_CORPUS_PATH = Path(__file__).resolve().parent.parent / "data" / "attack_corpus.json"
+
+
+class AliasSampler:
+    """
+    Muestreo discreto ponderado en O(1) (método alias de Vose)
+    """
+
+    def __init__(self, items: Sequence, weights: Optional[Sequence[float]] = None):
+        """
+        Args:
+            items: Elementos a muestrear
+            weights: Pesos no negativos (uniforme si es None)
+        """
+        if not items:
+            raise ValueError("AliasSampler necesita al menos un elemento")
+
+        self.items = tuple(items)
+        n = len(self.items)
+        weights = [1.0] * n if weights is None else [float(w) for w in weights]
+        if len(weights) != n or any(w < 0 for w in weights) or sum(weights) <= 0:
+            raise ValueError("Pesos inválidos para AliasSampler")
+
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        self._prob = [0.0] * n
+        self._alias = [0] * n
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        # Restos por error de redondeo: probabilidad 1
+        for i in large + small:
+            self._prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample(self, rng=random):
+        """Retorna un elemento según los pesos"""
+        i = int(rng.random() * len(self.items))
+        return self.items[i] if rng.random() < self._prob[i] else self.items[self._alias[i]]
+
+
+class StrategyTemplates:
+    """Plantillas de una estrategia: metadatos y un sampler por amenaza"""
+
+    def __init__(self, name: str, subtlety: int, description: str, samplers: Dict[str, AliasSampler]):
+        self.name = name
+        self.subtlety = subtlety
+        self.description = description
+        self.samplers = samplers
+
+    def sample(self, threat_type: str, rng=random) -> str:
+        """Plantilla para la amenaza pedida (CAE si no hay plantillas para ella)"""
+        sampler = self.samplers.get(threat_type) or self.samplers["CAE"]
+        return sampler.sample(rng)
+
+    def texts(self, threat_type: str) -> Tuple[str, ...]:
+        sampler = self.samplers.get(threat_type) or self.samplers["CAE"]
+        return sampler.items
+
+
+class AttackCorpus:
+    """
+    Corpus de plantillas cargado desde JSON
+    """
+
+    def __init__(self, data: Dict):
+        self.version = data.get("version", 1)
+        self.strategies: Dict[str, StrategyTemplates] = {}
+
+        for name, spec in data.get("strategies", {}).items():
+            samplers = {}
+            for threat, entries in spec.get("templates", {}).items():
+                texts, weights = _parse_entries(entries)
+                if texts:
+                    samplers[threat] = AliasSampler(texts, weights)
+            self.strategies[name] = StrategyTemplates(
+                name, spec.get("subtlety", 5), spec.get("description", ""), samplers)
+
+        mutations = data.get("mutations", {})
+        self.mutation_subtlety: int = mutations.get("subtlety", 6)
+        self.mutation_description: str = mutations.get("description", "Variantes mutadas de plantillas")
+        self.mutation_seed_strategies: List[str] = mutations.get("seed_strategies", ["direct"])
+        self.synonyms: Dict[str, List[str]] = mutations.get("synonyms", {})
+
+        self.auto_attack_weights: Dict[str, Dict[str, float]] = data.get("auto_attack_weights", {})
+
+    @classmethod
+    def from_file(cls, path) -> "AttackCorpus":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def get(self, strategy_name: str) -> Optional[StrategyTemplates]:
+        return self.strategies.get(strategy_name)
+
+    def mutation_seeds(self, threat_type: str) -> Tuple[str, ...]:
+        """Plantillas de las estrategias semilla de MUTATION para una amenaza"""
+        seeds = []
+        for name in self.mutation_seed_strategies:
+            templates = self.strategies.get(name)
+            if templates is not None:
+                seeds.extend(templates.texts(threat_type))
+        return tuple(seeds)
+
+    def weighted_sampler(self, section: str, valid: Optional[Sequence[str]] = None) -> Optional[AliasSampler]:
+        """
+        Sampler sobre una sección de `auto_attack_weights` (p. ej. "strategies")
+
+        Args:
+            section: Nombre de la sección
+            valid: Si se da, descarta claves que no estén en esta lista
+        """
+        weights = self.auto_attack_weights.get(section, {})
+        pairs = [(k, w) for k, w in weights.items() if w > 0 and (valid is None or k in valid)]
+        if not pairs:
+            return None
+        return AliasSampler([k for k, _ in pairs], [w for _, w in pairs])
+
+
+def _parse_entries(entries: List) -> Tuple[List[str], Optional[List[float]]]:
+    texts = []
+    weights = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            texts.append(entry["text"])
+            weights.append(entry.get("weight", 1.0))
+        else:
+            texts.append(str(entry))
+            weights.append(1.0)
+    uniform = all(w == weights[0] for w in weights)
+    return texts, (None if uniform else weights)
+
+
+_corpus_cache: Dict[str, AttackCorpus] = {}
+_corpus_lock = threading.Lock()
+
+
+def load_corpus(path=None) -> AttackCorpus:
+    """
+    Carga el corpus una vez por proceso (cacheado por ruta)
+
+    Args:
+        path: Ruta al JSON (por defecto data/attack_corpus.json)
+    """
+    key = str(path or DEFAULT_CORPUS_PATH)
+    with _corpus_lock:
+        if key not in _corpus_cache:
+            _corpus_cache[key] = AttackCorpus.from_file(key)
+        return _corpus_cache[key]
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Dataset Index - Threat/subtlety stratified row index for dataset sampling
+
+Rows of a prompt dataset are bucketed once by (threat type, subtlety band).
+Sampling a requested stratum is then O(1): pick a bucket, pick a row id.
+Rows whose threat cannot be inferred go to the "UNK" threat so they can
+still be served when a requested threat has no rows of its own.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+THREATS = ("CAE", "FSA", "MME")
+UNKNOWN_THREAT = "UNK"
+
+# Subtlety bands over the 1-10 scale used by AttackPrompt
+SUBTLETY_BANDS = {"low": (1, 3), "medium": (4, 6), "high": (7, 10)}
+BAND_SUBTLETY = {"low": 3, "medium": 5, "high": 7}  # score reported for rows without a label
+
+# Categories used by sample_adversarial_prompts.json
+CATEGORY_THREATS = {
+    "jailbreak": "CAE",
+    "role_play": "CAE",
+    "obfuscation": "CAE",
+    "multilingual": "CAE",
+    "context_manipulation": "CAE",
+    "information_extraction": "FSA",
+    "manipulation": "MME",
+}
+
+CAE_KEYWORDS = ["olvida", "ignora", "reset", "forget", "ignore", "disregard", "override", "oublie"]
+FSA_KEYWORDS = ["prompt", "instrucciones", "configuración", "system", "instructions", "configuration"]
+
+INDEX_VERSION = 1
+
+
+def subtlety_band(subtlety: int) -> str:
+    """Band name for a 1-10 subtlety score"""
+    for band, (low, high) in SUBTLETY_BANDS.items():
+        if low <= subtlety <= high:
+            return band
+    return "high" if subtlety > 10 else "low"
+
+
+def classify_text(text: str) -> Tuple[str, int]:
+    """
+    Keyword heuristic for rows without labels
+
+    Returns:
+        (threat, subtlety): CAE/FSA/UNK and an estimate of how subtle the
+        text is (explicit keywords read as blunt attacks)
+    """
+    lower = text.lower()
+    if any(word in lower for word in CAE_KEYWORDS):
+        return "CAE", 3
+    if any(word in lower for word in FSA_KEYWORDS):
+        return "FSA", 5
+    return UNKNOWN_THREAT, 7
+
+
+def classify_item(item) -> Tuple[str, int]:
+    """Threat and subtlety of a local dataset item (labelled dict or plain text)"""
+    if isinstance(item, dict):
+        threat = CATEGORY_THREATS.get(item.get("category", ""))
+        text = str(item.get("text", ""))
+        guessed_threat, guessed_subtlety = classify_text(text)
+        subtlety = item.get("subtlety", guessed_subtlety)
+        return threat or guessed_threat, int(subtlety)
+    return classify_text(str(item))
+
+
+class StratifiedIndex:
+    """
+    Row ids bucketed by (threat, subtlety band)
+    """
+
+    def __init__(self):
+        self.strata: Dict[Tuple[str, str], List[int]] = {}
+        self._merged: Dict[Tuple[Optional[str], Optional[str]], List[Tuple[Tuple[str, str], List[int]]]] = {}
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple[str, int]]) -> "StratifiedIndex":
+        """
+        Build from (threat, subtlety) pairs in row order
+
+        Args:
+            rows: One pair per dataset row
+        """
+        index = cls()
+        for row_id, (threat, subtlety) in enumerate(rows):
+            index.strata.setdefault((threat, subtlety_band(subtlety)), []).append(row_id)
+        return index
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self.strata.values())
+
+    def counts(self) -> Dict[str, int]:
+        """Rows per "threat/band" stratum"""
+        return {f"{threat}/{band}": len(rows) for (threat, band), rows in sorted(self.strata.items())}
+
+    def _buckets(self, threat: Optional[str], band: Optional[str]):
+        key = (threat, band)
+        if key not in self._merged:
+            self._merged[key] = [
+                (stratum, rows) for stratum, rows in self.strata.items()
+                if rows and (threat is None or stratum[0] == threat) and (band is None or stratum[1] == band)
+            ]
+        return self._merged[key]
+
+    def sample(self, threat: Optional[str] = None, band: Optional[str] = None,
+               rng=random) -> Optional[Tuple[int, str, str]]:
+        """
+        Random row from the requested stratum
+
+        Falls back to UNK rows for a threat with no rows of its own.
+
+        Args:
+            threat: CAE, FSA, MME or None for any
+            band: low, medium, high or None for any
+            rng: Random generator
+
+        Returns:
+            (row id, threat, band) or None if nothing matches
+        """
+        buckets = self._buckets(threat, band)
+        if not buckets and threat is not None:
+            buckets = self._buckets(UNKNOWN_THREAT, band)
+        if not buckets:
+            return None
+
+        # At most len(THREATS) + 1 x len(SUBTLETY_BANDS) buckets: constant time
+        total = sum(len(rows) for _, rows in buckets)
+        pick = rng.randrange(total)
+        for (stratum_threat, stratum_band), rows in buckets:
+            if pick < len(rows):
+                return rows[pick], stratum_threat, stratum_band
+            pick -= len(rows)
+        return None
+
+    def save(self, path, row_count: int):
+        """Persist the index next to the data it describes"""
+        data = {
+            "version": INDEX_VERSION,
+            "rows": row_count,
+            "strata": {f"{threat}|{band}": rows for (threat, band), rows in self.strata.items()}
+        }
+        # Write a private temp file and rename it, so concurrent savers and
+        # readers never see a truncated index
+        tmp = Path(f"{path}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError as e:
+            logging.warning(f"Could not save dataset index to {path}: {e}")
+            tmp.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path, row_count: int) -> Optional["StratifiedIndex"]:
+        """Load a persisted index; None if missing or built for different data"""
+        if not Path(path).exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Ignoring unreadable dataset index {path}: {e}")
+            return None
+        if data.get("version") != INDEX_VERSION or data.get("rows") != row_count:
+            return None
+
+        index = cls()
+        for key, rows in data["strata"].items():
+            threat, _, band = key.partition("|")
+            index.strata[(threat, band)] = rows
+        return index
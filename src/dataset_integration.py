@@ -3,19 +3,31 @@
 Dataset Integration Module - Integrates external datasets for enhanced attack/defense
 """
 
+import importlib.util
 import json
 import random
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from typing import List, Dict, Any, Iterator, Optional
 from pathlib import Path
 import logging
 
-try:
-    from datasets import load_dataset
-    DATASETS_AVAILABLE = True
-except ImportError:
-    DATASETS_AVAILABLE = False
+# `datasets` pulls in pyarrow, pandas and fsspec (~1s): only check that it is
+# installed here and import it in load_pliny_dataset, the one place it is used
+DATASETS_AVAILABLE = importlib.util.find_spec("datasets") is not None
+if not DATASETS_AVAILABLE:
     logging.warning("datasets library not available. Dataset integration disabled.")
 
+from src.prompt_store import PromptStore, export_prompt_store
+from src.dataset_index import BAND_SUBTLETY, StratifiedIndex, classify_item, classify_text
+from src.near_duplicates import DEFAULT_THRESHOLD, ClusterSplit, MinHashLSH, cluster_split
+from src.streaming_loader import OffsetIndexedCorpus, is_jsonl, reservoir_sample
+
+SAMPLE_DATASET_PATH = Path(__file__).resolve().parent.parent / "sample_adversarial_prompts.json"
+PLINY_STORE_PATH = Path(__file__).resolve().parent.parent / "data" / "cache" / "pliny"
+PROMPT_FIELDS = ['text', 'prompt', 'content', 'message']
+PLINY_INDEX_FILE = "strata.json"
+
 
 class DatasetManager:
     """
@@ -25,59 +37,141 @@ class DatasetManager:
     def __init__(self):
         self.datasets = {}
         self.local_data = {}
+        self.pliny_store: Optional[PromptStore] = None
+        self.indexes: Dict[str, StratifiedIndex] = {}
+        self._index_lock = threading.Lock()  # campaign and tournament workers share the indexes
 
-    def load_pliny_dataset(self) -> bool:
+    def load_pliny_dataset(self, offline: bool = True) -> bool:
         """
         Load the Pliny_HackAPrompt_Dataset if available and authenticated
 
+        The prompt column is exported once to a memory-mapped store
+        (data/cache/pliny); later runs open that store directly without
+        touching the `datasets` library.
+
+        Args:
+            offline: Only use the local Hugging Face cache (no network access)
+
         Returns:
             bool: True if loaded successfully
         """
+        store = PromptStore.open(PLINY_STORE_PATH)
+        if store is not None:
+            self.pliny_store = store
+            logging.info(f"Pliny prompt store opened ({len(store)} prompts)")
+            return True
+
         if not DATASETS_AVAILABLE:
             logging.error("datasets library not installed")
             return False
 
         try:
-            logging.info("Loading Pliny_HackAPrompt_Dataset...")
-            dataset = load_dataset("hackaprompt/Pliny_HackAPrompt_Dataset")
+            logging.info(f"Loading Pliny_HackAPrompt_Dataset ({'offline' if offline else 'online'})...")
+            from datasets import load_dataset
+            with _hub_offline(offline):
+                dataset = load_dataset("hackaprompt/Pliny_HackAPrompt_Dataset")
             self.datasets['pliny'] = dataset
             logging.info("Pliny dataset loaded successfully")
+            if self.export_pliny_store():
+                # The store replaces the in-memory DatasetDict
+                del self.datasets['pliny']
             return True
         except Exception as e:
-            logging.error(f"Failed to load Pliny dataset: {e}")
+            if offline:
+                logging.info(f"Pliny dataset not in local cache ({e}); set datasets.offline=false to download it")
+            else:
+                logging.error(f"Failed to load Pliny dataset: {e}")
+            return False
+
+    def export_pliny_store(self, path=PLINY_STORE_PATH) -> bool:
+        """
+        Export the prompt column of the loaded Pliny dataset to a prompt store
+
+        Args:
+            path: Store directory
+
+        Returns:
+            bool: True if the store was written and opened
+        """
+        dataset = self.datasets.get('pliny')
+        if dataset is None or 'train' not in dataset:
+            return False
+
+        train_data = dataset['train']
+        field = next((f for f in PROMPT_FIELDS if f in train_data.column_names), None)
+        if field is None:
+            logging.warning(f"No prompt column in Pliny dataset (columns: {train_data.column_names})")
+            return False
+
+        def texts():
+            for batch in train_data.iter(batch_size=1000):
+                for value in batch[field]:
+                    yield "" if value is None else str(value)
+
+        try:
+            export_prompt_store(texts(), path, source=f"hackaprompt/Pliny_HackAPrompt_Dataset:train:{field}")
+        except OSError as e:
+            logging.error(f"Failed to export Pliny prompt store: {e}")
             return False
 
-    def load_local_dataset(self, filepath: str, name: str) -> bool:
+        self.pliny_store = PromptStore.open(path)
+        return self.pliny_store is not None
+
+    def load_local_dataset(self, filepath: str, name: str, sample_size: Optional[int] = None,
+                           indexed: bool = False) -> bool:
         """
-        Load a local dataset from JSON file
+        Load a local dataset from a JSON array or JSONL file
+
+        JSON arrays without options are read whole with json.load. JSONL
+        files, and any file with `sample_size` or `indexed`, are streamed
+        record by record with bounded memory (see src/streaming_loader.py).
 
         Args:
-            filepath: Path to JSON file
+            filepath: Path to JSON/JSONL file
             name: Name to assign to the dataset
+            sample_size: Keep a uniform reservoir sample of this many records
+            indexed: Keep only an on-disk offset index (built next to the
+                file on first use) and read records on demand
 
         Returns:
             bool: True if loaded successfully
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.local_data[name] = data
-                logging.info(f"Local dataset '{name}' loaded from {filepath}")
-                return True
+            if indexed:
+                data = OffsetIndexedCorpus.open(filepath)
+            elif sample_size is not None or is_jsonl(filepath):
+                data, _ = reservoir_sample(filepath, sample_size)
+            else:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            self.local_data[name] = data
+            self.indexes.pop(name, None)
+            logging.info(f"Local dataset '{name}' loaded from {filepath} ({len(data)} records)")
+            return True
         except Exception as e:
             logging.error(f"Failed to load local dataset from {filepath}: {e}")
             return False
 
-    def get_pliny_prompts(self, num_samples: int = 10) -> List[str]:
+    def get_pliny_prompts(self, num_samples: int = 10, threat: Optional[str] = None,
+                          subtlety: Optional[str] = None) -> List[str]:
         """
         Get random prompts from Pliny dataset
 
         Args:
             num_samples: Number of prompts to retrieve
+            threat: Only prompts of this threat type (CAE, FSA, MME)
+            subtlety: Only prompts in this subtlety band (low, medium, high)
 
         Returns:
             List of prompt strings
         """
+        if self.pliny_store is not None:
+            if threat is None and subtlety is None:
+                return [p for p in self.pliny_store.sample(num_samples) if p]
+            index = self.pliny_index()
+            rows = [index.sample(threat, subtlety) for _ in range(num_samples)]
+            return [self.pliny_store[row[0]] for row in rows if row is not None]
+
         if 'pliny' not in self.datasets:
             logging.warning("Pliny dataset not loaded")
             return []
@@ -113,13 +207,16 @@ class DatasetManager:
             logging.error(f"Error extracting prompts from Pliny dataset: {e}")
             return []
 
-    def get_local_prompts(self, dataset_name: str, num_samples: int = 10) -> List[str]:
+    def get_local_prompts(self, dataset_name: str, num_samples: int = 10, threat: Optional[str] = None,
+                          subtlety: Optional[str] = None) -> List[str]:
         """
         Get random prompts from local dataset
 
         Args:
             dataset_name: Name of the local dataset
             num_samples: Number of prompts to retrieve
+            threat: Only prompts of this threat type (CAE, FSA, MME)
+            subtlety: Only prompts in this subtlety band (low, medium, high)
 
         Returns:
             List of prompt strings
@@ -130,9 +227,13 @@ class DatasetManager:
 
         try:
             data = self.local_data[dataset_name]
-            if isinstance(data, list):
+            if isinstance(data, (list, OffsetIndexedCorpus)):
+                if threat is not None or subtlety is not None:
+                    index = self.local_index(dataset_name)
+                    rows = [index.sample(threat, subtlety) for _ in range(num_samples)]
+                    return [_item_text(data[row[0]]) for row in rows if row is not None]
                 samples = random.sample(data, min(num_samples, len(data)))
-                return [str(item) for item in samples]
+                return [_item_text(item) for item in samples]
             else:
                 logging.warning(f"Local dataset '{dataset_name}' is not a list")
                 return []
@@ -140,6 +241,134 @@ class DatasetManager:
             logging.error(f"Error extracting prompts from local dataset '{dataset_name}': {e}")
             return []
 
+    def pliny_index(self) -> StratifiedIndex:
+        """
+        Threat/subtlety index over the Pliny prompt store
+
+        Built once by classifying every prompt, then saved next to the store
+        and reused while the store keeps the same number of rows. Threads
+        asking at the same time wait for a single build.
+        """
+        index = self.indexes.get('pliny')
+        if index is not None:
+            return index
+        with self._index_lock:
+            if 'pliny' not in self.indexes:
+                store = self.pliny_store
+                path = store.path / PLINY_INDEX_FILE
+                index = StratifiedIndex.load(path, len(store))
+                if index is None:
+                    start = time.perf_counter()
+                    index = StratifiedIndex.build(classify_text(store[i]) for i in range(len(store)))
+                    index.save(path, len(store))
+                    logging.info(f"Pliny index built in {time.perf_counter() - start:.2f}s: {index.counts()}")
+                self.indexes['pliny'] = index
+            return self.indexes['pliny']
+
+    def local_index(self, dataset_name: str) -> StratifiedIndex:
+        """Threat/subtlety index over a loaded local dataset (uses category/subtlety labels)"""
+        index = self.indexes.get(dataset_name)
+        if index is not None:
+            return index
+        with self._index_lock:
+            if dataset_name not in self.indexes:
+                self.indexes[dataset_name] = StratifiedIndex.build(
+                    classify_item(item) for item in self.local_data[dataset_name])
+            return self.indexes[dataset_name]
+
+    def build_indexes(self):
+        """
+        Build the indexes sample_prompt uses (Pliny store and local sample)
+
+        Call before starting worker threads so no battle pays for the build.
+        """
+        if self.pliny_store is not None and len(self.pliny_store):
+            self.pliny_index()
+        if isinstance(self.local_data.get("sample_adversarial"), list):
+            self.local_index("sample_adversarial")
+
+    def iter_texts(self, dataset_name: str) -> Iterator[str]:
+        """
+        Prompt texts of a dataset in row order, read lazily
+
+        Args:
+            dataset_name: "pliny" (prompt store) or the name of a local dataset
+        """
+        if dataset_name == 'pliny':
+            store = self.pliny_store
+            if store is None:
+                raise KeyError("Pliny prompt store not loaded")
+            return (store[i] for i in range(len(store)))
+        if dataset_name not in self.local_data:
+            raise KeyError(f"Local dataset '{dataset_name}' not loaded")
+        return (_item_text(item) for item in self.local_data[dataset_name])
+
+    def near_duplicate_split(self, dataset_name: str = 'pliny', test_fraction: float = 0.2, seed: int = 0,
+                             threshold: float = DEFAULT_THRESHOLD) -> Optional[ClusterSplit]:
+        """
+        Cluster near-duplicate prompts and split whole clusters into train/test
+
+        Builds a MinHash-LSH index over the dataset in one streaming pass
+        (see src/near_duplicates.py). Clustering is approximate: a small
+        share of near-copies (about 0.01% of groups on synthetic data) can
+        still straddle train and test.
+
+        Args:
+            dataset_name: "pliny" or the name of a local dataset
+            test_fraction: Target share of rows in the test set
+            seed: Split seed (same seed and data give the same split)
+            threshold: Estimated Jaccard similarity that makes two prompts near-duplicates
+
+        Returns:
+            ClusterSplit with row ids, or None if the dataset is not loaded
+        """
+        try:
+            texts = self.iter_texts(dataset_name)
+        except KeyError as e:
+            logging.warning(str(e))
+            return None
+
+        lsh = MinHashLSH(threshold=threshold)
+        lsh.add_many(texts)
+        split = cluster_split(lsh.clusters(), test_fraction, seed)
+        split.stats.update(duplicates=lsh.stats()["duplicates"], dataset=dataset_name, threshold=threshold)
+        logging.info(f"Near-duplicate split of '{dataset_name}': {split.stats}")
+        return split
+
+    def sample_prompt(self, threat: Optional[str] = None, subtlety: Optional[str] = None,
+                      rng=random) -> Optional[Dict[str, Any]]:
+        """
+        One prompt from the requested stratum, Pliny first and the local sample as fallback
+
+        Args:
+            threat: Threat type (CAE, FSA, MME) or None for any
+            subtlety: Subtlety band (low, medium, high) or None for any
+            rng: Random generator (a seeded one makes the choice reproducible)
+
+        Returns:
+            {"text", "threat", "subtlety", "source"} or None if no dataset has rows;
+            "threat" is "UNK" when the row's threat could not be inferred, and
+            may differ from the requested one when that stratum is empty
+        """
+        if self.pliny_store is not None and len(self.pliny_store):
+            index = self.pliny_index()
+            row = index.sample(threat, subtlety, rng) or index.sample(None, subtlety, rng)
+            if row is not None:
+                text = self.pliny_store[row[0]]
+                if text:
+                    return {"text": text, "threat": row[1], "subtlety": BAND_SUBTLETY[row[2]],
+                            "source": "Pliny_HackAPrompt_Dataset"}
+
+        data = self.local_data.get("sample_adversarial")
+        if isinstance(data, list) and data:
+            index = self.local_index("sample_adversarial")
+            row = index.sample(threat, subtlety, rng) or index.sample(None, subtlety, rng)
+            if row is not None:
+                item = data[row[0]]
+                return {"text": _item_text(item), "threat": row[1], "subtlety": classify_item(item)[1],
+                        "source": "sample_adversarial_prompts.json"}
+        return None
+
     def create_sample_dataset(self, output_file: str = "sample_adversarial_prompts.json"):
         """
         Create a sample dataset of adversarial prompts for testing
@@ -188,23 +417,96 @@ class DatasetManager:
             logging.error(f"Failed to save sample dataset: {e}")
 
 
+def _item_text(item) -> str:
+    """Prompt text of a local dataset item (labelled dict or plain value)"""
+    if isinstance(item, dict):
+        for field in PROMPT_FIELDS:
+            if field in item:
+                return str(item[field])
+    return str(item)
+
+
+class _hub_offline:
+    """Context manager that forces Hugging Face offline mode while loading"""
+
+    def __init__(self, offline: bool):
+        self.offline = offline
+        self.saved = None
+
+    def __enter__(self):
+        if not self.offline:
+            return self
+        import datasets.config
+        import huggingface_hub.constants
+        targets = [(datasets.config, "HF_HUB_OFFLINE"), (datasets.config, "HF_DATASETS_OFFLINE"),
+                   (huggingface_hub.constants, "HF_HUB_OFFLINE")]
+        self.saved = [(module, name, getattr(module, name)) for module, name in targets if hasattr(module, name)]
+        for module, name, _ in self.saved:
+            setattr(module, name, True)
+        return self
+
+    def __exit__(self, *exc):
+        for module, name, value in self.saved or ():
+            setattr(module, name, value)
+
+
 # Global instance
 dataset_manager = DatasetManager()
 
+_dataset_config: Dict[str, Any] = {}
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def configure_datasets(config: Optional[Dict[str, Any]]):
+    """
+    Apply the "datasets" section of config.json
+
+    Format:
+        {"offline": true}
 
-def initialize_datasets():
+    offline (default true) only reads the local Hugging Face cache; set it to
+    false to let the first DATASET attack download the Pliny dataset.
     """
-    Initialize available datasets
+    global _dataset_config
+    _dataset_config = config or {}
+
+
+def initialize_datasets(offline: Optional[bool] = None) -> float:
     """
-    # Try to load Pliny dataset
-    dataset_manager.load_pliny_dataset()
+    Initialize available datasets once per process
+
+    Called lazily on the first AttackStrategy.DATASET attack; later calls
+    return immediately.
+
+    Args:
+        offline: Override the configured offline mode
+
+    Returns:
+        Seconds spent loading (0.0 if already initialized)
+    """
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return 0.0
+
+        start = time.perf_counter()
+        if offline is None:
+            offline = _dataset_config.get("offline", True)
+
+        # Try to load Pliny dataset
+        dataset_manager.load_pliny_dataset(offline=offline)
+
+        # Create and load sample dataset if Pliny fails
+        if not SAMPLE_DATASET_PATH.exists():
+            dataset_manager.create_sample_dataset(str(SAMPLE_DATASET_PATH))
 
-    # Create and load sample dataset if Pliny fails
-    sample_file = "sample_adversarial_prompts.json"
-    if not Path(sample_file).exists():
-        dataset_manager.create_sample_dataset(sample_file)
+        dataset_manager.load_local_dataset(str(SAMPLE_DATASET_PATH), "sample_adversarial")
 
-    dataset_manager.load_local_dataset(sample_file, "sample_adversarial")
+        _initialized = True
+        elapsed = time.perf_counter() - start
+        logging.info(f"Datasets initialized in {elapsed:.2f}s")
+        return elapsed
 
 
 if __name__ == "__main__":
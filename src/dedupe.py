@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Deduplicación de ataques antes de evaluarlos con el defensor
+
+Las estrategias de plantilla muestrean con reemplazo de listas cortas y la
+generación con LLM se repite a menudo, así que en ejecuciones largas buena
+parte de las evaluaciones son de prompts ya vistos. AttackDeduplicator
+recuerda los últimos N ataques (LRU acotado) y detecta:
+
+- duplicados exactos: hash del texto normalizado (minúsculas, espacios)
+- casi-duplicados (opcional): SimHash de 64 bits sobre trigramas de
+  caracteres; dos textos son casi iguales si sus huellas difieren en
+  `max_distance` bits o menos. Las huellas se indexan partidas en
+  max_distance + 1 bloques: si difieren en <= max_distance bits al menos un
+  bloque coincide, así la búsqueda no recorre toda la memoria.
+
+Los hashes usan hash() de Python: son estables dentro del proceso, que es
+todo lo que necesita una memoria en RAM.
+
+Políticas ante un duplicado: "skip" (no evaluar), "reroll" (generar otro
+ataque, hasta `max_rerolls` veces) o "allow" (evaluar igualmente y solo
+contar).
+"""
+
+import re
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set
+
+from src.attacker import AttackPrompt
+
+POLICIES = ("skip", "reroll", "allow")
+
+DEFAULT_CAPACITY = 5000
+DEFAULT_MAX_DISTANCE = 6
+DEFAULT_MAX_REROLLS = 3
+SHINGLE_SIZE = 3
+_MASK64 = (1 << 64) - 1
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y espacios colapsados"""
+    return _SPACES.sub(" ", text.lower()).strip()
+
+
+def _hash64(data: str) -> int:
+    return hash(data) & _MASK64
+
+
+def simhash(text: str) -> int:
+    """Huella SimHash de 64 bits sobre trigramas de caracteres del texto normalizado"""
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    half = len(shingles) / 2
+
+    # Columnas de bits de todos los hashes: count() por columna corre en C
+    fingerprint = 0
+    for column in zip(*(format(_hash64(s), "064b") for s in shingles)):
+        fingerprint = (fingerprint << 1) | (column.count("1") > half)
+    return fingerprint
+
+
+def _band_layout(max_distance: int):
+    """(desplazamiento, máscara) de cada uno de los max_distance + 1 bloques"""
+    bands = max_distance + 1
+    width, extra = divmod(64, bands)
+    layout = []
+    offset = 0
+    for i in range(bands):
+        bits = width + (1 if i < extra else 0)
+        layout.append((offset, (1 << bits) - 1))
+        offset += bits
+    return layout
+
+
+class AttackDeduplicator:
+    """
+    Memoria acotada de ataques recientes con detección de duplicados
+    """
+
+    def __init__(self, policy: str = "skip", capacity: int = DEFAULT_CAPACITY,
+                 near_duplicates: bool = False, max_distance: int = DEFAULT_MAX_DISTANCE,
+                 max_rerolls: int = DEFAULT_MAX_REROLLS):
+        """
+        Args:
+            policy: "skip", "reroll" o "allow"
+            capacity: Ataques recordados (se olvidan los más antiguos)
+            near_duplicates: Detectar también casi-duplicados (SimHash)
+            max_distance: Bits de diferencia (de 64) máximos para casi-duplicado
+            max_rerolls: Intentos extra de generación con la política "reroll"
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Política de deduplicación desconocida: {policy}")
+        self.policy = policy
+        self.capacity = max(1, capacity)
+        self.near_duplicates = near_duplicates
+        self.max_distance = max(0, min(max_distance, 63))
+        self._layout = _band_layout(self.max_distance)
+        self.max_rerolls = max(0, max_rerolls)
+
+        # hash exacto -> huella SimHash (o None)
+        self._recent: "OrderedDict[int, Optional[int]]" = OrderedDict()
+        self._bands: Dict[tuple, Set[int]] = {}
+        self._fingerprints: Dict[int, int] = {}  # huella -> ataques que la usan
+
+        self.checked = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.rerolls = 0
+        self.saved = 0  # duplicados que no llegaron al defensor
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> Optional["AttackDeduplicator"]:
+        """Crea el deduplicador de la sección "dedupe" de config.json (None si está desactivado)"""
+        config = config or {}
+        if not config.get("enabled", False):
+            return None
+        return cls(
+            policy=config.get("policy", "skip"),
+            capacity=config.get("capacity", DEFAULT_CAPACITY),
+            near_duplicates=config.get("near_duplicates", False),
+            max_distance=config.get("max_distance", DEFAULT_MAX_DISTANCE),
+            max_rerolls=config.get("max_rerolls", DEFAULT_MAX_REROLLS)
+        )
+
+    def check(self, text: str) -> Optional[str]:
+        """
+        Comprueba un texto y lo recuerda
+
+        Returns:
+            "exact", "near" o None si es nuevo
+        """
+        self.checked += 1
+        normalized = normalize(text)
+        key = _hash64(normalized)
+
+        if key in self._recent:
+            self._recent.move_to_end(key)
+            self.exact_hits += 1
+            return "exact"
+
+        fingerprint = simhash(normalized) if self.near_duplicates else None
+        near = fingerprint is not None and self._find_near(fingerprint)
+
+        self._remember(key, fingerprint)
+        if near:
+            self.near_hits += 1
+            return "near"
+        return None
+
+    def filter(self, generate: Callable[[], AttackPrompt]) -> Optional[AttackPrompt]:
+        """
+        Genera un ataque aplicando la política ante duplicados
+
+        Args:
+            generate: Callable sin argumentos que produce un AttackPrompt
+
+        Returns:
+            El ataque a evaluar, o None si hay que saltarse la ronda
+        """
+        attack = generate()
+        attempts = 0
+        while self.check(attack.content) is not None:
+            if self.policy == "allow":
+                return attack
+            self.saved += 1
+            if self.policy == "skip" or attempts >= self.max_rerolls:
+                return None
+            attempts += 1
+            self.rerolls += 1
+            attack = generate()
+        return attack
+
+    def stats(self) -> Dict:
+        """Comprobados, duplicados exactos y casi-duplicados, re-rolls y evaluaciones ahorradas"""
+        return {
+            "policy": self.policy,
+            "remembered": len(self._recent),
+            "checked": self.checked,
+            "exact": self.exact_hits,
+            "near": self.near_hits,
+            "rerolls": self.rerolls,
+            "saved": self.saved
+        }
+
+    def _band_keys(self, fingerprint: int):
+        return [(i, (fingerprint >> offset) & mask) for i, (offset, mask) in enumerate(self._layout)]
+
+    def _find_near(self, fingerprint: int) -> bool:
+        candidates = set()
+        for band in self._band_keys(fingerprint):
+            candidates.update(self._bands.get(band, ()))
+        return any(bin(fingerprint ^ other).count("1") <= self.max_distance for other in candidates)
+
+    def _remember(self, key: int, fingerprint: Optional[int]):
+        self._recent[key] = fingerprint
+        if fingerprint is not None:
+            if self._fingerprints.get(fingerprint, 0) == 0:
+                for band in self._band_keys(fingerprint):
+                    self._bands.setdefault(band, set()).add(fingerprint)
+            self._fingerprints[fingerprint] = self._fingerprints.get(fingerprint, 0) + 1
+
+        while len(self._recent) > self.capacity:
+            _, old = self._recent.popitem(last=False)
+            if old is None:
+                continue
+            remaining = self._fingerprints[old] - 1
+            if remaining:
+                self._fingerprints[old] = remaining
+                continue
+            del self._fingerprints[old]
+            for band in self._band_keys(old):
+                bucket = self._bands[band]
+                bucket.discard(old)
+                if not bucket:
+                    del self._bands[band]
@@ -4,15 +4,102 @@
 Cliente LLM para comunicarse con LM Studio (o cualquier API compatible con OpenAI)
 """
 
+import threading
+import time
 import requests
 import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, AsyncIterator, Tuple
+from src.scheduler import Priority, get_scheduler
+
+
+class SingleFlight:
+    """
+    Agrupa peticiones idénticas que están en vuelo al mismo tiempo
+
+    La primera llamada con una clave ejecuta la petición real; las que
+    llegan mientras sigue en curso esperan y reciben el mismo resultado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "_Flight"] = {}
+        self.requests = 0
+        self.upstream_calls = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn):
+        """
+        Ejecuta fn() una sola vez por clave entre llamadas concurrentes
+
+        Args:
+            key: Clave de la petición
+            fn: Función sin argumentos que hace la petición real
+
+        Returns:
+            Resultado de fn() (compartido entre todas las llamadas agrupadas)
+        """
+        with self._lock:
+            self.requests += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self.upstream_calls += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna los contadores de peticiones, llamadas reales y ahorradas"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "upstream_calls": self.upstream_calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._inflight)
+            }
+
+
+class _Flight:
+    """Petición en curso dentro de SingleFlight"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+# Compartido por todos los clientes: atacante y defensor pueden apuntar al
+# mismo servidor, y la clave incluye URL y modelo
+single_flight = SingleFlight()
 
 
 class LLMClient:
     """Cliente para interactuar con modelos LLM locales"""
 
-    def __init__(self, base_url: str, model_name: str, temperature: float = 0.7, max_tokens: int = 500):
+    # Solo se agrupan peticiones casi deterministas (p. ej. el juez a 0.1):
+    # compartir una generación creativa devolvería el mismo ataque a dos llamadores
+    SINGLE_FLIGHT_MAX_TEMPERATURE = 0.3
+
+    def __init__(self, base_url: str, model_name: str, temperature: float = 0.7, max_tokens: int = 500,
+                 priority: Priority = Priority.ATTACKER):
         """
         Inicializa el cliente LLM
 
@@ -21,19 +108,28 @@ class LLMClient:
             model_name: Nombre del modelo
             temperature: Temperatura para generación (0.0 = determinista, 1.0 = creativo)
             max_tokens: Máximo de tokens a generar
+            priority: Prioridad de las peticiones en el planificador del backend
         """
         self.base_url = base_url
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.priority = priority
+        self.scheduler = get_scheduler(base_url)
+        # Tokens consumidos por las peticiones no streaming de este cliente;
+        # el cliente se comparte entre hilos (pool, campañas, torneo)
+        self.usage = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._usage_lock = threading.Lock()
 
-    def chat(self, messages: List[Dict[str, str]], temperature: Optional[float] = None) -> str:
+    def chat(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+             priority: Optional[Priority] = None) -> str:
         """
         Envía mensajes al LLM y obtiene respuesta
 
         Args:
             messages: Lista de mensajes en formato [{"role": "user", "content": "..."}]
             temperature: Override temperatura (opcional)
+            priority: Override prioridad (opcional)
 
         Returns:
             Respuesta del modelo como string
@@ -46,24 +142,102 @@ class LLMClient:
             "stream": False
         }
 
+        priority = priority if priority is not None else self.priority
+
+        if payload["temperature"] <= self.SINGLE_FLIGHT_MAX_TEMPERATURE:
+            key = json.dumps([self.base_url, payload], sort_keys=True, ensure_ascii=False)
+            return single_flight.do(key, lambda: self._post(payload, priority))
+        return self._post(payload, priority)
+
+    def _post(self, payload: Dict, priority: Priority) -> str:
+        """Hace la petición HTTP de chat completion y extrae el texto"""
+        choices = self._post_choices(payload, priority)
+        return choices[0] if choices else ""
+
+    def _post_choices(self, payload: Dict, priority: Priority) -> List[str]:
+        """Hace la petición HTTP de chat completion y extrae el texto de cada choice"""
         try:
-            response = requests.post(
-                self.base_url,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=60
-            )
-            response.raise_for_status()
+            with self.scheduler.slot(priority, payload["model"]) as ticket:
+                response = requests.post(
+                    self.base_url,
+                    json=payload,
+                    headers={"Content-Type": "application/json"},
+                    timeout=60
+                )
+                response.raise_for_status()
+                result = response.json()
+                usage = result.get("usage") or {}
+                ticket.tokens = usage.get("completion_tokens")
+
+            with self._usage_lock:
+                self.usage["requests"] += 1
+                self.usage["prompt_tokens"] += usage.get("prompt_tokens") or 0
+                self.usage["completion_tokens"] += usage.get("completion_tokens") or 0
 
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+            choices = [choice["message"]["content"] for choice in result["choices"]]
+            if not choices:
+                raise IndexError("respuesta sin choices")
+            return choices
 
         except requests.exceptions.RequestException as e:
             print(f"❌ Error conectando con LLM: {e}")
-            return ""
-        except (KeyError, IndexError) as e:
+            return []
+        except (KeyError, IndexError, TypeError) as e:
             print(f"❌ Error parseando respuesta: {e}")
-            return ""
+            return []
+
+    def chat_choices(self, messages: List[Dict[str, str]], n: int, temperature: Optional[float] = None,
+                     max_tokens: Optional[int] = None, priority: Optional[Priority] = None) -> List[str]:
+        """
+        Pide `n` respuestas independientes en una sola petición (parámetro `n`)
+
+        Los servidores que ignoran `n` (LM Studio, llama.cpp) devuelven una
+        sola choice; quien llama debe comprobar cuántas recibió.
+
+        Args:
+            messages: Lista de mensajes en formato [{"role": "user", "content": "..."}]
+            n: Número de respuestas a pedir
+            temperature: Override temperatura (opcional)
+            max_tokens: Override de tokens máximos por respuesta (opcional)
+            priority: Override prioridad (opcional)
+
+        Returns:
+            Lista de respuestas (vacía si hubo error)
+        """
+        payload = {
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": temperature if temperature is not None else self.temperature,
+            "max_tokens": max_tokens if max_tokens is not None else self.max_tokens,
+            "n": n,
+            "stream": False
+        }
+        return self._post_choices(payload, priority if priority is not None else self.priority)
+
+    def chat_stream(self, messages: List[Dict[str, str]], temperature: Optional[float] = None,
+                    priority: Optional[Priority] = None) -> "ChatStream":
+        """
+        Envía mensajes al LLM en modo streaming (SSE)
+
+        Args:
+            messages: Lista de mensajes en formato [{"role": "user", "content": "..."}]
+            temperature: Override temperatura (opcional)
+            priority: Override prioridad (opcional)
+
+        Returns:
+            ChatStream iterable (sync con `for`, async con `async for`) que
+            produce los fragmentos de texto a medida que llegan
+        """
+        payload = {
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": temperature if temperature is not None else self.temperature,
+            "max_tokens": self.max_tokens,
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
+        return ChatStream(self.base_url, payload, scheduler=self.scheduler,
+                          priority=priority if priority is not None else self.priority)
 
     def simple_prompt(self, prompt: str, temperature: Optional[float] = None) -> str:
         """
@@ -79,6 +253,34 @@ class LLMClient:
         messages = [{"role": "user", "content": prompt}]
         return self.chat(messages, temperature)
 
+    def usage_stats(self) -> Dict[str, int]:
+        """Retorna una copia consistente de los contadores de uso"""
+        with self._usage_lock:
+            return dict(self.usage)
+
+    def system_prompt(self, system: str, prompt: str, temperature: Optional[float] = None,
+                      priority: Optional[Priority] = None) -> str:
+        """
+        Envía un prompt con instrucciones fijas en el mensaje de sistema
+
+        Mantener `system` idéntico entre llamadas deja un prefijo común que
+        los servidores con prefix caching (llama.cpp, LM Studio) no reprocesan.
+
+        Args:
+            system: Instrucciones estáticas
+            prompt: Parte variable del prompt
+            temperature: Override temperatura (opcional)
+            priority: Override prioridad (opcional)
+
+        Returns:
+            Respuesta del modelo
+        """
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ]
+        return self.chat(messages, temperature, priority=priority)
+
     def is_available(self) -> bool:
         """
         Verifica si el servidor LLM está disponible
@@ -96,6 +298,227 @@ class LLMClient:
         except:
             return False
 
+    def warmup(self, system: Optional[str] = None) -> Optional[float]:
+        """
+        Envía una petición mínima para cargar el modelo y calentar su caché
+
+        Args:
+            system: System prompt a dejar en el prefix cache (p. ej. el del juez)
+
+        Returns:
+            Segundos que tardó, o None si el servidor no está disponible
+        """
+        if not self.is_available():
+            return None
+
+        messages = [{"role": "user", "content": "ok"}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+
+        payload = {
+            "model": self.model_name,
+            "messages": messages,
+            "temperature": 0.0,
+            "max_tokens": 1,
+            "stream": False
+        }
+
+        # Con la prioridad propia del cliente: el warmup del juez ocupa el slot
+        # reservado y no espera detrás del warmup del atacante
+        start = time.perf_counter()
+        self._post(payload, self.priority)
+        return time.perf_counter() - start
+
+
+class Warmup:
+    """
+    Warmup concurrente de varios modelos en segundo plano
+
+    Cada modelo distinto (URL + nombre) recibe su petición de warmup en un
+    hilo propio mientras el resto de la inicialización continúa; wait()
+    retorna los tiempos para reportarlos aparte de la ejecución.
+    """
+
+    def __init__(self, targets: List[Tuple["LLMClient", Optional[str]]]):
+        """
+        Args:
+            targets: Lista de (cliente, system prompt opcional a precargar)
+        """
+        self.results: Dict[str, Optional[float]] = {}
+        self.elapsed: Optional[float] = None
+        self._start = time.perf_counter()
+        self._threads = []
+
+        seen = set()
+        for client, system in targets:
+            if client is None:
+                continue
+            key = (client.base_url, client.model_name, system)
+            if key in seen:
+                continue
+            seen.add(key)
+            thread = threading.Thread(target=self._run, args=(client, system), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self, client: "LLMClient", system: Optional[str]):
+        self.results[client.model_name] = client.warmup(system)
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """
+        Espera a que terminen los warmups
+
+        Returns:
+            {modelo: segundos o None si no estaba disponible}
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for thread in self._threads:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            thread.join(remaining)
+        if self.elapsed is None and not any(t.is_alive() for t in self._threads):
+            self.elapsed = time.perf_counter() - self._start
+        return dict(self.results)
+
+    def report(self) -> str:
+        """Línea de resumen con el tiempo de warmup por modelo"""
+        results = self.wait()
+        parts = [f"{model}: {'no disponible' if t is None else f'{t:.2f}s'}" for model, t in results.items()]
+        return f"Warmup {self.elapsed or 0.0:.2f}s ({', '.join(parts) or 'sin modelos'})"
+
+
+class ChatStream:
+    """
+    Respuesta en streaming de un chat completion
+
+    Se consume con `for delta in stream` o `async for delta in stream`.
+    Al terminar (o al cancelar) quedan disponibles el texto ensamblado en
+    `text`, el uso de tokens en `usage`, el motivo de fin en `finish_reason`
+    y, si el servidor los envía (llama.cpp), los tiempos en `timings`.
+    """
+
+    def __init__(self, url: str, payload: Dict, timeout: int = 60,
+                 scheduler=None, priority: Priority = Priority.ATTACKER):
+        self.url = url
+        self.payload = payload
+        self.timeout = timeout
+        self.scheduler = scheduler or get_scheduler(url)
+        self.priority = priority
+        self.text = ""
+        self.usage: Optional[Dict[str, int]] = None
+        self.finish_reason: Optional[str] = None
+        self.timings: Optional[Dict[str, float]] = None
+        self.error: Optional[str] = None
+        self._cancel = threading.Event()
+        self._consumed = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """Aborta el stream; la conexión se cierra al recibir el próximo chunk"""
+        self._cancel.set()
+
+    def __iter__(self) -> Iterator[str]:
+        if self._consumed:
+            raise RuntimeError("ChatStream ya fue consumido")
+        self._consumed = True
+
+        parts = []
+        try:
+            # El slot del backend se mantiene ocupado durante todo el stream
+            with self.scheduler.slot(self.priority, self.payload["model"]) as ticket, requests.post(
+                self.url,
+                json=self.payload,
+                headers={"Content-Type": "application/json", "Accept": "text/event-stream"},
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+
+                # SSE es UTF-8 por definición; decode_unicode usaría
+                # response.encoding, que sin charset en el Content-Type es
+                # ISO-8859-1 y estropea los acentos y la ñ
+                for raw in response.iter_lines():
+                    if self._cancel.is_set():
+                        self.finish_reason = "cancelled"
+                        break
+                    line = raw.decode("utf-8")
+                    if not line or not line.startswith("data:"):
+                        continue
+
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+
+                    chunk = json.loads(data)
+                    if chunk.get("usage"):
+                        self.usage = chunk["usage"]
+                    if chunk.get("timings"):
+                        # Extensión de llama.cpp: prompt_ms, prompt_n, predicted_ms...
+                        self.timings = chunk["timings"]
+
+                    for choice in chunk.get("choices", []):
+                        if choice.get("finish_reason"):
+                            self.finish_reason = choice["finish_reason"]
+                        delta = choice.get("delta", {}).get("content")
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+
+                if not self.cancelled:
+                    # Un stream cancelado no es una muestra de latencia válida
+                    ticket.tokens = (self.usage or {}).get("completion_tokens", len(parts))
+
+        except requests.exceptions.RequestException as e:
+            self.error = str(e)
+            print(f"❌ Error conectando con LLM: {e}")
+        except (json.JSONDecodeError, UnicodeDecodeError, AttributeError) as e:
+            self.error = str(e)
+            print(f"❌ Error parseando respuesta: {e}")
+        finally:
+            self.text = "".join(parts)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        # requests es bloqueante: el stream se lee en un hilo y los
+        # fragmentos se pasan al event loop a través de una cola.
+        # asyncio se importa aquí: ya está cargado si hay un loop en marcha y
+        # así no cuesta ~60ms en el arranque de quien no lo usa
+        import asyncio
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def pump():
+            try:
+                for delta in self:
+                    loop.call_soon_threadsafe(queue.put_nowait, delta)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        worker = threading.Thread(target=pump, daemon=True)
+        worker.start()
+
+        finished = False
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    finished = True
+                    break
+                yield item
+        finally:
+            # Si el consumidor sale antes (break / cancelación de la tarea)
+            # se corta también la lectura en el hilo
+            if not finished:
+                self.cancel()
+
+    def collect(self) -> str:
+        """Consume el stream completo y retorna el texto ensamblado"""
+        for _ in self:
+            pass
+        return self.text
+
 
 # Función de utilidad para crear clientes desde config
 def create_client_from_config(config: Dict) -> LLMClient:
@@ -103,7 +526,8 @@ def create_client_from_config(config: Dict) -> LLMClient:
     Crea un cliente LLM desde un diccionario de configuración
 
     Args:
-        config: Diccionario con keys: url, name, temperature, max_tokens
+        config: Diccionario con keys: url, name, temperature, max_tokens,
+            priority ("judge", "attacker" o "background")
 
     Returns:
         Instancia de LLMClient
@@ -112,5 +536,6 @@ def create_client_from_config(config: Dict) -> LLMClient:
         base_url=config["url"],
         model_name=config["name"],
         temperature=config.get("temperature", 0.7),
-        max_tokens=config.get("max_tokens", 500)
+        max_tokens=config.get("max_tokens", 500),
+        priority=Priority[config.get("priority", "attacker").upper()]
     )
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de mutaciones programáticas sobre prompts semilla
+
+Genera variantes de un ataque sin pasar por el LLM, para estresar al
+defensor con miles de mensajes por segundo. Cada mutación es una función
+(texto, rng) -> texto y se pueden componer libremente; el motor elige y
+encadena mutaciones al azar con un generador propio, así una misma semilla
+reproduce la misma secuencia de variantes.
+
+Mutaciones disponibles:
+- spacing: espacios entre letras de algunas palabras ("o l v i d a")
+- separators: separadores entre letras o palabras ("o-l-v-i-d-a", ">>>")
+- leetspeak: sustitución de letras por dígitos ("c0nf1gur4c10n")
+- homoglyphs: letras latinas cambiadas por sus equivalentes cirílicas
+- case: mayúsculas alternas, aleatorias o palabras enteras en mayúscula
+- synonyms: cambio de palabras o frases por las de la tabla de sinónimos
+  del corpus (sección "mutations.synonyms" de data/attack_corpus.json)
+"""
+
+import random
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+Mutator = Callable[[str, random.Random], str]
+
+LEET_MAP = {"a": "4", "e": "3", "i": "1", "o": "0", "s": "5", "t": "7", "g": "9", "b": "8"}
+
+HOMOGLYPH_MAP = {
+    "a": "а", "c": "с", "e": "е", "i": "і", "j": "ј", "o": "о", "p": "р",
+    "s": "ѕ", "x": "х", "y": "у", "A": "А", "B": "В", "C": "С", "E": "Е",
+    "H": "Н", "K": "К", "M": "М", "O": "О", "P": "Р", "T": "Т", "X": "Х"
+}
+
+SEPARATORS = ["-", ".", "_", "*", "/", "·"]
+WORD_SEPARATORS = [" >> ", " >>> ", " | ", " --> ", " :: "]
+
+UNIQUE_WINDOW = 100000  # variantes recordadas para descartar repetidas
+WORD_RATE = 0.4  # fracción de palabras afectadas por las mutaciones por palabra
+CHAR_RATE = 0.5  # fracción de letras sustituidas dentro de una palabra afectada
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _mutate_words(text: str, rng: random.Random, fn: Callable[[str, random.Random], str],
+                  min_length: int = 3) -> str:
+    """Aplica `fn` a una fracción de las palabras (al menos una) de longitud suficiente"""
+    words = [m for m in _WORD.finditer(text) if len(m.group()) >= min_length]
+    if not words:
+        return text
+
+    chosen = {m.start() for m in words if rng.random() < WORD_RATE}
+    if not chosen:
+        chosen.add(rng.choice(words).start())
+
+    parts = []
+    last = 0
+    for m in words:
+        if m.start() in chosen:
+            parts.append(text[last:m.start()])
+            parts.append(fn(m.group(), rng))
+            last = m.end()
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+def _substitute(word: str, rng: random.Random, table: Dict[str, str]) -> str:
+    return "".join(table[c] if c in table and rng.random() < CHAR_RATE else c for c in word)
+
+
+def spacing(text: str, rng: random.Random) -> str:
+    """Separa con espacios las letras de algunas palabras"""
+    return _mutate_words(text, rng, lambda w, r: " ".join(w))
+
+
+def separators(text: str, rng: random.Random) -> str:
+    """Intercala separadores entre letras, o entre palabras si se elige el modo frase"""
+    if rng.random() < 0.3:
+        words = text.split()
+        if len(words) > 1:
+            sep = rng.choice(WORD_SEPARATORS)
+            return sep.join(words)
+    sep = rng.choice(SEPARATORS)
+    return _mutate_words(text, rng, lambda w, r: sep.join(w))
+
+
+def leetspeak(text: str, rng: random.Random) -> str:
+    """Cambia letras por dígitos parecidos"""
+    return _mutate_words(text, rng, lambda w, r: "".join(
+        LEET_MAP.get(c.lower(), c) if r.random() < CHAR_RATE else c for c in w))
+
+
+def homoglyphs(text: str, rng: random.Random) -> str:
+    """Cambia letras latinas por homoglifos cirílicos (visualmente idénticos)"""
+    return _mutate_words(text, rng, lambda w, r: _substitute(w, r, HOMOGLYPH_MAP))
+
+
+def case(text: str, rng: random.Random) -> str:
+    """Altera mayúsculas: alternas, aleatorias o palabras completas"""
+    mode = rng.randrange(3)
+    if mode == 0:
+        return "".join(c.upper() if i % 2 else c.lower() for i, c in enumerate(text))
+    if mode == 1:
+        return "".join(c.upper() if rng.random() < 0.5 else c.lower() for c in text)
+    return _mutate_words(text, rng, lambda w, r: w.upper())
+
+
+def make_synonyms(table: Dict[str, Sequence[str]]) -> Mutator:
+    """
+    Crea la mutación de sinónimos a partir de una tabla {frase: [alternativas]}
+
+    Las frases más largas se prueban antes para que "instrucciones previas"
+    gane a "instrucciones". La búsqueda no distingue mayúsculas.
+    """
+    keys = sorted(table, key=len, reverse=True)
+    if not keys:
+        return lambda text, rng: text
+
+    pattern = re.compile(r"\b(" + "|".join(re.escape(k) for k in keys) + r")\b", re.IGNORECASE)
+    lookup = {k.lower(): list(v) for k, v in table.items() if v}
+
+    def synonyms(text: str, rng: random.Random) -> str:
+        return pattern.sub(lambda m: rng.choice(lookup[m.group().lower()])
+                           if m.group().lower() in lookup else m.group(), text)
+
+    return synonyms
+
+
+BASE_MUTATORS: Dict[str, Mutator] = {
+    "spacing": spacing,
+    "separators": separators,
+    "leetspeak": leetspeak,
+    "homoglyphs": homoglyphs,
+    "case": case,
+}
+
+
+def compose(*mutators: Mutator) -> Mutator:
+    """Encadena mutaciones de izquierda a derecha"""
+    def composed(text: str, rng: random.Random) -> str:
+        for mutator in mutators:
+            text = mutator(text, rng)
+        return text
+    return composed
+
+
+class MutationEngine:
+    """
+    Aplica combinaciones aleatorias de mutaciones a prompts semilla
+    """
+
+    def __init__(self, synonyms: Optional[Dict[str, Sequence[str]]] = None,
+                 mutators: Optional[Iterable[str]] = None, max_ops: int = 2,
+                 seed: Optional[int] = None, rng: Optional[random.Random] = None):
+        """
+        Args:
+            synonyms: Tabla {frase: [alternativas]} para la mutación "synonyms"
+            mutators: Nombres de las mutaciones habilitadas (por defecto todas)
+            max_ops: Máximo de mutaciones encadenadas por variante
+            seed: Semilla del generador propio del motor
+            rng: Generador a usar (tiene prioridad sobre `seed`)
+        """
+        available = dict(BASE_MUTATORS)
+        if synonyms:
+            available["synonyms"] = make_synonyms(synonyms)
+
+        names = list(mutators) if mutators is not None else list(available)
+        unknown = [n for n in names if n not in available]
+        if unknown:
+            raise ValueError(f"Mutaciones desconocidas: {', '.join(unknown)}")
+
+        self.mutators: Dict[str, Mutator] = {n: available[n] for n in names}
+        self._names = list(self.mutators)
+        self.max_ops = max(1, max_ops)
+        self.rng = rng if rng is not None else random.Random(seed)
+
+    def mutate(self, text: str, ops: Optional[Sequence[str]] = None) -> str:
+        """
+        Retorna una variante de `text`
+
+        Args:
+            text: Prompt semilla
+            ops: Mutaciones a aplicar en orden (por defecto 1..max_ops al azar)
+        """
+        if ops is None:
+            count = self.rng.randint(1, min(self.max_ops, len(self._names)))
+            ops = self.rng.sample(self._names, count)
+            # Sinónimos primero: después de leetspeak u homoglifos ya no casan
+            if "synonyms" in ops:
+                ops.remove("synonyms")
+                ops.insert(0, "synonyms")
+
+        for name in ops:
+            text = self.mutators[name](text, self.rng)
+        return text
+
+    def variants(self, seeds: Sequence[str], count: Optional[int] = None,
+                 unique: bool = True) -> Iterator[str]:
+        """
+        Generador de variantes de las semillas (rotándolas en orden)
+
+        Args:
+            seeds: Prompts semilla
+            count: Variantes a producir (None = infinito)
+            unique: Omitir variantes repetidas o idénticas a su semilla
+        """
+        if not seeds:
+            return
+
+        seen = set(seeds) if unique else None
+        produced = 0
+        attempts = 0
+        while count is None or produced < count:
+            seed = seeds[attempts % len(seeds)]
+            attempts += 1
+            variant = self.mutate(seed)
+            if seen is not None:
+                if variant in seen:
+                    # Semillas muy cortas agotan combinaciones: no bucle infinito
+                    if attempts > 100 * (produced + len(seeds)):
+                        return
+                    continue
+                if len(seen) >= UNIQUE_WINDOW:
+                    seen = set(seeds)
+                seen.add(variant)
+            produced += 1
+            yield variant
+
+    def available(self) -> List[str]:
+        """Nombres de las mutaciones habilitadas"""
+        return list(self._names)
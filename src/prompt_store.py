@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Prompt Store - Memory-mapped columnar cache of prompt texts
+
+One-time export of a text column to two flat files:
+
+    offsets.bin  n + 1 unsigned 64-bit offsets (native byte order)
+    text.bin     UTF-8 bytes of every prompt, concatenated
+
+Prompt i is text.bin[offsets[i]:offsets[i + 1]]. Each export writes both
+files into a new generation directory with a unique name. It then
+replaces meta.json (count, blob size, byte order, source and generation)
+with a single rename. A reader therefore always opens the text blob and
+offsets of the same generation, and concurrent exports never share temp
+files.
+
+Opening maps both files read-only, so it takes milliseconds regardless of
+size. Random access is O(1) without importing `datasets`, and several
+worker processes reading the same store share its pages through the OS
+page cache.
+"""
+
+import json
+import logging
+import mmap
+import os
+import random
+import shutil
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+STORE_VERSION = 2
+READABLE_VERSIONS = (1, 2)  # version 1 kept the data files next to meta.json
+OFFSETS_FILE = "offsets.bin"
+TEXT_FILE = "text.bin"
+META_FILE = "meta.json"
+GENERATION_PREFIX = "gen-"
+
+
+def _read_meta(path: Path) -> Optional[Dict]:
+    try:
+        with open(path / META_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def export_prompt_store(texts: Iterable[str], path, source: str = "") -> int:
+    """
+    Write texts to a prompt store (streaming; only the offsets stay in memory)
+
+    Args:
+        texts: Prompt strings, in row order
+        path: Store directory (created if missing)
+        source: Free-form description saved in meta.json
+
+    Returns:
+        Number of prompts written
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    generation = Path(tempfile.mkdtemp(prefix=GENERATION_PREFIX, dir=path))
+
+    try:
+        offsets = array("Q", [0])
+        with open(generation / TEXT_FILE, "wb") as blob:
+            for text in texts:
+                data = str(text).encode("utf-8")
+                blob.write(data)
+                offsets.append(offsets[-1] + len(data))
+        with open(generation / OFFSETS_FILE, "wb") as f:
+            offsets.tofile(f)
+
+        count = len(offsets) - 1
+        meta = {"version": STORE_VERSION, "count": count, "text_bytes": offsets[-1],
+                "byteorder": sys.byteorder, "source": source, "generation": generation.name}
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path, prefix=META_FILE,
+                                         suffix=".tmp", delete=False) as f:
+            json.dump(meta, f, indent=2)
+        previous = _read_meta(path)
+        os.replace(f.name, path / META_FILE)
+    except BaseException:
+        shutil.rmtree(generation, ignore_errors=True)
+        raise
+
+    # The generation this export replaced is no longer referenced. Readers
+    # that already mapped it keep their pages; one that read the old meta
+    # but has not opened the files yet retries (PromptStore.open)
+    if previous is not None:
+        old = previous.get("generation")
+        if old and old != generation.name:
+            shutil.rmtree(path / old, ignore_errors=True)
+        elif not old:
+            for name in (TEXT_FILE, OFFSETS_FILE):
+                (path / name).unlink(missing_ok=True)
+
+    logging.info(f"Prompt store with {count} prompts written to {path}")
+    return count
+
+
+class PromptStore:
+    """
+    Read-only, memory-mapped view of an exported prompt store
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Store directory written by export_prompt_store
+        """
+        self.path = Path(path)
+        with open(self.path / META_FILE, "r", encoding="utf-8") as f:
+            self.meta: Dict = json.load(f)
+        if self.meta.get("version") not in READABLE_VERSIONS:
+            raise ValueError(f"Unsupported prompt store version: {self.meta.get('version')}")
+        if self.meta.get("byteorder") != sys.byteorder:
+            raise ValueError("Prompt store was written with a different byte order; re-export it")
+
+        data_dir = self.path / self.meta.get("generation", "")
+        self._offsets_file = open(data_dir / OFFSETS_FILE, "rb")
+        try:
+            self._text_file = open(data_dir / TEXT_FILE, "rb")
+        except OSError:
+            self._offsets_file.close()
+            raise
+        self._offsets_map = mmap.mmap(self._offsets_file.fileno(), 0, access=mmap.ACCESS_READ)
+        # mmap rejects empty files: an empty blob means every prompt is ""
+        self._text_map = (mmap.mmap(self._text_file.fileno(), 0, access=mmap.ACCESS_READ)
+                          if self._text_file.seek(0, 2) else b"")
+        self._offsets = memoryview(self._offsets_map).cast("Q")
+        self._count = len(self._offsets) - 1
+
+        text_bytes = os.fstat(self._text_file.fileno()).st_size
+        if (self._count != self.meta.get("count") or self._offsets[-1] != text_bytes
+                or self.meta.get("text_bytes", text_bytes) != text_bytes):
+            self.close()
+            raise ValueError("Prompt store files do not match meta.json")
+
+    @classmethod
+    def open(cls, path) -> Optional["PromptStore"]:
+        """Open a store, or return None if it does not exist or is unreadable"""
+        if not (Path(path) / META_FILE).exists():
+            return None
+        try:
+            try:
+                return cls(path)
+            except FileNotFoundError:
+                # A concurrent export replaced meta.json and removed the
+                # generation it pointed to: the new meta is already in place
+                return cls(path)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not open prompt store at {path}: {e}")
+            return None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("prompt store index out of range")
+        return self._text_map[self._offsets[index]:self._offsets[index + 1]].decode("utf-8")
+
+    def sample(self, num_samples: int, rng=random) -> List[str]:
+        """Random prompts without replacement"""
+        indices = rng.sample(range(self._count), min(num_samples, self._count))
+        return [self[i] for i in indices]
+
+    def close(self):
+        self._offsets.release()
+        self._offsets_map.close()
+        if isinstance(self._text_map, mmap.mmap):
+            self._text_map.close()
+        self._offsets_file.close()
+        self._text_file.close()
@@ -9,21 +9,22 @@ import threading
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 from enum import Enum
-import random
 
 from rich.console import Console, Group
 from rich.live import Live
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
-from rich.columns import Columns
 from rich.layout import Layout
-from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.align import Align
 
 from src.attacker import AdvancedAttacker, AttackStrategy
 from src.defender import AxioDefender
-from src.llm_client import LLMClient
+from src.llm_client import LLMClient, single_flight
+from src.bandit import create_selector, llm_calls
+from src.dedupe import AttackDeduplicator
+from src.results_store import ResultsStore
+from src.tournament import Tournament, create_tournament
 
 
 class DashboardMode(Enum):
@@ -54,16 +55,30 @@ class RealtimeDashboard:
     Dashboard en tiempo real para visualizar ataques y defensas
     """
 
-    def __init__(self, defender: AxioDefender, attacker: AdvancedAttacker):
+    def __init__(self, defender: AxioDefender, attacker: AdvancedAttacker, selector_method: str = "thompson",
+                 dedupe: Optional[AttackDeduplicator] = None, config: Optional[Dict] = None,
+                 store: Optional[ResultsStore] = None):
         self.console = Console()
+        self.config = config or {}
         self.defender = defender
         self.attacker = attacker
+        # Descarta ataques repetidos antes de gastar una evaluación
+        self.dedupe = dedupe
+        # Elección de (estrategia, amenaza) en el ataque automático
+        self.selector = create_selector(attacker.corpus, selector_method,
+                                        valid=[s.value for s in AttackStrategy], rng=attacker.rng)
         self.stats = LiveStats()
         self.mode = DashboardMode.MANUAL
         self.is_running = False
         self.attack_history: List[Dict] = []
         self.current_attack: Optional[Dict] = None
         self.response_times: List[float] = []
+        # Modo torneo: matriz atacantes x defensores en paralelo
+        self.tournament: Optional[Tournament] = None
+        self._leaderboard_table = (-1, None)  # (versión de la clasificación, tabla ya construida)
+        # Cada ataque registrado se guarda en SQLite (logging.save_conversations)
+        self.store = store
+        self.run_id = store.start_run("dashboard", {"selector": selector_method}) if store is not None else None
 
     def create_layout(self) -> Layout:
         """Crear el layout del dashboard"""
@@ -86,9 +101,12 @@ class RealtimeDashboard:
             Layout(name="right", ratio=1)
         )
 
-        # Left panel - Attack/Defense log
-        attack_log = self._create_attack_log()
-        layout["left"].update(Panel(attack_log, title="🎯 Ataques y Defensas", border_style="red"))
+        # Left panel - Attack/Defense log (o clasificación en modo torneo)
+        if self.mode == DashboardMode.TOURNAMENT and self.tournament is not None:
+            layout["left"].update(Panel(self._create_leaderboard(), title="🏆 Torneo", border_style="red"))
+        else:
+            attack_log = self._create_attack_log()
+            layout["left"].update(Panel(attack_log, title="🎯 Ataques y Defensas", border_style="red"))
 
         # Right panel - Stats and Vector
         stats_panel = self._create_stats_panel()
@@ -141,6 +159,34 @@ class RealtimeDashboard:
 
         return table
 
+    def _create_leaderboard(self) -> Group:
+        """Clasificación del torneo; solo se reconstruye si ha terminado algún partido"""
+        leaderboard = self.tournament.leaderboard
+        version, cached = self._leaderboard_table
+        if cached is not None and version == leaderboard.version:
+            return cached
+
+        version = leaderboard.version
+        tables = []
+        for side, title in (("attacker", "Atacantes"), ("defender", "Defensores")):
+            table = Table(show_header=True, header_style="bold magenta", title=title)
+            table.add_column("#", width=3, justify="right")
+            table.add_column("Participante", max_width=32, overflow="ellipsis")
+            table.add_column("Partidos", justify="right")
+            table.add_column("Rondas", justify="right")
+            table.add_column("Bypass", justify="right")
+            for position, standing in enumerate(leaderboard.standings(side), 1):
+                table.add_row(str(position), standing.name, str(standing.matches), str(standing.rounds),
+                              f"{standing.bypass_rate:.1%}")
+            tables.append(table)
+
+        stats = self.tournament.stats()
+        progress = Text(f"Partidos {stats['matches']}/{stats['fixtures']} | {stats['rounds_per_sec']:.1f} rondas/s | "
+                        f"caché juez {stats['judge_cache_hit_rate']:.0%}", style="dim")
+        group = Group(tables[0], "\n", tables[1], progress)
+        self._leaderboard_table = (version, group)
+        return group
+
     def _create_stats_panel(self) -> Table:
         """Crear panel de estadísticas"""
         stats_table = Table(show_header=False, box=None)
@@ -160,6 +206,29 @@ class RealtimeDashboard:
         stats_table.add_row("Score de Riesgo", ".2f")
         stats_table.add_row("Tiempo Resp. Promedio", ".2f")
 
+        # Peticiones idénticas en vuelo agrupadas por el cliente LLM
+        flight_stats = single_flight.stats()
+        stats_table.add_row("Llamadas LLM Reales", str(flight_stats["upstream_calls"]))
+        stats_table.add_row("Llamadas LLM Ahorradas", Text(str(flight_stats["coalesced"]), style="green"))
+
+        # Límite de concurrencia (AIMD) y cola del backend compartido
+        llm_client = self.defender.llm_client or self.attacker.llm_client
+        if llm_client is not None:
+            backend = llm_client.scheduler.stats()
+            stats_table.add_row("Concurrencia LLM", f"{backend['in_flight']}/{backend['limit']}")
+            stats_table.add_row("Cola LLM", str(backend['queue_depth']))
+
+        if self.dedupe is not None:
+            stats_table.add_row("Evaluaciones Ahorradas", Text(str(self.dedupe.saved), style="green"))
+
+        # Rendimiento del selector del ataque automático
+        selector_stats = self.selector.summary()
+        if selector_stats["rounds"]:
+            stats_table.add_row("Bypass/Llamada LLM", f"{selector_stats['bypasses_per_call']:.2f}")
+            best = selector_stats["arms"][0]
+            if best["bypasses"]:
+                stats_table.add_row("Mejor Brazo", f"{best['strategy']}/{best['threat']}")
+
         # Vector de estado
         vector_table = Table(show_header=True, header_style="bold blue", title="Vector de Estado")
         vector_table.add_column("Tipo", width=8)
@@ -169,7 +238,6 @@ class RealtimeDashboard:
             vector_table.add_row(threat_type.upper(), str(count))
 
         # Combinar ambas tablas
-        from rich.console import Group
         return Group(stats_table, "\n", vector_table)
 
     def _create_controls(self) -> Text:
@@ -183,6 +251,7 @@ class RealtimeDashboard:
 
         controls.extend([
             "[bold blue]📝[/bold blue] Ataque Manual (M)",
+            "[bold magenta]🏆[/bold magenta] Torneo (T)",
             "[bold yellow]🔄[/bold yellow] Cambiar Modo (C)",
             "[bold cyan]📊[/bold cyan] Reset Stats (R)",
             "[bold white]❌[/bold white] Salir (Q)"
@@ -218,56 +287,57 @@ class RealtimeDashboard:
         self.stats.vector_state = vector
         self.stats.current_risk_score = attack_data.get('risk_score', 0.0)
 
+        if self.store is not None:
+            self.store.record(self.run_id, attack_data.get('strategy'), attack_data.get('target_threat'),
+                              attack_data.get('message', ''), decision, detected=attack_data.get('threat_type'),
+                              risk_score=self.stats.current_risk_score, latency=response_time, vector=vector,
+                              round=self.stats.attacks_sent)
+
     def start_auto_attack(self):
         """Iniciar modo de ataque automático inteligente"""
         self.mode = DashboardMode.AUTO_ATTACK
         self.is_running = True
 
         def auto_attack_loop():
-            # Estrategias con pesos inteligentes (favoring dataset when available)
-            strategies_weights = [
-                (AttackStrategy.DATASET, 40),      # 40% - Pliny dataset
-                (AttackStrategy.PARAPHRASE, 25),   # 25% - LLM creative
-                (AttackStrategy.CONTEXT_BUILDING, 15),  # 15% - Context
-                (AttackStrategy.DIRECT, 10),       # 10% - Direct
-                (AttackStrategy.GRADUAL, 5),       # 5% - Gradual
-                (AttackStrategy.ROLE_PLAY, 3),     # 3% - Role play
-                (AttackStrategy.OBFUSCATION, 1),   # 1% - Obfuscation
-                (AttackStrategy.MULTILINGUAL, 1),  # 1% - Multilingual
-            ]
-
-            # Expandir según pesos
-            strategies = []
-            for strategy, weight in strategies_weights:
-                strategies.extend([strategy] * weight)
-
-            threats = ["CAE", "FSA", "MME"]
-            threat_weights = [6, 3, 1]  # CAE más frecuente que FSA, FSA más que MME
-            threat_pool = []
-            for threat, weight in zip(threats, threat_weights):
-                threat_pool.extend([threat] * weight)
-
+            # El selector (pesos fijos del corpus o bandido) elige estrategia y
+            # amenaza y aprende del resultado de cada ronda
+            clients = (self.attacker.llm_client, self.defender.llm_client)
             attack_count = 0
 
             while self.is_running and self.mode == DashboardMode.AUTO_ATTACK:
                 try:
                     attack_count += 1
 
-                    # Seleccionar estrategia basada en pesos
-                    strategy = random.choice(strategies)
-                    threat = random.choice(threat_pool)
+                    # Seleccionar estrategia y amenaza
+                    strategy_name, threat = self.selector.select()
+                    strategy = AttackStrategy(strategy_name)
+                    calls = llm_calls(*clients)
 
                     # Generar ataque
-                    attack = self.attacker.generate_attack(strategy, threat)
+                    if self.dedupe is None:
+                        attack = self.attacker.generate_attack(strategy, threat)
+                    else:
+                        attack = self.dedupe.filter(lambda: self.attacker.generate_attack(strategy, threat))
+                        if attack is None:
+                            # Repetido: la ronda no llega al defensor, pero el
+                            # selector lo sabe y deja de insistir en ese brazo
+                            self.selector.skipped((strategy_name, threat), llm_calls(*clients) - calls)
+                            time.sleep(0.1)
+                            continue
 
                     # Evaluar con defensor
                     start_time = time.time()
                     decision = self.defender.evaluate(attack.content)
                     response_time = time.time() - start_time
 
+                    self.selector.update((strategy_name, threat), decision.action == "PERMITIR",
+                                         llm_calls(*clients) - calls)
+
                     # Registrar ataque
                     attack_data = {
                         'type': strategy.value[:3].upper(),
+                        'strategy': strategy.value,
+                        'target_threat': threat,
                         'message': attack.content,
                         'decision': decision.action,
                         'response_time': response_time,
@@ -300,6 +370,36 @@ class RealtimeDashboard:
     def stop_auto_attack(self):
         """Detener ataque automático"""
         self.is_running = False
+        if self.tournament is not None:
+            self.tournament.stop()
+
+    def start_tournament(self, tournament: Optional[Tournament] = None):
+        """
+        Iniciar modo torneo en segundo plano
+
+        Sin `tournament` se crea el torneo por defecto (create_tournament) con
+        los LLM del atacante y del defensor del dashboard, si los hay.
+        """
+        self.stop_auto_attack()
+        if tournament is None:
+            judges = [self.defender.llm_client] if self.defender.llm_client is not None else []
+            tournament = create_tournament(self.config, attacker_llm=self.attacker.llm_client, judge_llms=judges)
+        self.tournament = tournament
+        self._leaderboard_table = (-1, None)
+        self.mode = DashboardMode.TOURNAMENT
+        self.is_running = True
+
+        def tournament_loop():
+            try:
+                tournament.run()
+            except Exception as e:
+                self.console.print(f"[red]Error en torneo: {e}[/red]")
+            finally:
+                if self.tournament is tournament:
+                    self.is_running = False
+
+        thread = threading.Thread(target=tournament_loop, daemon=True)
+        thread.start()
 
     def reset_stats(self):
         """Resetear estadísticas"""
@@ -351,6 +451,8 @@ class RealtimeDashboard:
         # Registrar
         attack_data = {
             'type': strategy.value[:3].upper(),
+            'strategy': strategy.value,
+            'target_threat': threat,
             'message': attack.content,
             'decision': decision.action,
             'response_time': response_time,
@@ -368,7 +470,7 @@ class RealtimeDashboard:
     def interactive_loop(self):
         """Loop interactivo simplificado"""
         self.console.print("[bold green]🎯 Dashboard LLM vs LLM - ART Project[/bold green]")
-        self.console.print("[dim]Controles: S=Iniciar/Detener, M=Manual, R=Reset, Q=Salir[/dim]")
+        self.console.print("[dim]Controles: S=Iniciar/Detener, M=Manual, T=Torneo, R=Reset, Q=Salir[/dim]")
         self.console.print()
 
         layout = self.create_layout()
@@ -399,6 +501,9 @@ class RealtimeDashboard:
                                 self.console.print("[green]▶ Ataques automáticos iniciados[/green]")
                         elif key == 'm':
                             self.manual_attack()
+                        elif key == 't':
+                            self.start_tournament()
+                            self.console.print("[magenta]🏆 Torneo iniciado[/magenta]")
                         elif key == 'r':
                             self.reset_stats()
                             self.console.print("[yellow]📊 Estadísticas reseteadas[/yellow]")
@@ -418,6 +523,9 @@ class RealtimeDashboard:
 
                 time.sleep(0.1)
 
+        self.stop_auto_attack()
+        if self.store is not None:
+            self.store.close()
         self.console.print("[bold cyan]Dashboard cerrado.[/bold cyan]")
 
 
@@ -439,6 +547,11 @@ def create_realtime_session(config: Optional[Dict] = None, use_llm: bool = False
         if config is None:
             config = {}
 
+    from src.scheduler import configure_schedulers
+    from src.dataset_integration import configure_datasets
+    configure_schedulers(config.get('scheduler'))
+    configure_datasets(config.get('datasets'))
+
     # Crear LLM client si se solicita
     llm_client = None
     if use_llm and config:
@@ -459,6 +572,9 @@ def create_realtime_session(config: Optional[Dict] = None, use_llm: bool = False
     attacker = AdvancedAttacker()
 
     # Crear dashboard
-    dashboard = RealtimeDashboard(defender, attacker)
+    selector_method = config.get('auto_attack', {}).get('selector', 'thompson')
+    dashboard = RealtimeDashboard(defender, attacker, selector_method=selector_method,
+                                  dedupe=AttackDeduplicator.from_config(config.get('dedupe')), config=config,
+                                  store=ResultsStore.from_config(config.get('logging')))
 
     return dashboard
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Almacén de resultados: cada ataque y su decisión en SQLite
+
+Las batallas y el dashboard llaman a record(), que solo añade una tupla a
+un deque (append es atómico: sin locks ni Queue) y vuelve; un hilo escritor
+en segundo plano lo vacía por lotes (una transacción por lote) sobre una
+base de datos en modo WAL, así que guardar resultados no añade latencia a
+evaluate(). Una ejecución (una
+batalla, una sesión del dashboard, una campaña) es una fila de `runs`; sus
+ataques van a `attacks`, con índices por ejecución, estrategia, amenaza y
+acción para las consultas de query_results.py.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from src.utils import log_evento
+
+DEFAULT_DB_PATH = "data/results.db"
+DEFAULT_BATCH_SIZE = 1024  # filas pendientes que despiertan al escritor antes de tiempo
+DEFAULT_FLUSH_INTERVAL = 0.5  # segundos máximos que un resultado espera en memoria
+DEFAULT_MAX_QUEUE = 100000
+
+GROUP_COLUMNS = ("run_id", "strategy", "threat", "action", "detected")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    started REAL NOT NULL,
+    meta TEXT
+);
+CREATE TABLE IF NOT EXISTS attacks (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL REFERENCES runs(id),
+    ts REAL NOT NULL,
+    round INTEGER,
+    strategy TEXT,
+    threat TEXT,
+    message TEXT,
+    action TEXT NOT NULL,
+    detected TEXT,
+    risk_score REAL,
+    latency REAL,
+    vector TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attacks_run ON attacks(run_id);
+CREATE INDEX IF NOT EXISTS idx_attacks_strategy ON attacks(strategy, action);
+CREATE INDEX IF NOT EXISTS idx_attacks_threat ON attacks(threat, action);
+CREATE INDEX IF NOT EXISTS idx_attacks_action ON attacks(action);
+"""
+
+_INSERT_RUN = "INSERT OR REPLACE INTO runs (id, source, started, meta) VALUES (?, ?, ?, ?)"
+_INSERT_ATTACK = ("INSERT INTO attacks (run_id, ts, round, strategy, threat, message, action, detected, "
+                  "risk_score, latency, vector) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+def connect(path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    """Conexión en modo WAL con el esquema creado"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # Con WAL, NORMAL solo sincroniza en los checkpoints: sin fsync por lote
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class ResultsStore:
+    """
+    Escritura por lotes en segundo plano de ataques y decisiones
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_queue: int = DEFAULT_MAX_QUEUE):
+        """
+        Args:
+            path: Fichero SQLite
+            batch_size: Filas pendientes que adelantan la escritura
+            flush_interval: Espera máxima antes de escribir lo pendiente
+            max_queue: Filas pendientes máximas; por encima se descartan (y se cuentan)
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+
+        self._pending: deque = deque()
+        self._wake = threading.Event()
+        self._done = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._error: Optional[BaseException] = None  # excepción que detuvo al escritor
+
+        self.queued = 0
+        self.processed = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> Optional["ResultsStore"]:
+        """
+        Crea el almacén de la sección "logging" de config.json (None si no se guarda nada)
+
+        Guarda si `enabled` y `save_conversations` son true; `db_path` elige
+        el fichero (por defecto data/results.db).
+        """
+        config = config or {}
+        if not (config.get("enabled", False) and config.get("save_conversations", False)):
+            return None
+        return cls(path=config.get("db_path", DEFAULT_DB_PATH)).start()
+
+    def start(self) -> "ResultsStore":
+        """Arranca el hilo escritor"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="results-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def start_run(self, source: str, meta: Optional[Dict] = None) -> str:
+        """
+        Registra una ejecución
+
+        Args:
+            source: Origen (p. ej. "advanced_battle", "dashboard", "campaign")
+            meta: Datos libres de la ejecución (modelos, semilla...), guardados en JSON
+
+        Returns:
+            Id de la ejecución para record()
+        """
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self._put(("run", (run_id, source, time.time(), json.dumps(meta or {}, ensure_ascii=False, default=str))))
+        return run_id
+
+    def record(self, run_id: str, strategy: Optional[str], threat: Optional[str], message: str,
+               action: str, detected: Optional[str] = None, risk_score: float = 0.0,
+               latency: float = 0.0, vector: Optional[Dict] = None, round: Optional[int] = None):
+        """
+        Encola un ataque y su decisión (no bloquea ni toca el disco)
+
+        Args:
+            run_id: Id de start_run()
+            strategy: Estrategia del ataque
+            threat: Amenaza buscada por el atacante
+            message: Texto del ataque
+            action: Decisión del defensor (PERMITIR, VIGILAR, BLOQUEAR)
+            detected: Amenaza detectada por el defensor
+            risk_score: Riesgo tras la decisión
+            latency: Segundos hasta la decisión
+            vector: Vector de estado tras la decisión
+            round: Número de ronda
+        """
+        self._put(("attack", (run_id, time.time(), round, strategy, threat, message, action, detected,
+                              risk_score, latency, vector)))
+
+    def _put(self, item: tuple):
+        if self._closed:
+            return
+        pending = len(self._pending)
+        if pending >= self.max_queue or self._error is not None:
+            self.dropped += 1
+            return
+        self.queued += 1
+        self._pending.append(item)
+        if pending + 1 >= self.batch_size:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Espera a que todo lo encolado esté en disco
+
+        Raises:
+            RuntimeError: Si el hilo escritor se detuvo por un error
+        """
+        if self._thread is None:
+            return
+        target = self.queued
+        self._wake.set()
+        with self._done:
+            self._done.wait_for(lambda: self.processed >= target or self._error is not None)
+        if self._error is not None:
+            raise RuntimeError(f"El escritor de resultados se detuvo: {self._error!r}") from self._error
+
+    def close(self):
+        """Escribe lo pendiente y detiene el hilo escritor"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "ResultsStore":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self) -> Dict:
+        """Filas escritas, descartadas, lotes y pendientes"""
+        return {
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "errors": self.errors,
+            "pending": len(self._pending),
+            "failed": self._error is not None
+        }
+
+    def _writer(self):
+        conn = None
+        try:
+            conn = connect(self.path)
+            while True:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                closed = self._closed
+                # popleft es atómico: los productores siguen añadiendo mientras tanto
+                batch = [self._pending.popleft() for _ in range(len(self._pending))]
+                if batch:
+                    self._write(conn, batch)
+                with self._done:
+                    self.processed += len(batch)
+                    self._done.notify_all()
+                if closed and not self._pending:
+                    break
+        except BaseException as e:
+            # Cualquier error que no sea de SQLite (esos los cuenta _write)
+            # detiene al escritor: flush() lo relanza en lugar de esperar siempre
+            self._error = e
+            log_evento(f"❌ El escritor de resultados se detuvo: {e!r}", "ERROR")
+        finally:
+            if conn is not None:
+                conn.close()
+            with self._done:
+                self._done.notify_all()
+
+    def _write(self, conn: sqlite3.Connection, batch: List[tuple]):
+        runs = [row for kind, row in batch if kind == "run"]
+        attacks = [(*row[:-1], json.dumps(row[-1]) if row[-1] is not None else None)
+                   for kind, row in batch if kind == "attack"]
+        try:
+            with conn:
+                if runs:
+                    conn.executemany(_INSERT_RUN, runs)
+                if attacks:
+                    conn.executemany(_INSERT_ATTACK, attacks)
+            self.written += len(attacks)
+            self.batches += 1
+        except sqlite3.Error as e:
+            self.errors += 1
+            log_evento(f"❌ Error guardando {len(batch)} resultados: {e}", "ERROR")
+
+
+# ----------------------------------------------------------------------
+# Consultas
+
+
+def _where(run_id: Optional[str]) -> tuple:
+    return ("WHERE run_id = ?", (run_id,)) if run_id else ("", ())
+
+
+def list_runs(conn: sqlite3.Connection, limit: int = 20) -> List[Dict]:
+    """Últimas ejecuciones con su número de ataques y tasa de bypass"""
+    rows = conn.execute(
+        "SELECT r.id, r.source, r.started, COUNT(a.id), SUM(a.action = 'PERMITIR') "
+        "FROM runs r LEFT JOIN attacks a ON a.run_id = r.id "
+        "GROUP BY r.id ORDER BY r.started DESC LIMIT ?", (limit,)
+    ).fetchall()
+    return [{"run_id": run_id, "source": source, "started": started, "attacks": total,
+             "bypass_rate": (permitted or 0) / total if total else 0.0}
+            for run_id, source, started, total, permitted in rows]
+
+
+def bypass_rate(conn: sqlite3.Connection, by: str = "strategy", run_id: Optional[str] = None) -> List[Dict]:
+    """
+    Ataques, decisiones y tasa de bypass agrupados por una columna
+
+    Args:
+        conn: Conexión (connect)
+        by: Una de GROUP_COLUMNS
+        run_id: Limitar a una ejecución
+    """
+    if by not in GROUP_COLUMNS:
+        raise ValueError(f"Columna no válida: {by} (opciones: {', '.join(GROUP_COLUMNS)})")
+    where, params = _where(run_id)
+    rows = conn.execute(
+        f"SELECT {by}, COUNT(*), SUM(action = 'BLOQUEAR'), SUM(action = 'VIGILAR'), SUM(action = 'PERMITIR') "
+        f"FROM attacks {where} GROUP BY {by} ORDER BY SUM(action = 'PERMITIR') * 1.0 / COUNT(*) DESC", params
+    ).fetchall()
+    return [{by: key, "attacks": total, "blocked": blocked, "watched": watched, "permitted": permitted,
+             "bypass_rate": permitted / total}
+            for key, total, blocked, watched, permitted in rows]
+
+
+def latency_percentiles(conn: sqlite3.Connection, by: Optional[str] = None, run_id: Optional[str] = None,
+                        quantiles: Sequence[float] = (0.5, 0.9, 0.99)) -> List[Dict]:
+    """
+    Percentiles de latencia (segundos) en total o por grupo
+
+    SQLite no tiene percentiles: las latencias se leen ordenadas por el
+    índice del grupo y se cortan en Python.
+    """
+    if by is not None and by not in GROUP_COLUMNS:
+        raise ValueError(f"Columna no válida: {by} (opciones: {', '.join(GROUP_COLUMNS)})")
+    where, params = _where(run_id)
+    key = by or "'total'"
+    rows = conn.execute(f"SELECT {key}, latency FROM attacks {where} ORDER BY {key}, latency", params)
+
+    groups: Dict[str, List[float]] = {}
+    for group, latency in rows:
+        groups.setdefault(group, []).append(latency or 0.0)
+    return [{by or "group": group, "attacks": len(values),
+             **{f"p{round(q * 100)}": values[min(len(values) - 1, int(len(values) * q))] for q in quantiles}}
+            for group, values in groups.items()]
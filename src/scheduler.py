@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Planificador de peticiones por backend con clases de prioridad
+
+Atacante y defensor suelen apuntar al mismo servidor (LM Studio en :1234).
+Cada backend tiene un número máximo de peticiones simultáneas; cuando se
+llena, las peticiones esperan en una cola ordenada por prioridad
+(juez > atacante > background) y parte de los slots quedan reservados
+para el juez, de modo que la generación del atacante nunca lo deja sin hueco.
+
+Con `adaptive` el límite de concurrencia se ajusta solo (AIMD): sube de forma
+aditiva mientras la latencia por token se mantiene cerca de la mejor
+observada y se reduce a la mitad ante errores o cuando la latencia se
+dispara porque el servidor ya no tiene slots de batch libres. La mejor
+latencia se guarda por (prioridad, modelo): una llamada del juez (1-2
+tokens, casi todo proceso del prompt) no es comparable por token con la
+generación del atacante.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+
+class Priority(IntEnum):
+    """Clases de prioridad (menor valor = se atiende antes)"""
+    JUDGE = 0       # Llamadas del defensor, sensibles a latencia
+    ATTACKER = 1    # Generación de ataques
+    BACKGROUND = 2  # Warmup, pre-generación, tareas de relleno
+
+
+DEFAULT_MAX_CONCURRENCY = 2
+DEFAULT_RESERVED_JUDGE_SLOTS = 1
+
+# Parámetros AIMD
+DEFAULT_MIN_CONCURRENCY = 1
+LATENCY_TOLERANCE = 2.0  # latencia/token > 2x la mejor observada = sobrecarga
+BACKOFF_FACTOR = 0.5
+BASELINE_DRIFT = 0.01  # la mejor latencia "olvida" un 1% por muestra
+
+
+class SlotTicket:
+    """
+    Slot ocupado; quien hace la petición puede informar los tokens generados
+
+    Si `tokens` queda en None (sin usage, stream cancelado) la petición no
+    cuenta para el ajuste AIMD.
+    """
+
+    def __init__(self):
+        self.tokens: Optional[int] = None
+
+
+class RequestScheduler:
+    """
+    Limita la concurrencia de un backend y reparte los slots por prioridad
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 reserved_judge_slots: int = DEFAULT_RESERVED_JUDGE_SLOTS,
+                 adaptive: bool = False, min_concurrency: int = DEFAULT_MIN_CONCURRENCY,
+                 initial_concurrency: Optional[int] = None):
+        """
+        Args:
+            max_concurrency: Peticiones simultáneas máximas contra el backend
+                (techo del límite si `adaptive`)
+            reserved_judge_slots: Slots que solo puede ocupar Priority.JUDGE
+            adaptive: Ajustar el límite con AIMD según latencia y errores
+            min_concurrency: Suelo del límite adaptativo
+            initial_concurrency: Límite de arranque en modo adaptativo
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.reserved_judge_slots = max(0, reserved_judge_slots)
+        self.adaptive = adaptive
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.in_flight = 0
+
+        # Límite actual (float para el incremento aditivo de 1/límite)
+        start = initial_concurrency if initial_concurrency is not None else self.min_concurrency
+        self._limit_f = float(min(max(start, self.min_concurrency), self.max_concurrency)) \
+            if adaptive else float(self.max_concurrency)
+        self._baselines: Dict[tuple, float] = {}  # (prioridad, modelo) -> mejor latencia/token
+        self._last_backoff = 0.0
+        self.increases = 0
+        self.backoffs = 0
+
+        self._cond = threading.Condition()
+        self._queue = []  # heap de (prioridad, orden de llegada)
+        self._seq = itertools.count()
+
+        # Cambios de modelo entre peticiones consecutivas: en LM Studio cada
+        # cambio puede implicar recargar pesos o repartir la memoria
+        self._last_model: Optional[str] = None
+        self.model_swaps = 0
+
+        self._served = {p: 0 for p in Priority}
+        self._wait_total = {p: 0.0 for p in Priority}
+        self._wait_max = {p: 0.0 for p in Priority}
+
+    @property
+    def limit(self) -> int:
+        """Límite de concurrencia vigente"""
+        return int(self._limit_f) if self.adaptive else self.max_concurrency
+
+    def _limit(self, priority: Priority) -> int:
+        if priority == Priority.JUDGE:
+            return self.limit
+        # Nunca bloquear del todo a las demás clases si el límite es bajo
+        return max(1, self.limit - self.reserved_judge_slots)
+
+    def _observe(self, key: tuple, duration: float, tokens: Optional[int], error: bool, in_flight: int):
+        """Ajuste AIMD tras completar una petición (llamar con el lock tomado)"""
+        now = time.perf_counter()
+
+        if error:
+            self._backoff(now, duration)
+            return
+        if not tokens:
+            # Sin recuento de tokens (respuesta sin usage) la muestra no dice nada
+            return
+
+        # Latencia por token generado, comparada solo con peticiones de la
+        # misma clase y modelo
+        sample = duration / tokens
+        baseline = self._baselines.get(key)
+        baseline = sample if baseline is None else min(sample, baseline * (1 + BASELINE_DRIFT))
+        self._baselines[key] = baseline
+
+        if sample > baseline * LATENCY_TOLERANCE:
+            self._backoff(now, duration)
+        elif in_flight >= self.limit:
+            # Solo crecer si el límite actual se estaba usando entero
+            self._limit_f = min(float(self.max_concurrency), self._limit_f + 1.0 / self._limit_f)
+            self.increases += 1
+
+    def _backoff(self, now: float, duration: float):
+        # Las peticiones que ya estaban en vuelo terminan lentas también: una
+        # sola reducción por "ventana" (la duración de la petición) evita colapsar
+        if now - self._last_backoff < duration:
+            return
+        self._limit_f = max(float(self.min_concurrency), self._limit_f * BACKOFF_FACTOR)
+        self._last_backoff = now
+        self.backoffs += 1
+
+    @contextmanager
+    def slot(self, priority: Priority = Priority.ATTACKER, model: Optional[str] = None):
+        """
+        Ocupa un slot del backend durante el bloque `with`
+
+        Args:
+            priority: Clase de prioridad de la petición
+            model: Modelo solicitado (para contar cambios de modelo)
+
+        Yields:
+            SlotTicket donde informar `tokens` generados (para el ajuste AIMD)
+        """
+        ticket = (int(priority), next(self._seq))
+        start = time.perf_counter()
+
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            while self._queue[0] != ticket or self.in_flight >= self._limit(priority):
+                self._cond.wait()
+            heapq.heappop(self._queue)
+            self.in_flight += 1
+
+            if model is not None:
+                if self._last_model is not None and model != self._last_model:
+                    self.model_swaps += 1
+                self._last_model = model
+
+            waited = time.perf_counter() - start
+            self._served[priority] += 1
+            self._wait_total[priority] += waited
+            self._wait_max[priority] = max(self._wait_max[priority], waited)
+
+            # El siguiente de la cola puede tener hueco también
+            self._cond.notify_all()
+
+        ticket = SlotTicket()
+        started = time.perf_counter()
+        error = False
+        aborted = False
+        try:
+            yield ticket
+        except Exception:
+            error = True
+            raise
+        except BaseException:
+            # GeneratorExit (stream abandonado) o KeyboardInterrupt: ni error
+            # del backend ni muestra de latencia válida
+            aborted = True
+            raise
+        finally:
+            with self._cond:
+                if self.adaptive and not aborted:
+                    self._observe((int(priority), model), time.perf_counter() - started,
+                                  ticket.tokens, error, self.in_flight)
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        """Retorna ocupación actual y tiempos de espera por prioridad"""
+        with self._cond:
+            queued = {p.name: 0 for p in Priority}
+            for priority, _ in self._queue:
+                queued[Priority(priority).name] += 1
+
+            return {
+                "max_concurrency": self.max_concurrency,
+                "adaptive": self.adaptive,
+                "limit": self.limit,
+                "queue_depth": len(self._queue),
+                "aimd_increases": self.increases,
+                "aimd_backoffs": self.backoffs,
+                "in_flight": self.in_flight,
+                "model_swaps": self.model_swaps,
+                "queued": queued,
+                "served": {p.name: self._served[p] for p in Priority},
+                "avg_wait": {
+                    p.name: (self._wait_total[p] / self._served[p]) if self._served[p] else 0.0
+                    for p in Priority
+                },
+                "max_wait": {p.name: self._wait_max[p] for p in Priority}
+            }
+
+
+_schedulers: Dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+_scheduler_config: Dict = {}
+
+
+def backend_key(url: str) -> str:
+    """Reduce una URL de endpoint a su backend (esquema://host:puerto)"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def configure_schedulers(config: Optional[Dict]):
+    """
+    Aplica la sección "scheduler" de config.json
+
+    Formato:
+        {"max_concurrency": 2, "reserved_judge_slots": 1,
+         "adaptive": false, "min_concurrency": 1, "initial_concurrency": 2,
+         "backends": {"http://127.0.0.1:1234": {"max_concurrency": 4}}}
+
+    Los planificadores ya creados se reconfiguran en el acto.
+    """
+    global _scheduler_config
+    _scheduler_config = config or {}
+
+    with _schedulers_lock:
+        for key, scheduler in _schedulers.items():
+            settings = _settings_for(key)
+            with scheduler._cond:
+                scheduler.max_concurrency = max(1, settings["max_concurrency"])
+                scheduler.reserved_judge_slots = max(0, settings["reserved_judge_slots"])
+                scheduler.min_concurrency = max(1, min(settings["min_concurrency"], scheduler.max_concurrency))
+                if settings["adaptive"] and not scheduler.adaptive:
+                    start = settings["initial_concurrency"] or scheduler.min_concurrency
+                    scheduler._limit_f = float(min(max(start, scheduler.min_concurrency), scheduler.max_concurrency))
+                scheduler.adaptive = settings["adaptive"]
+                scheduler._limit_f = min(max(scheduler._limit_f, float(scheduler.min_concurrency)),
+                                         float(scheduler.max_concurrency))
+                scheduler._cond.notify_all()
+
+
+def _settings_for(key: str) -> Dict:
+    backend = _scheduler_config.get("backends", {}).get(key, {})
+
+    def setting(name, default):
+        return backend.get(name, _scheduler_config.get(name, default))
+
+    return {
+        "max_concurrency": setting("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+        "reserved_judge_slots": setting("reserved_judge_slots", DEFAULT_RESERVED_JUDGE_SLOTS),
+        "adaptive": setting("adaptive", False),
+        "min_concurrency": setting("min_concurrency", DEFAULT_MIN_CONCURRENCY),
+        "initial_concurrency": setting("initial_concurrency", None)
+    }
+
+
+def get_scheduler(url: str) -> RequestScheduler:
+    """Retorna el planificador compartido del backend de `url`"""
+    key = backend_key(url)
+    with _schedulers_lock:
+        if key not in _schedulers:
+            _schedulers[key] = RequestScheduler(**_settings_for(key))
+        return _schedulers[key]
+
+
+def scheduler_stats() -> Dict[str, Dict]:
+    """Estadísticas de todos los backends conocidos"""
+    with _schedulers_lock:
+        schedulers = dict(_schedulers)
+    return {key: s.stats() for key, s in schedulers.items()}
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Streaming Loader - Bounded-memory ingestion of large local attack corpora
+
+Reads JSONL files and top-level JSON arrays record by record (never the
+whole file) and offers two one-pass consumers:
+
+- reservoir_sample: fixed-size uniform sample (Algorithm R). For JSONL,
+  lines that are not selected are never parsed.
+- build_offset_index: on-disk (start, end) byte offsets of every record, so
+  OffsetIndexedCorpus can later read any record with one seek.
+
+Both report progress (rows, MB, rows/sec) through logging and return a
+LoadStats summary.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+CHUNK_SIZE = 1 << 20  # bytes read per chunk from JSON arrays
+PROGRESS_INTERVAL = 2.0  # seconds between progress log lines
+INDEX_SUFFIX = ".idx"
+_DELIMITERS = frozenset(" \t\r\n,]")  # what may follow a complete array element
+
+
+@dataclass
+class LoadStats:
+    """Summary of one streaming pass"""
+    rows: int = 0
+    bytes: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.rows} rows, {self.bytes / 1e6:.1f} MB in {self.seconds:.2f}s "
+                f"({self.rows_per_sec:,.0f} rows/sec, {self.errors} errors)")
+
+
+class _Progress:
+    """Periodic progress log lines for a streaming pass"""
+
+    def __init__(self, path: Path, callback: Optional[Callable[[LoadStats], None]] = None):
+        self.path = path
+        self.total = path.stat().st_size
+        self.callback = callback
+        self.stats = LoadStats()
+        self.start = time.perf_counter()
+        self.last = self.start
+
+    def update(self, position: int):
+        self.stats.rows += 1
+        self.stats.bytes = position
+        now = time.perf_counter()
+        if now - self.last >= PROGRESS_INTERVAL:
+            self.last = now
+            self.stats.seconds = now - self.start
+            percent = 100.0 * position / self.total if self.total else 100.0
+            logging.info(f"{self.path.name}: {percent:.0f}% - {self.stats}")
+            if self.callback:
+                self.callback(self.stats)
+
+    def finish(self) -> LoadStats:
+        self.stats.seconds = time.perf_counter() - self.start
+        logging.info(f"{self.path.name}: done - {self.stats}")
+        return self.stats
+
+
+def is_jsonl(path) -> bool:
+    """JSONL by extension (.jsonl / .ndjson)"""
+    return Path(path).suffix.lower() in (".jsonl", ".ndjson")
+
+
+def iter_jsonl_lines(path) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Yield (start, end, raw line) for every non-blank line of a JSONL file
+
+    Offsets are byte positions; the raw line is not parsed.
+    """
+    with open(path, "rb") as f:
+        position = 0
+        for line in f:
+            start = position
+            position += len(line)
+            if line.strip():
+                yield start, position, line
+
+
+def iter_json_array(path) -> Iterator[Tuple[int, int, Any]]:
+    """
+    Yield (start, end, record) for every element of a top-level JSON array
+
+    Reads CHUNK_SIZE bytes at a time; memory is bounded by the largest
+    single record plus one chunk.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "rb") as f:
+        raw = b""
+        base = 0  # byte offset of raw[0] in the file
+        text = ""
+        ascii_text = True
+        pos = 0
+        pos_bytes = 0  # byte length of text[:pos]
+        started = False
+        eof = False
+
+        def advance(new_pos: int):
+            nonlocal pos, pos_bytes
+            if ascii_text:
+                pos_bytes += new_pos - pos
+            else:
+                pos_bytes += len(text[pos:new_pos].encode("utf-8"))
+            pos = new_pos
+
+        while True:
+            # Skip separators and the opening bracket
+            skip = pos
+            while skip < len(text) and (text[skip] in " \t\r\n," or (not started and text[skip] == "[")):
+                if text[skip] == "[":
+                    started = True
+                skip += 1
+            advance(skip)
+
+            if pos < len(text) and text[pos] == "]" and started:
+                return
+
+            if pos < len(text) and started:
+                try:
+                    record, end = decoder.raw_decode(text, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    end = None
+                # A value cut by the chunk boundary can still decode ("1." as
+                # 1, "tr" fails): before EOF only accept it when a delimiter
+                # follows, otherwise read more
+                if end is not None and (eof or (end < len(text) and text[end] in _DELIMITERS)):
+                    start_byte = base + pos_bytes
+                    advance(end)
+                    yield start_byte, base + pos_bytes, record
+                    continue
+
+            if eof:
+                if not started:
+                    raise ValueError(f"{path} is not a JSON array")
+                return
+
+            # Drop consumed bytes and read the next chunk
+            raw = raw[pos_bytes:]
+            base += pos_bytes
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                eof = True
+            raw += chunk
+            # Keep an incomplete UTF-8 sequence at the tail for the next read
+            try:
+                text = raw.decode("utf-8")
+            except UnicodeDecodeError as e:
+                if eof or e.start < len(raw) - 3:
+                    raise
+                text = raw[:e.start].decode("utf-8")
+            ascii_text = text.isascii()
+            pos = pos_bytes = 0
+
+
+def reservoir_sample(path, size: Optional[int], rng=None,
+                     progress: Optional[Callable[[LoadStats], None]] = None) -> Tuple[List[Any], LoadStats]:
+    """
+    Uniform sample of `size` records in one pass with O(size) memory
+
+    Args:
+        path: JSONL or JSON array file
+        size: Reservoir size (None keeps every record, still streaming)
+        rng: Random generator (default: a new unseeded one)
+        progress: Optional callback receiving LoadStats periodically
+
+    Returns:
+        (records, stats)
+    """
+    path = Path(path)
+    rng = rng or random.Random()
+    reservoir: List[Any] = []
+    tracker = _Progress(path, progress)
+
+    if is_jsonl(path):
+        seen = 0
+        for _, end, line in iter_jsonl_lines(path):
+            tracker.update(end)
+            # Decide first, parse only the lines that enter the reservoir
+            slot = seen if size is None or seen < size else rng.randrange(seen + 1)
+            seen += 1
+            if size is not None and slot >= size:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                tracker.stats.errors += 1
+                continue
+            if slot < len(reservoir):
+                reservoir[slot] = record
+            else:
+                reservoir.append(record)
+    else:
+        for i, (_, end, record) in enumerate(iter_json_array(path)):
+            tracker.update(end)
+            if size is None or i < size:
+                reservoir.append(record)
+            else:
+                slot = rng.randrange(i + 1)
+                if slot < size:
+                    reservoir[slot] = record
+
+    return reservoir, tracker.finish()
+
+
+def build_offset_index(path, index_path=None,
+                       progress: Optional[Callable[[LoadStats], None]] = None) -> LoadStats:
+    """
+    Write the (start, end) byte offsets of every record to `index_path`
+
+    Args:
+        path: JSONL or JSON array file
+        index_path: Output file (default: `path` + ".idx")
+        progress: Optional callback receiving LoadStats periodically
+
+    Returns:
+        LoadStats of the pass
+    """
+    path = Path(path)
+    index_path = Path(index_path or str(path) + INDEX_SUFFIX)
+    tracker = _Progress(path, progress)
+    records = iter_jsonl_lines(path) if is_jsonl(path) else iter_json_array(path)
+
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    buffer = array("Q")
+    with open(tmp_path, "wb") as out:
+        for start, end, _ in records:
+            tracker.update(end)
+            buffer.append(start)
+            buffer.append(end)
+            if len(buffer) >= 1 << 16:
+                buffer.tofile(out)
+                buffer = array("Q")
+        buffer.tofile(out)
+    os.replace(tmp_path, index_path)
+    return tracker.finish()
+
+
+class OffsetIndexedCorpus(Sequence):
+    """
+    Random access to the records of a large JSONL/JSON array file via its offset index
+
+    A read-only Sequence: only the offsets (16 bytes per record) live in
+    memory, records are read and parsed on access.
+    """
+
+    def __init__(self, path, index_path=None):
+        """
+        Args:
+            path: Data file
+            index_path: Offset index written by build_offset_index
+        """
+        self.path = Path(path)
+        self.index_path = Path(index_path or str(self.path) + INDEX_SUFFIX)
+        self._offsets = array("Q")
+        with open(self.index_path, "rb") as f:
+            self._offsets.frombytes(f.read())
+        self._file = open(self.path, "rb")
+        self._lock = threading.Lock()  # seek + read on the shared handle (campaign/tournament workers)
+
+    def __len__(self) -> int:
+        return len(self._offsets) // 2
+
+    def __getitem__(self, index: int) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("corpus index out of range")
+        start, end = self._offsets[2 * index], self._offsets[2 * index + 1]
+        with self._lock:
+            self._file.seek(start)
+            raw = self._file.read(end - start)
+        return json.loads(raw)
+
+    def sample(self, num_samples: int, rng=random) -> List[Any]:
+        """Random records without replacement"""
+        indices = rng.sample(range(len(self)), min(num_samples, len(self)))
+        return [self[i] for i in indices]
+
+    @classmethod
+    def open(cls, path, rebuild: bool = False) -> "OffsetIndexedCorpus":
+        """Open `path`, building its offset index first if missing or older than the data"""
+        index_path = Path(str(path) + INDEX_SUFFIX)
+        if rebuild or not index_path.exists() or index_path.stat().st_mtime < Path(path).stat().st_mtime:
+            build_offset_index(path, index_path)
+        return cls(path, index_path)
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Torneo: todos los atacantes contra todos los defensores en paralelo
+
+Una matriz de atacantes (estrategias, generación creativa y modelo LLM) y
+defensores (umbrales de strikes, juez activado o no y modelo del juez). Cada
+emparejamiento se juega `legs` veces con run_battle; los partidos se
+reparten en un pool de hilos y cada resultado actualiza la clasificación en
+cuanto termina.
+
+- Equidad: en cada pierna un atacante usa la misma semilla contra todos los
+  defensores, así que todos reciben la misma secuencia de rondas.
+- Cachés compartidas: los defensores con el mismo modelo juez comparten un
+  JudgeCache (veredicto por mensaje, el juez usa temperatura 0.1) y el
+  cliente LLM de debajo, con su single-flight y el planificador del backend.
+  Como los atacantes repiten semilla, la mayoría de mensajes se juzga una vez.
+- Clasificación incremental: Leaderboard.record suma un partido a tres
+  contadores y recoloca dos entradas con bisect; no se recalcula nada.
+"""
+
+import copy
+import random
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.attacker import AdvancedAttacker, AttackStrategy
+from src.battle import BattleMode, BattleRound, campaign_specs, run_battle
+from src.corpus import load_corpus
+from src.defender import AxioDefender
+from src.llm_client import LLMClient
+from src.scheduler import Priority
+from src.utils import log_evento
+
+DEFAULT_CACHE_SIZE = 4096
+
+# Juegos de umbrales de USAGE.md ("Ajustar Umbrales de Seguridad")
+THRESHOLD_PRESETS = {
+    "estricto": {"max_strikes_cae": 1, "max_strikes_fsa": 2, "max_strikes_mme": 3},
+    "balanceado": {"max_strikes_cae": 1, "max_strikes_fsa": 3, "max_strikes_mme": 4},
+    "permisivo": {"max_strikes_cae": 2, "max_strikes_fsa": 5, "max_strikes_mme": 6}
+}
+
+
+@dataclass
+class AttackerEntry:
+    """Un participante atacante del torneo"""
+    name: str
+    strategies: Sequence[AttackStrategy]
+    creative_share: float = 0.0  # fracción de rondas creativas (requiere llm_client)
+    llm_client: Optional[LLMClient] = None
+
+
+@dataclass
+class DefenderEntry:
+    """Un participante defensor: umbrales de "security" y juez opcional"""
+    name: str
+    security: Dict = field(default_factory=dict)
+    judge: Optional[LLMClient] = None
+
+
+@dataclass
+class Standing:
+    """Acumulado de un participante (o de un emparejamiento)"""
+    name: str
+    matches: int = 0
+    rounds: int = 0
+    permitted: int = 0
+    watched: int = 0
+    blocked: int = 0
+
+    @property
+    def bypass_rate(self) -> float:
+        return self.permitted / self.rounds if self.rounds else 0.0
+
+    def add(self, counts: Tuple[int, int, int, int]):
+        rounds, permitted, watched, blocked = counts
+        self.matches += 1
+        self.rounds += rounds
+        self.permitted += permitted
+        self.watched += watched
+        self.blocked += blocked
+
+
+class Leaderboard:
+    """
+    Clasificación de atacantes y defensores actualizada partido a partido
+
+    Cada lado mantiene una lista ordenada de claves; record() quita la clave
+    vieja de los dos participantes del partido y inserta la nueva, en vez de
+    reordenar todo. `version` sube con cada partido para que la interfaz
+    solo redibuje cuando cambia algo.
+    """
+
+    def __init__(self, attackers: Sequence[str], defenders: Sequence[str]):
+        self._standings = {
+            "attacker": {name: Standing(name) for name in attackers},
+            "defender": {name: Standing(name) for name in defenders}
+        }
+        self._order = {side: sorted(self._key(side, s) for s in standings.values())
+                       for side, standings in self._standings.items()}
+        self.cells: Dict[Tuple[str, str], Standing] = {
+            (a, d): Standing(f"{a} vs {d}") for a in attackers for d in defenders
+        }
+        self.version = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(side: str, standing: Standing) -> tuple:
+        # Atacantes: más bypass primero; defensores: menos bypass primero
+        rate = -standing.bypass_rate if side == "attacker" else standing.bypass_rate
+        return (rate, -standing.rounds, standing.name)
+
+    def _update(self, side: str, name: str, counts: Tuple[int, int, int, int]):
+        standing = self._standings[side][name]
+        order = self._order[side]
+        del order[bisect_left(order, self._key(side, standing))]
+        standing.add(counts)
+        insort(order, self._key(side, standing))
+
+    def record(self, attacker: str, defender: str, rounds: List[BattleRound]):
+        """Suma un partido terminado"""
+        actions = [r.decision.action for r in rounds]
+        counts = (len(actions), actions.count("PERMITIR"), actions.count("VIGILAR"), actions.count("BLOQUEAR"))
+        with self._lock:
+            self._update("attacker", attacker, counts)
+            self._update("defender", defender, counts)
+            self.cells[(attacker, defender)].add(counts)
+            self.version += 1
+
+    def standings(self, side: str) -> List[Standing]:
+        """Copia de la clasificación de un lado ("attacker" o "defender"), en orden"""
+        with self._lock:
+            standings = self._standings[side]
+            return [copy.copy(standings[key[-1]]) for key in self._order[side]]
+
+    def to_dict(self) -> Dict:
+        """Clasificaciones y matriz de bypass por emparejamiento"""
+        with self._lock:
+            cells = {f"{a} vs {d}": {"matches": s.matches, "rounds": s.rounds, "bypass_rate": s.bypass_rate}
+                     for (a, d), s in self.cells.items()}
+        result = {
+            side: [{"name": s.name, "matches": s.matches, "rounds": s.rounds, "permitted": s.permitted,
+                    "watched": s.watched, "blocked": s.blocked, "bypass_rate": s.bypass_rate}
+                   for s in self.standings(side)]
+            for side in ("attacker", "defender")
+        }
+        result["matrix"] = cells
+        return result
+
+
+class JudgeCache:
+    """
+    Veredictos del juez compartidos entre defensores con el mismo modelo
+
+    Envuelve un LLMClient: system_prompt() con temperatura baja (la del juez)
+    se memoriza por (system, prompt) en un LRU, salvo las respuestas vacías
+    (peticiones fallidas); el resto de atributos (usage, scheduler,
+    is_available...) son los del cliente. Las peticiones iguales en vuelo ya
+    las agrupa el single-flight del cliente.
+    """
+
+    def __init__(self, client: LLMClient, capacity: int = DEFAULT_CACHE_SIZE):
+        self.client = client
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def system_prompt(self, system: str, prompt: str, temperature: Optional[float] = None,
+                      priority: Optional[Priority] = None) -> str:
+        if temperature is None or temperature > self.client.SINGLE_FLIGHT_MAX_TEMPERATURE:
+            return self.client.system_prompt(system, prompt, temperature=temperature, priority=priority)
+        key = (system, prompt)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+        response = self.client.system_prompt(system, prompt, temperature=temperature, priority=priority)
+        if not response.strip():
+            # El cliente devuelve "" si la petición falló: se reintenta la próxima vez
+            return response
+        with self._lock:
+            self._cache[key] = response
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+        return response
+
+
+@dataclass
+class MatchResult:
+    """Un partido jugado"""
+    attacker: str
+    defender: str
+    leg: int
+    rounds: List[BattleRound]
+    elapsed: float
+
+
+class Tournament:
+    """
+    Todos contra todos entre atacantes y defensores, en un pool de hilos
+    """
+
+    def __init__(self, attackers: Sequence[AttackerEntry], defenders: Sequence[DefenderEntry],
+                 config: Optional[Dict] = None, rounds: int = 30, legs: int = 2, workers: int = 4,
+                 seed: int = 0, mode: BattleMode = BattleMode.INTERLEAVED, window: int = 8,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            attackers: Participantes atacantes
+            defenders: Participantes defensores
+            config: Configuración base; cada defensor sobrescribe su "security"
+            rounds: Rondas por partido
+            legs: Partidos por emparejamiento (cada pierna con otra semilla)
+            workers: Partidos simultáneos
+            seed: Semilla del torneo
+            mode: Modo de cada batalla
+            window: Ventana en MODEL_AFFINITY
+            cache_size: Veredictos guardados por modelo juez (0 = sin caché)
+        """
+        self.attackers = {a.name: a for a in attackers}
+        self.defenders = {d.name: d for d in defenders}
+        self.config = config or {}
+        self.rounds = rounds
+        self.legs = legs
+        self.workers = max(1, workers)
+        self.seed = seed
+        self.mode = mode
+        self.window = window
+        self.leaderboard = Leaderboard(list(self.attackers), list(self.defenders))
+        self.results: List[MatchResult] = []
+        self.wall_time = 0.0
+        self._started: Optional[float] = None
+        self._stop = threading.Event()
+
+        # Un JudgeCache por cliente juez: mismo modelo, mismos veredictos
+        self.judge_caches: List[JudgeCache] = []
+        for defender in defenders:
+            if defender.judge is not None and cache_size:
+                if all(defender.judge is not c.client for c in self.judge_caches):
+                    self.judge_caches.append(JudgeCache(defender.judge, cache_size))
+
+    def fixtures(self) -> List[Tuple[str, str, int]]:
+        """
+        (atacante, defensor, pierna) en orden de juego
+
+        Pierna a pierna, así la clasificación parcial ya cubre a todos los
+        participantes antes de repetir emparejamientos.
+        """
+        return [(a, d, leg) for leg in range(self.legs) for a in self.attackers for d in self.defenders]
+
+    def _judge(self, defender: DefenderEntry):
+        for cache in self.judge_caches:
+            if cache.client is defender.judge:
+                return cache
+        return defender.judge
+
+    def _defender_config(self, defender: DefenderEntry) -> Dict:
+        config = copy.deepcopy(self.config)
+        security = config.setdefault("security", {})
+        security.update(defender.security)
+        security["use_llm_judge"] = defender.judge is not None
+        return config
+
+    def play(self, attacker_name: str, defender_name: str, leg: int) -> MatchResult:
+        """Juega un partido con un atacante y un defensor nuevos"""
+        entry, defender_entry = self.attackers[attacker_name], self.defenders[defender_name]
+        # La semilla solo depende del atacante y la pierna: mismas rondas contra cada defensor
+        seed = random.Random(f"{self.seed}:{attacker_name}:{leg}").getrandbits(32)
+        creative = entry.creative_share if entry.llm_client is not None else 0.0
+        specs = campaign_specs(random.Random(seed), self.rounds, entry.strategies, creative_share=creative)
+
+        attacker = AdvancedAttacker(llm_client=entry.llm_client, seed=seed)
+        defender = AxioDefender(llm_client=self._judge(defender_entry), config=self._defender_config(defender_entry))
+        start = time.perf_counter()
+        report = run_battle(attacker, defender, specs, mode=self.mode, window=self.window)
+        return MatchResult(attacker_name, defender_name, leg, report.rounds, time.perf_counter() - start)
+
+    def run(self, on_update: Optional[Callable[[MatchResult, Leaderboard], None]] = None) -> Leaderboard:
+        """
+        Juega todos los partidos; la clasificación se actualiza al terminar cada uno
+
+        Args:
+            on_update: Callable(resultado, clasificación) tras cada partido
+
+        Returns:
+            Leaderboard final
+        """
+        fixtures = self.fixtures()
+        start = self._started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._play_unless_stopped, *fixture) for fixture in fixtures]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                self.leaderboard.record(result.attacker, result.defender, result.rounds)
+                self.results.append(result)
+                if on_update:
+                    on_update(result, self.leaderboard)
+        self.wall_time = time.perf_counter() - start
+
+        log_evento(f"🏆 Torneo: {len(self.results)}/{len(fixtures)} partidos en {self.wall_time:.2f}s "
+                   f"con {self.workers} hilos", "INFO")
+        return self.leaderboard
+
+    def _play_unless_stopped(self, attacker: str, defender: str, leg: int) -> Optional[MatchResult]:
+        if self._stop.is_set():
+            return None
+        return self.play(attacker, defender, leg)
+
+    def stop(self):
+        """Cancela los partidos que no han empezado; los que están en juego terminan"""
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        """Partidos, rondas/s y aciertos de la caché de veredictos (también a mitad de torneo)"""
+        rounds = sum(len(r.rounds) for r in self.results)
+        elapsed = self.wall_time or (time.perf_counter() - self._started if self._started else 0.0)
+        hits = sum(c.hits for c in self.judge_caches)
+        lookups = hits + sum(c.misses for c in self.judge_caches)
+        return {
+            "matches": len(self.results),
+            "fixtures": len(self.attackers) * len(self.defenders) * self.legs,
+            "rounds": rounds,
+            "workers": self.workers,
+            "wall_time": elapsed,
+            "rounds_per_sec": rounds / elapsed if elapsed else 0.0,
+            "judge_cache_hits": hits,
+            "judge_cache_hit_rate": hits / lookups if lookups else 0.0
+        }
+
+
+def create_tournament(config: Dict, attacker_llm: Optional[LLMClient] = None,
+                      judge_llms: Sequence[LLMClient] = (), **kwargs) -> Tournament:
+    """
+    Torneo por defecto: familias de estrategia contra los juegos de umbrales
+
+    Atacantes: plantillas, mutaciones, dataset y, con `attacker_llm`, uno
+    con rondas creativas. Defensores: cada juego de THRESHOLD_PRESETS sin
+    juez y con cada modelo de `judge_llms`. La sección "tournament" de
+    config.json puede fijar rounds, legs, workers y seed.
+
+    Args:
+        config: Configuración del sistema
+        attacker_llm: Cliente del modelo atacante (opcional)
+        judge_llms: Clientes de los modelos juez a comparar
+        **kwargs: Sobrescriben los parámetros de Tournament
+
+    Returns:
+        Tournament listo para run()
+    """
+    templates = [s for s in AttackStrategy if load_corpus().get(s.value)]
+    attackers = [
+        AttackerEntry("plantillas", templates),
+        AttackerEntry("mutaciones", [AttackStrategy.MUTATION]),
+        AttackerEntry("dataset", [AttackStrategy.DATASET])
+    ]
+    if attacker_llm is not None:
+        attackers.append(AttackerEntry(f"creativo:{attacker_llm.model_name}", templates,
+                                       creative_share=0.5, llm_client=attacker_llm))
+
+    defenders = []
+    for preset, security in THRESHOLD_PRESETS.items():
+        defenders.append(DefenderEntry(preset, security))
+        for judge in judge_llms:
+            defenders.append(DefenderEntry(f"{preset}+{judge.model_name}", security, judge))
+
+    options = {k: v for k, v in (config.get("tournament") or {}).items()
+               if k in ("rounds", "legs", "workers", "seed")}
+    options.update(kwargs)
+    return Tournament(attackers, defenders, config=config, **options)
@@ -11,6 +11,7 @@ from src.llm_client import create_client_from_config
 from src.defender import AxioDefender
 from src.attacker import AdvancedAttacker, AttackStrategy
 from src.utils import load_config
+from src.scheduler import configure_schedulers
 from colorama import init, Fore, Style
 
 # Configurar encoding para Windows
@@ -31,6 +32,7 @@ def main():
 
     # Cargar configuración
     config = load_config()
+    configure_schedulers(config.get('scheduler'))
 
     # Crear clientes LLM
     print(f"{Fore.YELLOW}Inicializando LLMs...{Style.RESET_ALL}")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test del streaming SSE de LLMClient contra un servidor local falso
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.llm_client import LLMClient
+
+FRAGMENTOS = ["Hola", ", ", "esto ", "es ", "un ", "stream"]
+FRAGMENTOS_UTF8 = ["¿Cuál ", "es tu ", "configuración? ", "ñ"]
+
+
+class _SSEHandler(BaseHTTPRequestHandler):
+    fragmentos = FRAGMENTOS
+    ensure_ascii = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        for fragmento in self.fragmentos:
+            chunk = {"choices": [{"index": 0, "delta": {"content": fragmento}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=self.ensure_ascii)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        final = {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                 "usage": {"prompt_tokens": 5, "completion_tokens": len(self.fragmentos),
+                           "total_tokens": 5 + len(self.fragmentos)}}
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+
+    def log_message(self, *args):
+        pass
+
+
+class _RawUTF8Handler(_SSEHandler):
+    """UTF-8 sin escapar y sin charset en el Content-Type, como LM Studio"""
+    fragmentos = FRAGMENTOS_UTF8
+    ensure_ascii = False
+
+
+def _start_server(handler=_SSEHandler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    return server, LLMClient(url, "fake-model")
+
+
+def test_chat_stream_sync():
+    server, client = _start_server()
+    try:
+        stream = client.chat_stream([{"role": "user", "content": "hola"}])
+        deltas = list(stream)
+
+        assert deltas == FRAGMENTOS
+        assert stream.text == "".join(FRAGMENTOS)
+        assert stream.finish_reason == "stop"
+        assert stream.usage["completion_tokens"] == len(FRAGMENTOS)
+    finally:
+        server.shutdown()
+
+
+def test_chat_stream_raw_utf8():
+    server, client = _start_server(_RawUTF8Handler)
+    try:
+        stream = client.chat_stream([{"role": "user", "content": "hola"}])
+        deltas = list(stream)
+
+        assert deltas == FRAGMENTOS_UTF8
+        assert stream.text == "¿Cuál es tu configuración? ñ"
+    finally:
+        server.shutdown()
+
+
+def test_chat_stream_cancel():
+    server, client = _start_server()
+    try:
+        stream = client.chat_stream([{"role": "user", "content": "hola"}])
+        for delta in stream:
+            stream.cancel()
+
+        assert stream.cancelled
+        assert stream.finish_reason == "cancelled"
+        assert stream.text == FRAGMENTOS[0]
+    finally:
+        server.shutdown()
+
+
+def test_chat_stream_async():
+    server, client = _start_server()
+
+    async def consume():
+        stream = client.chat_stream([{"role": "user", "content": "hola"}])
+        deltas = [delta async for delta in stream]
+        return stream, deltas
+
+    try:
+        stream, deltas = asyncio.run(consume())
+        assert deltas == FRAGMENTOS
+        assert stream.text == "".join(FRAGMENTOS)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_chat_stream_sync()
+    test_chat_stream_raw_utf8()
+    test_chat_stream_cancel()
+    test_chat_stream_async()
+    print("✅ Streaming OK")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test del ajuste AIMD de RequestScheduler con un reloj simulado
+"""
+
+import src.scheduler as scheduler_module
+from src.scheduler import Priority, RequestScheduler
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+def _scheduler(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(scheduler_module, "time", clock)
+    return clock, RequestScheduler(max_concurrency=4, adaptive=True, initial_concurrency=4)
+
+
+def _call(clock, scheduler, priority, model, duration, tokens):
+    with scheduler.slot(priority, model) as ticket:
+        clock.now += duration
+        ticket.tokens = tokens
+
+
+def test_judge_and_attacker_calls_keep_separate_baselines(monkeypatch):
+    clock, scheduler = _scheduler(monkeypatch)
+    for _ in range(10):
+        # Atacante: 300 tokens en 3s (10ms/token); juez: 2 tokens en 0.5s (250ms/token)
+        _call(clock, scheduler, Priority.ATTACKER, "deepseek", 3.0, 300)
+        _call(clock, scheduler, Priority.JUDGE, "mistral", 0.5, 2)
+
+    assert scheduler.backoffs == 0
+    assert scheduler.limit == 4
+
+
+def test_unknown_tokens_and_abandoned_streams_are_ignored(monkeypatch):
+    clock, scheduler = _scheduler(monkeypatch)
+    _call(clock, scheduler, Priority.ATTACKER, "deepseek", 3.0, 300)
+
+    # Respuesta sin usage: 30s sin recuento de tokens
+    _call(clock, scheduler, Priority.ATTACKER, "deepseek", 30.0, None)
+
+    # Stream abandonado a mitad: GeneratorExit dentro del slot
+    def stream():
+        with scheduler.slot(Priority.ATTACKER, "deepseek") as ticket:
+            clock.now += 30.0
+            yield
+            ticket.tokens = 1
+
+    abandoned = stream()
+    next(abandoned)
+    abandoned.close()
+
+    assert scheduler.backoffs == 0
+    assert scheduler.in_flight == 0
+
+
+def test_overload_within_a_class_backs_off(monkeypatch):
+    clock, scheduler = _scheduler(monkeypatch)
+    _call(clock, scheduler, Priority.ATTACKER, "deepseek", 3.0, 300)
+    _call(clock, scheduler, Priority.ATTACKER, "deepseek", 9.0, 300)
+
+    assert scheduler.backoffs == 1
+    assert scheduler.limit == 2
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))
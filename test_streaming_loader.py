@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test de la lectura en streaming de arrays JSON y del corpus con índice de offsets
+"""
+
+import json
+import threading
+
+import src.streaming_loader as streaming_loader
+from src.streaming_loader import OffsetIndexedCorpus, iter_json_array
+
+MIXED = '[{"a":1.5,"b":"x"},2.25,{"c":[1e5,3]},-7.125, "ñandú ¿qué?" ,true,null,[0.5,-1E-3],{"d":"]"}]'
+
+
+def test_json_array_every_chunk_size(tmp_path, monkeypatch):
+    path = tmp_path / "mixed.json"
+    path.write_bytes(MIXED.encode("utf-8"))
+    expected = json.loads(MIXED)
+    raw = path.read_bytes()
+
+    for chunk_size in range(1, len(raw) + 2):
+        monkeypatch.setattr(streaming_loader, "CHUNK_SIZE", chunk_size)
+        rows = list(iter_json_array(path))
+
+        assert [record for _, _, record in rows] == expected, chunk_size
+        assert [json.loads(raw[start:end]) for start, end, _ in rows] == expected, chunk_size
+
+
+def test_offset_corpus_concurrent_reads(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    records = [{"id": i, "text": "x" * (i % 50)} for i in range(2000)]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n", encoding="utf-8")
+    corpus = OffsetIndexedCorpus.open(path)
+    errors = []
+
+    def read(offset):
+        try:
+            for i in range(offset, len(corpus), 7):
+                if corpus[i]["id"] != i:
+                    errors.append(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read, args=(k,)) for k in range(7)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+
+
+if __name__ == "__main__":
+    import pytest
+    raise SystemExit(pytest.main([__file__, "-q"]))